@@ -1,12 +1,15 @@
 import os
 import sys
 
-import psutil
 import tkinter as tk
 from tkinter import messagebox
 from pystray import Icon, MenuItem as item, Menu
 from PIL import Image, ImageDraw
 import ttkbootstrap as ttk
+
+from monitoring.process_index import ProcessIndex
+
+
 def get_resource_path(relative_path):
     """ Get the absolute path to the resource, works for dev and for PyInstaller """
     try:
@@ -49,6 +52,9 @@ class AppMonitor:
 
         self.monitoring = False
 
+        # One scan of the process table per tick answers the checks for every process name
+        self.process_index = ProcessIndex()
+
     def create_tray_icon(self):
         image_path = get_resource_path("lcPPc0WAve.png")
         # Create an image for the tray icon
@@ -87,8 +93,9 @@ class AppMonitor:
         if not self.monitoring:
             return
 
+        self.process_index.refresh()
         for process_name in self.process_names:
-            process_running = any(proc.info['name'] == process_name for proc in psutil.process_iter(['name']))
+            process_running = self.process_index.is_running(process_name)
             if process_running:
                 if not self.process_running_status[process_name]:  # It was not running previously
                     self.status_labels[process_name].config(text="Running", bootstyle="success")
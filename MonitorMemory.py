@@ -4,6 +4,11 @@ import tkinter as tk
 from tkinter import messagebox
 import ttkbootstrap as ttk
 
+from diagnostics import tracing
+from monitoring.history import ProcessHistory
+from monitoring.sampler import ProcessSampler
+from monitoring.trend_chart import TrendChart
+
 class ProcessMonitorApp:
     def __init__(self, root):
         self.root = root
@@ -25,11 +30,28 @@ class ProcessMonitorApp:
         self.stop_button = ttk.Button(root, text="Stop Monitoring", command=self.stop_monitoring, state=tk.DISABLED)
         self.stop_button.pack(pady=10)
 
-        # Output area
-        self.output_text = tk.Text(root, height=10, state=tk.DISABLED)
-        self.output_text.pack(pady=10)
+        # Opt in to aggregating child processes too (PyInstaller bootloader children, scraper workers), with
+        # USS/PSS; off by default, like the monitor --tree flag and the exporter, since it costs a
+        # memory_full_info call per child on every tick
+        self.include_children = tk.BooleanVar(value=False)
+        self.include_children_check = ttk.Checkbutton(root, text="Include child processes (USS/PSS)",
+                                                      variable=self.include_children)
+        self.include_children_check.pack(pady=5)
+
+        # Output area; the label's text is replaced in place, the rollups keep the history summary
+        self.output_var = tk.StringVar(value="")
+        self.output_label = ttk.Label(root, textvariable=self.output_var, font=("Courier", 9), justify=tk.LEFT)
+        self.output_label.pack(pady=5)
+
+        # Live trend of the totals, only the newest segment is drawn per sample
+        self.trend_chart = TrendChart(root, width=380, height=120)
+        self.trend_chart.canvas.pack(pady=5)
+
+        # Fixed-size history of the samples, bounded on week-long runs
+        self.history = ProcessHistory()
 
         self.monitoring = False
+        self.sampler = None
 
     def start_monitoring(self):
 
@@ -42,10 +64,17 @@ class ProcessMonitorApp:
         self.monitoring = True
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
+
+        # psutil is read on the sampler thread every 2 seconds, the UI only picks up the results
+        self.sampler = ProcessSampler(self.processes, interval=2.0, tree=self.include_children.get())
+        self.sampler.start()
         self.monitor_processes()
 
     def stop_monitoring(self):
         self.monitoring = False
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler = None
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
 
@@ -53,35 +82,53 @@ class ProcessMonitorApp:
         if not self.monitoring:
             return
 
-        total_memory = 0
-        total_cpu = 0
-
-        for process in self.processes:
-            try:
-                total_memory += process.memory_info().rss / (1024 * 1024)  # Convert to MB
-                total_cpu += process.cpu_percent(interval=1)
-            except psutil.NoSuchProcess:
-                self.processes.remove(process)
-
-        self.output_text.config(state=tk.NORMAL)
-        self.output_text.delete("1.0", tk.END)
-        self.output_text.insert(tk.END, f"Total Memory Usage: {total_memory:.2f} MB\n")
-        self.output_text.insert(tk.END, f"Total CPU Usage: {total_cpu:.2f}%\n")
-        self.output_text.config(state=tk.DISABLED)
-
-        if not self.processes:
-            messagebox.showinfo("Process Terminated", "All monitored processes have terminated.")
-            self.stop_monitoring()
-        else:
-            self.root.after(2000, self.monitor_processes)  # Update every 2 seconds
+        samples = self.sampler.drain()
+        with tracing.span("monitor.ui", samples=len(samples)):
+            for sample in samples:
+                if sample['pids']:
+                    self.history.add(sample)
+                    self.trend_chart.add_point(sample)
+
+        if samples:
+            sample = samples[-1]  # Only the latest sample is displayed
+            self.output_var.set(self.format_output(sample))
+
+            if not sample['pids']:
+                messagebox.showinfo("Process Terminated", "All monitored processes have terminated.")
+                self.stop_monitoring()
+                return
+
+        self.root.after(200, self.monitor_processes)  # Poll the sampler queue without blocking
+
+    def format_output(self, sample):
+        lines = [f"Total Memory Usage: {sample['memory_mb']:.2f} MB"]
+        if sample['uss_mb'] is not None:
+            lines.append(f"Unique (USS): {sample['uss_mb']:.2f} MB  Proportional (PSS): "
+                         + (f"{sample['pss_mb']:.2f} MB" if sample['pss_mb'] is not None else "n/a"))
+            lines.append(f"Processes in tree: {len(sample['tree_pids'])}")
+        lines += [
+            f"Total CPU Usage: {sample['cpu_percent']:.2f}%",
+            "",
+            f"{'window':<7}{'MB min/p50/p95/max':>26}{'CPU% p50/p95/max':>20}",
+        ]
+        for window, rollup in self.history.rollups().items():
+            if not rollup:
+                continue
+            memory = rollup['memory_mb']
+            cpu = rollup['cpu_percent']
+            lines.append(f"{window:<7}{memory['min']:>7.0f}{memory['p50']:>7.0f}{memory['p95']:>7.0f}{memory['max']:>7.0f}"
+                         f"{cpu['p50']:>8.1f}{cpu['p95']:>7.1f}{cpu['max']:>7.1f}")
+        return "\n".join(lines)
 
 
 if __name__ == "__main__":
+    # SIGUSR1 starts, then stops and saves, a profile of the UI (POSIX only)
+    tracing.install_signal_toggle()
     root = ttk.Window(themename="litera")
     app = ProcessMonitorApp(root)
     # Set the window size and prevent resizing
     window_width = 400
-    window_height = 300
+    window_height = 480
     screen_width = root.winfo_screenwidth()
     screen_height = root.winfo_screenheight()
 
@@ -1,28 +1,72 @@
-import json
-import logging
-import shutil
-import threading
-import webbrowser
-import datetime
-import pyautogui
-import tkinter as tk
-import ttkbootstrap as ttk
-from tkinter import filedialog
-from tkinter import messagebox
-from PIL import Image, ImageTk
-import os
 import sys
 
-import pandas as pd
-from spider.spider import *
-
-
-
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "--inference-worker":
+    # The frozen build starts this executable again as the inference worker, see spider/inference_worker.py;
+    # it serves the models and exits without importing the GUI
+    import multiprocessing
+    multiprocessing.freeze_support()
+    from spider.inference_worker import main as inference_worker_main
+    inference_worker_main(sys.argv[2:])
+    sys.exit(0)
+
+from diagnostics.startup import StartupTimer
+
+# Started before any other import, so the report covers the whole cold start
+startup_timer = StartupTimer()
+
+with startup_timer.phase("import standard library"):
+    import json
+    import logging
+    import shutil
+    import threading
+    import webbrowser
+    import datetime
+    import os
+
+with startup_timer.phase("import tkinter/ttkbootstrap"):
+    import tkinter as tk
+    import ttkbootstrap as ttk
+    from tkinter import filedialog
+    from tkinter import messagebox
+
+with startup_timer.phase("import PIL"):
+    from PIL import Image, ImageTk
+
+# pandas, requests, bs4 and transformers are only imported by the background threads that need them
+with startup_timer.phase("import app modules"):
+    from capture.grabber import FrameGrabber
+    from diagnostics import tracing
+    from capture.screenshot_worker import ScreenshotWorker
+    from ticker.feed import NewsFeed
+    from ticker.news_ticker import NewsTicker
+
+
+# Monitor captured by a click (0 for all monitors, 1 for the primary one), or a (left, top, width, height) region
+SCREENSHOT_MONITOR = 1
+SCREENSHOT_REGION = None
+TICKER_HEIGHT = 45
+# How often the ticker's frame-time statistics are logged
+TICKER_STATS_INTERVAL_MS = 5 * 60 * 1000
+# Ticker filter at startup: only headlines with one of these labels and/or containing one of these watch
+# keywords (None for all); the label can also be picked from the ticker's right-click menu
+TICKER_LABELS = None
+TICKER_KEYWORDS = None
+# Show the newest headlines first instead of in file order; a filtered ticker is always newest first
+TICKER_NEWEST_FIRST = False
+# Labels offered in the right-click menu, most frequent first
+TICKER_MENU_LABELS = 10
 
 save_folder = None
+screenshot_worker = None
+ticker_grabber = None
 news_urls = []
 news_items = []
-current_news_index = 0
+news_feed = None
+news_feed_lock = threading.Lock()
+news_ticker = None
+ticker_labels = TICKER_LABELS
+ticker_keywords = TICKER_KEYWORDS
+refresh_scheduler = None
 
 def get_resource_path(relative_path):
     """ Get the absolute path to the resource, works for dev and for PyInstaller """
@@ -50,99 +94,163 @@ def set_save_folder_on_startup():
         messagebox.showwarning("Warning", "Save folder not set. Screenshot will not be saved.")
         root.destroy()
 
-def take_screenshot(event):
+def start_screenshot_worker():
+    global screenshot_worker, ticker_grabber
+    # Grabbing, encoding and writing happen on the worker's threads, the click handler only queues a request
+    grabber = FrameGrabber(monitor=SCREENSHOT_MONITOR, region=SCREENSHOT_REGION)
+    screenshot_worker = ScreenshotWorker(save_folder, grab=grabber.grab)
+    screenshot_worker.start()
+    ticker_grabber = FrameGrabber(region=(0, 0, root.winfo_screenwidth(), TICKER_HEIGHT))
+    poll_screenshots()
+
+def take_screenshot(event, burst=False, ticker_only=False):
     global save_folder
     if not save_folder:
         messagebox.showwarning("Warning", "Save folder not set. Please set a save folder first.")
         return
 
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_path = os.path.join(save_folder, f"screenshot_{timestamp}.png")
-    screenshot = pyautogui.screenshot()
-    screenshot.save(file_path)
-    messagebox.showinfo("Screenshot Taken", f"Screenshot saved to {file_path}")
+    if ticker_only:
+        request_id = screenshot_worker.request(grab=ticker_grabber.grab)
+    elif burst:
+        request_id = screenshot_worker.burst()
+    else:
+        request_id = screenshot_worker.request()
+    if request_id is None:
+        messagebox.showwarning("Warning", "Still saving the previous screenshots. Please try again.")
+
+def take_screenshot_burst(event):
+    take_screenshot(event, burst=True)
+
+def take_ticker_screenshot(event):
+    take_screenshot(event, ticker_only=True)
+
+def poll_screenshots():
+    for completion in screenshot_worker.drain():
+        tracing.record("screenshot.grab", completion['grab_seconds'], frames=len(completion['paths']))
+        tracing.record("screenshot.encode", completion['encode_seconds'], frames=len(completion['paths']))
+        if completion['errors']:
+            messagebox.showerror("Screenshot Failed", "\n".join(completion['errors']))
+        elif len(completion['paths']) == 1:
+            messagebox.showinfo("Screenshot Taken", f"Screenshot saved to {completion['paths'][0]}")
+        elif completion['paths']:
+            messagebox.showinfo("Screenshots Taken", f"{len(completion['paths'])} screenshots saved to {save_folder}")
+    root.after(200, poll_screenshots)
 
 def fetch_news_from_csv(file_path):
-    global news_items, news_urls
+    with news_feed_lock:
+        _fetch_news_from_csv(file_path)
+
+def _fetch_news_from_csv(file_path):
+    global news_items, news_urls, news_feed
     try:
-        df = pd.read_csv(file_path)
-        news_items = []
-        news_urls = []
-
-        for index, row in df.iterrows():
-            date = row['Date'].replace('\n', ' ').strip()
-            content = row['Summary']
-            label = row['Final Label']
-            url = row['URL']
-            news_item = f"Date: {date} Content: {content}  Classified: {label}"
-            news_items.append(news_item)
-            news_urls.append(url)
+        # Only the rows appended since the previous load are parsed, unless the file was replaced
+        if news_feed is None or news_feed.csv_path != file_path:
+            news_feed = NewsFeed(file_path)
+        added = news_feed.refresh()
+        news_items, news_urls = select_ticker_items()
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{timestamp}: Loaded {added} news items, {len(news_items)} in the ticker")
     except Exception as e:
         print(f"Failed to fetch news from CSV: {e}")
-        news_items = []
-        news_urls = []
+        if news_feed is None or not news_feed.items:
+            news_items = []
+            news_urls = []
+
+def select_ticker_items():
+    # Filters are answered from the feed's index, without rescanning every headline
+    if ticker_labels or ticker_keywords or TICKER_NEWEST_FIRST:
+        return news_feed.select(labels=ticker_labels, keywords=ticker_keywords)
+    return news_feed.snapshot
+
+def set_ticker_filter(labels=None, keywords=None):
+    global news_items, news_urls, ticker_labels, ticker_keywords
+    with news_feed_lock:
+        ticker_labels, ticker_keywords = labels, keywords
+        if news_feed is not None:
+            news_items, news_urls = select_ticker_items()
+    # Start the new rotation from its newest headline
+    news_ticker.index = 0
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{timestamp}: Ticker filter labels={labels} keywords={keywords}, {len(news_items)} in the ticker")
+
+def show_ticker_menu(event):
+    menu = tk.Menu(top_window, tearoff=0)
+    menu.add_command(label="All news", command=lambda: set_ticker_filter())
+    if TICKER_KEYWORDS:
+        menu.add_command(label="Watch keywords", command=lambda: set_ticker_filter(keywords=TICKER_KEYWORDS))
+    labels = news_feed.index.labels() if news_feed is not None else {}
+    if labels:
+        menu.add_separator()
+    for label, count in list(labels.items())[:TICKER_MENU_LABELS]:
+        menu.add_command(label=f"{label} ({count})", command=lambda label=label: set_ticker_filter(labels=[label]))
+    menu.add_separator()
+    # Profile the Tk thread through a slow stretch, or the scheduler's next refresh across all threads
+    profiling = "Stop profile and save" if tracing.is_profiling() else "Start UI profile"
+    menu.add_command(label=profiling, command=toggle_ui_profile)
+    menu.add_command(label="Profile next refresh", command=profile_next_refresh)
+    menu.tk_popup(event.x_root, event.y_root)
+
+def toggle_ui_profile():
+    # Saving joins the sampler thread and writes the profile, so it happens off the Tk thread
+    threading.Thread(target=tracing.toggle_profile, args=("ui", [threading.main_thread().ident]),
+                     name="ui-profile", daemon=True).start()
+
+def profile_next_refresh():
+    tracing.request_profile("refresh")
+    if refresh_scheduler is not None:
+        refresh_scheduler.run_now()
 
 def open_current_url(event):
-    global current_news_index
-    if news_urls and current_news_index < len(news_urls):
-        webbrowser.open(news_urls[current_news_index])
-
-def update_news_ticker():
-    global current_news_index, news_items
-    news_text = news_items[current_news_index]
-
-    def scroll_text():
-        nonlocal news_text
-        global current_news_index
-        news_text = news_text[1:]
-        news_label.config(text=news_text)
-
-        if len(news_text.strip()) > 0:
-            news_label.after(100, scroll_text)
-        else:
-            current_news_index = (current_news_index + 1) % len(news_items)
-            news_label.after(2000, update_news_ticker)
-
-    scroll_text()
-
-def run_scraper_task():
-    urls_and_sites = {
-        "https://thehackernews.com/": "hackernews",
-        "https://www.cyber.gov.au/about-us/view-all-content/news-and-media": "cyber",
-        "https://www.afp.gov.au/news-centre": "afp"
-    }
+    if news_urls and news_ticker.index < len(news_urls):
+        webbrowser.open(news_urls[news_ticker.index])
 
-    for url, site in urls_and_sites.items():
-        html_content = download_html(url)
-        if html_content:
-            parse_and_save_news(html_content, site)
+def get_news_items():
+    return news_items
 
-    # Path to the newly generated CSV
-    generated_csv_path = get_writable_path("final_new.csv")
+def log_ticker_stats():
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{timestamp}: {news_ticker.report()}")
+    root.after(TICKER_STATS_INTERVAL_MS, log_ticker_stats)
 
-
-    # Path to the writable final.csv location
-    writable_csv_path = get_writable_path("final.csv")
-
-
-
-    # Replace the old final.csv with the new one
-    shutil.move(generated_csv_path, writable_csv_path)
-    print(f"CSV file has been updated: {writable_csv_path}")
-
-
-    # Schedule the next run in 24 hours
-    threading.Timer(86400, run_scraper_task).start()  # 86400 seconds = 24 hours
+def reload_news(results):
+    # New or changed items have been appended to final.csv by the news store
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{timestamp}: Refresh finished: {results}")
     csv_file_path = ensure_writable_csv()
     fetch_news_from_csv(csv_file_path)
 
+def start_refresh_scheduler():
+    global refresh_scheduler
+    # The scraper's dependencies are imported here, on a background thread, not at startup
+    from spider.spider import get_refresh_scheduler
+
+    # Each site is refreshed on its own interval, one refresh at a time, catching up after sleep
+    refresh_scheduler = get_refresh_scheduler(on_complete=reload_news)
+    refresh_scheduler.start()
 
+def load_news_in_background(file_path):
+    # The first load imports pandas, so it runs off the Tk thread; the ticker waits until items arrive
+    threading.Thread(target=fetch_news_from_csv, args=(file_path,), name="news-loader", daemon=True).start()
+
+def on_ticker_visible():
+    startup_timer.finish("first ticker frame")
+    # Start the scraper only once the window is up, so its imports don't compete with the startup
+    start_scraper_in_background()
 
 def start_scraper_in_background():
-    # Run scraper task in a background thread
-    scraper_thread = threading.Thread(target=run_scraper_task)
-    scraper_thread.daemon = False # Ensure thread continues running until completion
-    scraper_thread.start()
+    # Importing the scraper takes a while, so the scheduler is set up on a background thread
+    threading.Thread(target=start_refresh_scheduler, name="scheduler-setup", daemon=True).start()
+
+def on_close():
+    # Cancel the pending refresh wait and the screenshot worker instead of keeping the process alive;
+    # a refresh in progress stops after its current stage, so it never exits halfway through a save
+    if refresh_scheduler is not None:
+        refresh_scheduler.stop()
+        # The inference worker would otherwise keep the models loaded until its idle timeout
+        from spider.spider import shutdown_inference_worker
+        shutdown_inference_worker()
+    screenshot_worker.stop()
+    root.destroy()
 
 # Ensure final.csv exists in a writable location
 def ensure_writable_csv():
@@ -152,17 +260,19 @@ def ensure_writable_csv():
         shutil.copy(get_resource_path("final.csv"), writable_csv_path)
     return writable_csv_path
 
-# Start the scraper in the background
-start_scraper_in_background()
-
 root = ttk.Window(themename="superhero")
 root.title("BlackBoomerang")
+# SIGUSR1 starts, then stops and saves, a profile of every thread (POSIX only)
+tracing.install_signal_toggle()
+startup_timer.mark("create main window")
 
 set_save_folder_on_startup()
+startup_timer.mark("choose save folder", counted=False)
+start_screenshot_worker()
 
 # Load the CSV from the writable location
 csv_file_path = ensure_writable_csv()
-fetch_news_from_csv(csv_file_path)
+load_news_in_background(csv_file_path)
 
 window_width = 70
 window_height = 60
@@ -178,13 +288,17 @@ root.resizable(False, False)
 top_window = tk.Toplevel()
 top_window.overrideredirect(True)
 top_window.attributes('-topmost', True)
-top_window.geometry(f"{top_window.winfo_screenwidth()}x45+0+0")
+top_window.geometry(f"{top_window.winfo_screenwidth()}x{TICKER_HEIGHT}+0+0")
 
-news_label = tk.Label(top_window, text="", bg="yellow", font=("Helvetica", 40), anchor='w')
-news_label.pack(fill='both')
-news_label.bind("<Button-1>", open_current_url)
+# Headlines are laid out once on a canvas and scrolled by pixel offsets at a steady frame rate
+news_ticker = NewsTicker(top_window, get_news_items, height=TICKER_HEIGHT, font=("Helvetica", 40), bg="yellow")
+news_ticker.canvas.pack(fill='both', expand=True)
+news_ticker.canvas.bind("<Button-1>", open_current_url)
+news_ticker.canvas.bind("<Button-3>", show_ticker_menu)  # Right-click filters the ticker by label or keyword
 
-update_news_ticker()
+news_ticker.start()
+root.after(TICKER_STATS_INTERVAL_MS, log_ticker_stats)
+startup_timer.mark("create ticker")
 
 # Correctly load the image
 image_path = get_resource_path("Cyber copy.png")
@@ -194,5 +308,11 @@ bg_photo = ImageTk.PhotoImage(image)
 bg_label = tk.Label(root, image=bg_photo)
 bg_label.place(x=0, y=0, relwidth=1, relheight=1)
 bg_label.bind("<Button-1>", take_screenshot)  # Bind screenshot function to image click
+bg_label.bind("<Shift-Button-1>", take_screenshot_burst)  # Shift-click takes a burst of screenshots
+bg_label.bind("<Control-Button-1>", take_ticker_screenshot)  # Ctrl-click captures only the news ticker
+startup_timer.mark("load button image")
 
+# Runs once the main loop has drawn the windows
+root.after_idle(on_ticker_visible)
+root.protocol("WM_DELETE_WINDOW", on_close)
 root.mainloop()
@@ -0,0 +1,111 @@
+#!/usr/bin/python
+
+"""
+Function:
+    1. Run every classifier backend over a local fixture set of Cyber.gov.au style texts.
+    2. Report the load time (model load or training plus a warm-up call) and the warm throughput
+       (items per second) of each backend, and its agreement with the BART backend.
+
+I/O:
+    1. Input:
+        1.1 A JSON list of fixture texts (default: bench/fixtures/cyber_items.json)
+        1.2 A labelled CSV to train the 'tfidf' backend (default: bench/fixtures/final_sample.csv)
+    2. Output:
+        2.1 A table printed to stdout, and optionally the same results as JSON
+
+Usage:
+    python bench/classifier_benchmark.py [--backends bart,tfidf,keyword] [--training-csv ~/BlackBoomerang/final.csv]
+                                         [--repeat 3] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+if __name__ == "__main__" and not __package__:
+    # Make the repository root importable when run as "python bench/classifier_benchmark.py"
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from spider.classifiers import get_classifier
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_backend(backend, texts, training_csv):
+    """ Builds a classifier and makes one warm-up call; returns it and the seconds both took """
+    start = time.perf_counter()
+    classifier = get_classifier(backend, training_csv=training_csv)
+    # The first call loads the BART model, so it is kept out of the throughput
+    classifier.predict(texts[:1])
+    return classifier, time.perf_counter() - start
+
+
+def run_backend(classifier, texts, repeat):
+    """ Returns the predictions of the classifier and its best time over repeat runs """
+    best_time = None
+    predictions = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        predictions = classifier.predict(texts)
+        elapsed = time.perf_counter() - start
+        if best_time is None or elapsed < best_time:
+            best_time = elapsed
+    return predictions, best_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the classifier backends of the cyber feed.")
+    parser.add_argument("--fixtures", default=os.path.join(FIXTURES_DIR, "cyber_items.json"))
+    parser.add_argument("--training-csv", default=os.path.join(FIXTURES_DIR, "final_sample.csv"))
+    parser.add_argument("--backends", default="bart,tfidf,keyword")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    with open(args.fixtures, "r", encoding="utf-8") as fixtures_file:
+        texts = json.load(fixtures_file)
+
+    backends = [backend.strip() for backend in args.backends.split(",") if backend.strip()]
+    # BART is the reference for agreement, so it runs first
+    if "bart" in backends:
+        backends.remove("bart")
+        backends.insert(0, "bart")
+
+    results = []
+    reference = None
+    for backend in backends:
+        classifier, load_seconds = load_backend(backend, texts, args.training_csv)
+        predictions, elapsed = run_backend(classifier, texts, args.repeat)
+        if backend == "bart":
+            reference = predictions
+
+        agreement = None
+        if reference is not None:
+            agreement = sum(a == b for a, b in zip(predictions, reference)) / len(texts)
+
+        results.append({
+            "backend": backend,
+            "items": len(texts),
+            "load_seconds": load_seconds,
+            "seconds": elapsed,
+            "items_per_second": len(texts) / elapsed if elapsed > 0 else None,
+            "agreement_with_bart": agreement,
+            "predictions": predictions,
+        })
+
+    print(f"{'backend':<10}{'items':>8}{'load s':>10}{'seconds':>12}{'items/s':>12}{'agree w/ bart':>16}")
+    for result in results:
+        rate = f"{result['items_per_second']:.1f}" if result['items_per_second'] else "-"
+        agreement = f"{result['agreement_with_bart']:.0%}" if result['agreement_with_bart'] is not None else "n/a"
+        print(f"{result['backend']:<10}{result['items']:>8}{result['load_seconds']:>10.2f}{result['seconds']:>12.4f}"
+              f"{rate:>12}{agreement:>16}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
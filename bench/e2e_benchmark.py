@@ -0,0 +1,248 @@
+#!/usr/bin/python
+
+"""
+Function:
+    1. Serve the recorded hackernews, cyber and afp pages from a local HTTP server, so the whole refresh path
+       can be measured offline and repeatably.
+    2. Time download_html, parse_and_save_news (parse, enrich, store and CSV append) and a full run_spider
+       refresh against it, with the summarizer/classifier stage either stubbed or real.
+    3. Time the ticker's CSV load (full and incremental) on a synthetic final.csv and one monitor sampling tick.
+    4. Report count, throughput and p50/p99 latency per step plus the peak RSS, as a table and as JSON,
+       so a regression shows up when two result files are compared in review.
+
+I/O:
+    1. Input:
+        1.1 The recorded pages in bench/fixtures ('hackernews.html', 'cyber.html', 'afp.html')
+        1.2 A labelled CSV the synthetic final.csv is built from (default: bench/fixtures/final_sample.csv)
+    2. Output:
+        2.1 A table printed to stdout, and the results as JSON if --output is given
+
+Usage:
+    python bench/e2e_benchmark.py [--iterations 20] [--ml stub|real] [--mode cold|warm]
+                                  [--csv-rows 20000] [--output results.json]
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+if __name__ == "__main__" and not __package__:
+    # Make the repository root importable when run as "python bench/e2e_benchmark.py"
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SITES = ["hackernews", "cyber", "afp"]
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(directory):
+    """ Serves directory on a free localhost port; returns the server and its base URL """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=directory))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def summarize_timings(seconds, items=None):
+    """ Returns count, throughput and latency percentiles of a list of durations """
+    from monitoring.history import percentile
+    ordered = sorted(seconds)
+    total = sum(ordered)
+    result = {
+        "count": len(ordered),
+        "total_seconds": total,
+        "ops_per_second": len(ordered) / total if total > 0 else None,
+        "p50_ms": percentile(ordered, 0.50) * 1000 if ordered else None,
+        "p99_ms": percentile(ordered, 0.99) * 1000 if ordered else None,
+        "max_ms": ordered[-1] * 1000 if ordered else None,
+    }
+    if items is not None:
+        result["items"] = items
+        result["items_per_second"] = items / total if total > 0 else None
+    return result
+
+
+def stub_enrich(df):
+    """ Stands in for the summarizer and BART classifier: first sentence as summary, keyword label """
+    from spider.classifiers import KeywordClassifier
+    contents = df['Summary'].fillna('').astype(str).tolist()
+    df['Summary'] = [content.split(". ")[0][:200] for content in contents]
+    df['Final Label'] = KeywordClassifier().predict(contents)
+    return df[['Summary', 'URL', 'Date', 'Final Label']]
+
+
+def use_data_dir(spider_module, data_dir):
+    """ Points the spider's caches and news store at a fresh data directory """
+    for name in ("_news_store", "_inference_cache"):
+        store = getattr(spider_module, name)
+        if store is not None:
+            store.close()
+        setattr(spider_module, name, None)
+    spider_module._http_cache = None
+    os.environ["HOME"] = os.environ["USERPROFILE"] = data_dir
+
+
+def bench_refresh_path(spider_module, base_url, iterations, mode, scratch_dir):
+    """ Times download_html, parse_and_save_news and run_spider against the local server """
+    fetch_seconds, parse_seconds, refresh_seconds = [], [], []
+    parsed_items = 0
+    adapters = {site: spider_module.get_site(site) for site in SITES}
+    original_urls = {site: adapter.url for site, adapter in adapters.items()}
+    for site, adapter in adapters.items():
+        adapter.url = f"{base_url}/{site}.html"
+
+    try:
+        for iteration in range(iterations):
+            if mode == "cold" or iteration == 0:
+                use_data_dir(spider_module, tempfile.mkdtemp(dir=scratch_dir))
+            for site, adapter in adapters.items():
+                start = time.perf_counter()
+                html_content = spider_module.download_html(adapter.url)
+                fetch_seconds.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                count = spider_module.parse_and_save_news(html_content, site)
+                parse_seconds.append(time.perf_counter() - start)
+                parsed_items += count or 0
+
+            if mode == "cold":
+                use_data_dir(spider_module, tempfile.mkdtemp(dir=scratch_dir))
+            start = time.perf_counter()
+            spider_module.run_spider(sites=SITES)
+            refresh_seconds.append(time.perf_counter() - start)
+    finally:
+        for site, adapter in adapters.items():
+            adapter.url = original_urls[site]
+
+    return {
+        "download_html": summarize_timings(fetch_seconds),
+        "parse_and_save_news": summarize_timings(parse_seconds, items=parsed_items),
+        "run_spider": summarize_timings(refresh_seconds),
+    }
+
+
+def bench_csv_load(sample_csv, rows, iterations, scratch_dir):
+    """ Times a full load and an incremental refresh of a final.csv with the given number of rows """
+    import csv
+    from ticker.feed import NewsFeed
+
+    with open(sample_csv, "r", encoding="utf-8", newline="") as sample_file:
+        reader = csv.reader(sample_file)
+        header = next(reader)
+        sample_rows = list(reader)
+    csv_path = os.path.join(scratch_dir, "final.csv")
+    with open(csv_path, "w", encoding="utf-8", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        for index in range(rows):
+            writer.writerow(sample_rows[index % len(sample_rows)])
+
+    load_seconds, refresh_seconds = [], []
+    for _ in range(iterations):
+        feed = NewsFeed(csv_path)
+        start = time.perf_counter()
+        feed.load()
+        load_seconds.append(time.perf_counter() - start)
+
+        # A refresh appending one sample's worth of rows
+        with open(csv_path, "a", encoding="utf-8", newline="") as csv_file:
+            csv.writer(csv_file).writerows(sample_rows)
+        start = time.perf_counter()
+        feed.refresh()
+        refresh_seconds.append(time.perf_counter() - start)
+
+    return {
+        "fetch_news_from_csv_full": summarize_timings(load_seconds, items=rows * iterations),
+        "fetch_news_from_csv_incremental": summarize_timings(refresh_seconds, items=len(sample_rows) * iterations),
+    }
+
+
+def bench_monitor_tick(iterations):
+    """ Times one sampling tick of this process, flat and as a process tree """
+    import psutil
+    from monitoring.sampler import ProcessSampler
+
+    results = {}
+    for name, tree in (("monitor_tick", False), ("monitor_tick_tree", True)):
+        sampler = ProcessSampler([psutil.Process()], tree=tree)
+        sampler.sample()
+        seconds = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            sampler.sample()
+            seconds.append(time.perf_counter() - start)
+        results[name] = summarize_timings(seconds)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the refresh, ticker load and monitor paths.")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--ml", choices=["stub", "real"], default="stub",
+                        help="Stub the summarizer/classifier, or run the configured models")
+    parser.add_argument("--mode", choices=["cold", "warm"], default="cold",
+                        help="cold: fresh caches and store every iteration; warm: 304s and cached parses")
+    parser.add_argument("--csv-rows", type=int, default=20000)
+    parser.add_argument("--sample-csv", default=os.path.join(FIXTURES_DIR, "final_sample.csv"))
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    # All caches, stores and CSVs go to a scratch directory instead of ~/BlackBoomerang
+    scratch_dir = tempfile.mkdtemp(prefix="blackboomerang-bench-")
+    home = {name: os.environ.get(name) for name in ("HOME", "USERPROFILE")}
+    os.environ["HOME"] = os.environ["USERPROFILE"] = scratch_dir
+    server, base_url = start_server(FIXTURES_DIR)
+
+    try:
+        import spider.spider as spider_module
+        from bench.summarizer_benchmark import peak_rss_mb
+        if args.ml == "stub":
+            spider_module.get_site("cyber").enrich = stub_enrich
+
+        results = {}
+        # The spider logs every step; the log lines are not part of the results
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results.update(bench_refresh_path(spider_module, base_url, args.iterations, args.mode, scratch_dir))
+            results.update(bench_csv_load(args.sample_csv, args.csv_rows, max(1, args.iterations // 4), scratch_dir))
+            results.update(bench_monitor_tick(args.iterations * 10))
+        report = {
+            "settings": {"iterations": args.iterations, "ml": args.ml, "mode": args.mode, "csv_rows": args.csv_rows,
+                         "python": sys.version.split()[0], "platform": sys.platform},
+            "benchmarks": results,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    finally:
+        server.shutdown()
+        for name, value in home.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    print(f"{'benchmark':<34}{'count':>7}{'ops/s':>10}{'items/s':>11}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, result in report["benchmarks"].items():
+        items_rate = f"{result['items_per_second']:.0f}" if result.get("items_per_second") else "-"
+        print(f"{name:<34}{result['count']:>7}{result['ops_per_second'] or 0:>10.1f}{items_rate:>11}"
+              f"{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+    print(f"peak RSS: {report['peak_rss_mb']:.0f} MB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/python
+
+"""
+Function:
+    1. Parse the saved HTML fixture of every site with the full-page parser and with the selective fast parser.
+    2. Report the per-page parse time and the peak memory allocated while parsing, and check both modes agree.
+
+I/O:
+    1. Input:
+        1.1 Saved pages in bench/fixtures ('hackernews.html', 'cyber.html', 'afp.html')
+    2. Output:
+        2.1 A table printed to stdout, and optionally the same results as JSON
+
+Usage:
+    python bench/parse_benchmark.py [--repeat 20] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+if __name__ == "__main__" and not __package__:
+    # Make the repository root importable when run as "python bench/parse_benchmark.py"
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from spider.spider import SITE_ADAPTERS, get_url_list, select_news_items
+from spider.sites import FAST_PARSER
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def parse_page(html_content, site, fast):
+    """ Selects the news item elements and extracts the news details, like parse_and_save_news does """
+    url_list = []
+    get_url_list(url_list, select_news_items(html_content, site, fast=fast), site)
+    return url_list
+
+
+def measure(html_content, site, fast, repeat):
+    """ Returns the extracted items, the parse times in ms and the peak traced memory in KiB """
+    times = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        items = parse_page(html_content, site, fast)
+        times.append((time.perf_counter() - start) * 1000)
+
+    # Memory is measured in a separate run, tracing slows parsing down
+    tracemalloc.start()
+    parse_page(html_content, site, fast)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return items, times, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the full and selective HTML parsing modes.")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    for site in SITE_ADAPTERS:
+        fixture_path = os.path.join(args.fixtures, f"{site}.html")
+        if not os.path.exists(fixture_path):
+            print(f"Skipping {site}: {fixture_path} not found")
+            continue
+        with open(fixture_path, "r", encoding="utf-8") as fixture_file:
+            html_content = fixture_file.read()
+
+        full_items, full_times, full_peak = measure(html_content, site, False, args.repeat)
+        fast_items, fast_times, fast_peak = measure(html_content, site, True, args.repeat)
+        for mode, items, times, peak in (("full", full_items, full_times, full_peak),
+                                         ("fast", fast_items, fast_times, fast_peak)):
+            results.append({
+                "site": site,
+                "mode": mode,
+                "parser": FAST_PARSER if mode == "fast" else "html.parser",
+                "page_kib": len(html_content.encode("utf-8")) / 1024,
+                "items": len(items),
+                "mean_ms": statistics.mean(times),
+                "min_ms": min(times),
+                "peak_kib": peak,
+                "matches_full": items == full_items,
+            })
+
+    print(f"{'site':<12}{'mode':<6}{'parser':<13}{'items':>6}{'mean ms':>10}{'min ms':>10}{'peak KiB':>11}{'same':>6}")
+    for result in results:
+        print(f"{result['site']:<12}{result['mode']:<6}{result['parser']:<13}{result['items']:>6}"
+              f"{result['mean_ms']:>10.2f}{result['min_ms']:>10.2f}{result['peak_kib']:>11.0f}"
+              f"{'yes' if result['matches_full'] else 'NO':>6}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/python
+
+"""
+Function:
+    1. Run every summarizer backend ('torch', 'int8', 'onnx') over a local fixture set of Cyber.gov.au style texts,
+       each backend in a fresh process so its peak memory is measured on its own.
+    2. Report model load time, per-batch latency (p50/p95), throughput and peak RSS of each backend.
+    3. Compare the summaries of each backend with the fp32 'torch' ones (exact matches and unigram F1).
+
+I/O:
+    1. Input:
+        1.1 A JSON list of fixture texts (default: bench/fixtures/cyber_items.json)
+    2. Output:
+        2.1 A table printed to stdout, and optionally the same results as JSON
+
+Usage:
+    python bench/summarizer_benchmark.py [--backends torch,int8,onnx] [--threads 4] [--batch-size 8]
+                                         [--repeat 3] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+if __name__ == "__main__" and not __package__:
+    # Make the repository root importable when run as "python bench/summarizer_benchmark.py"
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from monitoring.history import percentile
+from spider.classifiers import tokenize
+from spider.inference import DEFAULT_BATCH_SIZE, SUMMARIZER_BACKENDS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def peak_rss_mb():
+    """ Returns the peak resident memory of this process in MB """
+    try:
+        import resource
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def unigram_f1(candidate, reference):
+    """ Returns the unigram F1 of two texts, a ROUGE-1 style similarity """
+    candidate_tokens = Counter(tokenize(candidate))
+    reference_tokens = Counter(tokenize(reference))
+    overlap = sum((candidate_tokens & reference_tokens).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(candidate_tokens.values())
+    recall = overlap / sum(reference_tokens.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def run_backend(backend, texts, batch_size, num_threads, repeat):
+    """ Loads one backend in this process and times it; returns a result dict """
+    from spider.inference import summarize
+
+    start = time.perf_counter()
+    summaries = summarize(texts[:1], batch_size=1, backend=backend, num_threads=num_threads)
+    load_seconds = time.perf_counter() - start
+
+    batch_seconds = []
+    total_seconds = None
+    for _ in range(max(1, repeat)):
+        run_start = time.perf_counter()
+        summaries = []
+        for batch_start in range(0, len(texts), batch_size):
+            batch = texts[batch_start:batch_start + batch_size]
+            start = time.perf_counter()
+            # No cache, every run infers every text
+            summaries.extend(summarize(batch, batch_size=batch_size, backend=backend, num_threads=num_threads))
+            batch_seconds.append(time.perf_counter() - start)
+        elapsed = time.perf_counter() - run_start
+        if total_seconds is None or elapsed < total_seconds:
+            total_seconds = elapsed
+
+    batch_seconds.sort()
+    return {
+        "backend": backend,
+        "threads": num_threads,
+        "items": len(texts),
+        "load_seconds": load_seconds,
+        "seconds": total_seconds,
+        "items_per_second": len(texts) / total_seconds if total_seconds > 0 else None,
+        "batch_p50_seconds": percentile(batch_seconds, 0.50),
+        "batch_p95_seconds": percentile(batch_seconds, 0.95),
+        "peak_rss_mb": peak_rss_mb(),
+        "summaries": summaries,
+    }
+
+
+def run_backend_process(backend, args):
+    """ Runs one backend in a child process, so model memory of one backend does not count for the next """
+    command = [sys.executable, os.path.abspath(__file__), "--child", backend, "--fixtures", args.fixtures,
+               "--batch-size", str(args.batch_size), "--repeat", str(args.repeat)]
+    if args.threads:
+        command += ["--threads", str(args.threads)]
+    completed = subprocess.run(command, stdout=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        return {"backend": backend, "error": f"exit code {completed.returncode}"}
+    # The child prints its progress first and the JSON result on the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the summarizer backends of the cyber feed.")
+    parser.add_argument("--fixtures", default=os.path.join(FIXTURES_DIR, "cyber_items.json"))
+    parser.add_argument("--backends", default=",".join(SUMMARIZER_BACKENDS))
+    parser.add_argument("--threads", type=int, default=None, help="CPU threads per backend (default: library default)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    with open(args.fixtures, "r", encoding="utf-8") as fixtures_file:
+        texts = json.load(fixtures_file)
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, texts, args.batch_size, args.threads, args.repeat)))
+        return
+
+    backends = [backend.strip() for backend in args.backends.split(",") if backend.strip()]
+    # fp32 is the reference for similarity, so it runs first
+    if "torch" in backends:
+        backends.remove("torch")
+        backends.insert(0, "torch")
+
+    results = []
+    reference = None
+    for backend in backends:
+        result = run_backend_process(backend, args)
+        if "error" not in result:
+            if backend == "torch":
+                reference = result["summaries"]
+            if reference is not None:
+                result["exact_match"] = sum(a == b for a, b in zip(result["summaries"], reference)) / len(texts)
+                result["unigram_f1"] = sum(unigram_f1(a, b) for a, b in zip(result["summaries"], reference)) / len(texts)
+        results.append(result)
+
+    print(f"{'backend':<8}{'load s':>9}{'items/s':>10}{'p50 batch s':>13}{'p95 batch s':>13}{'peak MB':>10}"
+          f"{'exact':>8}{'F1':>7}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['backend']:<8}  failed: {result['error']}")
+            continue
+        exact = f"{result['exact_match']:.0%}" if "exact_match" in result else "n/a"
+        f1 = f"{result['unigram_f1']:.2f}" if "unigram_f1" in result else "n/a"
+        print(f"{result['backend']:<8}{result['load_seconds']:>9.1f}{result['items_per_second']:>10.2f}"
+              f"{result['batch_p50_seconds']:>13.3f}{result['batch_p95_seconds']:>13.3f}{result['peak_rss_mb']:>10.0f}"
+              f"{exact:>8}{f1:>7}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Function:
+    1. Capture one monitor or a region of the screen instead of the whole desktop, so the cost of a
+       capture scales with the captured area.
+    2. On Windows, copy the pixels with GDI straight into a buffer taken from a small pool, so repeated and
+       burst captures reuse the same memory instead of allocating for every shot.
+    3. Elsewhere, use mss when it is installed, which reads the pixels straight from the OS; mss allocates
+       the buffer of every shot itself, so its buffer is handed on as it is rather than copied into the pool.
+       Without mss, fall back to PIL.ImageGrab with a bounding box.
+    4. Decode a frame into an image the encoder keeps, rather than into a new PIL image for every shot.
+
+I/O:
+    1. Input:
+        1.1 A monitor number (0 for all monitors, 1 for the primary one) or a (left, top, width, height) region
+    2. Output:
+        2.1 Frame objects; Frame.to_image() returns a PIL image and Frame.release() returns the buffer to the pool
+"""
+
+import ctypes
+import sys
+import threading
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+# Monitor captured when neither a monitor nor a region is given; mss numbers the primary monitor 1
+DEFAULT_MONITOR = 1
+
+# Buffers kept for reuse: the frames waiting for the encoder plus the one being grabbed and the one being encoded
+DEFAULT_POOL_SIZE = 5
+
+# GDI captures the screen itself on Windows; mss or PIL.ImageGrab are used elsewhere
+USE_GDI = sys.platform == "win32"
+
+
+def list_monitors():
+    """
+    Returns the geometry of the monitors, as mss reports them.
+
+    Returns:
+        list: {'left', 'top', 'width', 'height'} dicts; entry 0 spans all monitors, 1 is the primary one.
+    """
+    if mss is None:
+        raise RuntimeError("Listing the monitors needs the optional mss package")
+    with mss.mss() as screen:
+        return [dict(monitor) for monitor in screen.monitors]
+
+
+class FramePool:
+    """ Keeps the buffers of released frames for the next grabs of the same size """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE):
+        self.size = size
+        self._free = []
+        self._buffer_size = None
+        self._lock = threading.Lock()
+
+    def acquire(self, buffer_size):
+        with self._lock:
+            # The buffers of another size are dropped when the region or monitor layout changes
+            if buffer_size != self._buffer_size:
+                self._free.clear()
+                self._buffer_size = buffer_size
+            if self._free:
+                return self._free.pop()
+        # Only the first shots of a burst, or frames held longer than the pool covers, allocate
+        return bytearray(buffer_size)
+
+    def release(self, buffer):
+        with self._lock:
+            if len(buffer) == self._buffer_size and len(self._free) < self.size:
+                self._free.append(buffer)
+
+
+class Frame:
+    """ A captured frame, either raw top-down BGRA pixels or a PIL image from the fallback grabber """
+
+    def __init__(self, width, height, buffer=None, image=None, pool=None):
+        self.width = width
+        self.height = height
+        self.buffer = buffer
+        self.image = image
+        self._pool = pool
+
+    def to_image(self, into=None):
+        """
+        Returns the frame as an RGB PIL image.
+
+        Args:
+            into (PIL.Image.Image): An RGB image the pixels are decoded into if it has the frame's size,
+                so an encoder can keep one image instead of allocating one per frame.
+
+        Returns:
+            PIL.Image.Image: into, or a new image if into could not be used.
+        """
+        if self.image is not None:
+            return self.image
+        if into is None or into.mode != "RGB" or into.size != (self.width, self.height):
+            from PIL import Image
+            into = Image.new("RGB", (self.width, self.height))
+        into.frombytes(self.buffer, "raw", "BGRX")
+        return into
+
+    def release(self):
+        """ Hands the buffer back to the pool; the frame must not be used afterwards """
+        if self._pool is not None and self.buffer is not None:
+            self._pool.release(self.buffer)
+        self.buffer = None
+        self.image = None
+
+
+class _GdiScreen:
+    """ Copies screen areas into caller buffers with BitBlt and GetDIBits (Windows only) """
+
+    SRCCOPY = 0x00CC0020
+    CAPTUREBLT = 0x40000000
+    DIB_RGB_COLORS = 0
+    BI_RGB = 0
+    SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN = 76, 77, 78, 79
+    SM_CXSCREEN, SM_CYSCREEN = 0, 1
+
+    def __init__(self):
+        from ctypes import wintypes
+
+        class BITMAPINFOHEADER(ctypes.Structure):
+            _fields_ = [("biSize", wintypes.DWORD), ("biWidth", wintypes.LONG), ("biHeight", wintypes.LONG),
+                        ("biPlanes", wintypes.WORD), ("biBitCount", wintypes.WORD),
+                        ("biCompression", wintypes.DWORD), ("biSizeImage", wintypes.DWORD),
+                        ("biXPelsPerMeter", wintypes.LONG), ("biYPelsPerMeter", wintypes.LONG),
+                        ("biClrUsed", wintypes.DWORD), ("biClrImportant", wintypes.DWORD)]
+
+        class BITMAPINFO(ctypes.Structure):
+            _fields_ = [("bmiHeader", BITMAPINFOHEADER), ("bmiColors", wintypes.DWORD * 3)]
+
+        self.user32 = ctypes.WinDLL("user32", use_last_error=True)
+        self.gdi32 = ctypes.WinDLL("gdi32", use_last_error=True)
+        # Handles are pointer-sized; without argtypes ctypes would truncate them to 32 bits
+        self.user32.GetWindowDC.argtypes = [wintypes.HWND]
+        self.user32.GetWindowDC.restype = wintypes.HDC
+        self.user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+        self.user32.GetSystemMetrics.argtypes = [ctypes.c_int]
+        self.gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+        self.gdi32.CreateCompatibleDC.restype = wintypes.HDC
+        self.gdi32.CreateCompatibleBitmap.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int]
+        self.gdi32.CreateCompatibleBitmap.restype = wintypes.HBITMAP
+        self.gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+        self.gdi32.SelectObject.restype = wintypes.HGDIOBJ
+        self.gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+        self.gdi32.DeleteDC.argtypes = [wintypes.HDC]
+        self.gdi32.BitBlt.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                      wintypes.HDC, ctypes.c_int, ctypes.c_int, wintypes.DWORD]
+        self.gdi32.BitBlt.restype = wintypes.BOOL
+        self.gdi32.GetDIBits.argtypes = [wintypes.HDC, wintypes.HBITMAP, wintypes.UINT, wintypes.UINT,
+                                         ctypes.c_void_p, ctypes.POINTER(BITMAPINFO), wintypes.UINT]
+        self.gdi32.GetDIBits.restype = ctypes.c_int
+
+        # Physical pixels rather than the scaled ones of a DPI-unaware process, as mss does
+        try:
+            ctypes.windll.shcore.SetProcessDpiAwareness(2)
+        except (AttributeError, OSError):
+            pass
+
+        self._info = BITMAPINFO()
+        self._info.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        self._info.bmiHeader.biPlanes = 1
+        self._info.bmiHeader.biBitCount = 32
+        self._info.bmiHeader.biCompression = self.BI_RGB
+        self._screen_dc = self.user32.GetWindowDC(None)
+        self._memory_dc = self.gdi32.CreateCompatibleDC(self._screen_dc)
+        self._bitmap = None
+        self._size = None
+
+    def area(self, monitor):
+        """ Returns the (left, top, width, height) of all monitors (0) or the primary one (1) """
+        metrics = self.user32.GetSystemMetrics
+        if monitor == 0:
+            return (metrics(self.SM_XVIRTUALSCREEN), metrics(self.SM_YVIRTUALSCREEN),
+                    metrics(self.SM_CXVIRTUALSCREEN), metrics(self.SM_CYVIRTUALSCREEN))
+        return 0, 0, metrics(self.SM_CXSCREEN), metrics(self.SM_CYSCREEN)
+
+    def grab_into(self, buffer, left, top, width, height):
+        """ Copies the area into buffer as top-down BGRA rows; buffer must hold width * height * 4 bytes """
+        if self._size != (width, height):
+            # The bitmap is only recreated when the captured size changes
+            if self._bitmap is not None:
+                self.gdi32.DeleteObject(self._bitmap)
+            self._bitmap = self.gdi32.CreateCompatibleBitmap(self._screen_dc, width, height)
+            self.gdi32.SelectObject(self._memory_dc, self._bitmap)
+            self._info.bmiHeader.biWidth = width
+            # A negative height asks for top-down rows, the order PIL reads
+            self._info.bmiHeader.biHeight = -height
+            self._size = (width, height)
+        if not self.gdi32.BitBlt(self._memory_dc, 0, 0, width, height, self._screen_dc, left, top,
+                                 self.SRCCOPY | self.CAPTUREBLT):
+            raise ctypes.WinError(ctypes.get_last_error())
+        view = (ctypes.c_char * len(buffer)).from_buffer(buffer)
+        if self.gdi32.GetDIBits(self._memory_dc, self._bitmap, 0, height, view, ctypes.byref(self._info),
+                                self.DIB_RGB_COLORS) != height:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+
+class FrameGrabber:
+    def __init__(self, monitor=DEFAULT_MONITOR, region=None, pool_size=DEFAULT_POOL_SIZE):
+        """
+        Args:
+            monitor (int): Monitor to capture, 0 for all of them; ignored when a region is given.
+            region (tuple): (left, top, width, height) in screen coordinates.
+            pool_size (int): Number of frame buffers kept for reuse.
+        """
+        self.monitor = monitor
+        self.region = region
+        self.pool = FramePool(pool_size)
+        # GDI device contexts and mss handles are kept per thread
+        self._local = threading.local()
+
+    @property
+    def backend(self):
+        if USE_GDI:
+            return "gdi"
+        return "mss" if mss is not None else "PIL.ImageGrab"
+
+    def _screen(self):
+        screen = getattr(self._local, "screen", None)
+        if screen is None:
+            screen = self._local.screen = mss.mss()
+        return screen
+
+    def _gdi(self):
+        gdi = getattr(self._local, "gdi", None)
+        if gdi is None:
+            gdi = self._local.gdi = _GdiScreen()
+        return gdi
+
+    def _area(self, screen):
+        if self.region is not None:
+            left, top, width, height = self.region
+            return {'left': left, 'top': top, 'width': width, 'height': height}
+        if not 0 <= self.monitor < len(screen.monitors):
+            raise ValueError(f"No monitor {self.monitor}, there are {len(screen.monitors) - 1}")
+        return screen.monitors[self.monitor]
+
+    def grab(self):
+        """
+        Captures the configured monitor or region.
+
+        Returns:
+            Frame: The captured frame; call release() once it has been saved.
+        """
+        if USE_GDI:
+            return self._grab_gdi()
+        if mss is None:
+            return self._grab_fallback()
+
+        shot = self._screen().grab(self._area(self._screen()))
+        width, height = shot.size
+        # shot.raw was allocated by mss for this shot, so it is handed on rather than copied into the pool
+        return Frame(width, height, buffer=shot.raw)
+
+    def _grab_gdi(self):
+        gdi = self._gdi()
+        if self.region is not None:
+            left, top, width, height = self.region
+        elif self.monitor in (0, 1):
+            left, top, width, height = gdi.area(self.monitor)
+        elif mss is not None:
+            area = self._area(self._screen())
+            left, top, width, height = area['left'], area['top'], area['width'], area['height']
+        else:
+            raise ValueError("Capturing a secondary monitor needs the optional mss package")
+        buffer = self.pool.acquire(width * height * 4)
+        try:
+            gdi.grab_into(buffer, left, top, width, height)
+        except Exception:
+            self.pool.release(buffer)
+            raise
+        return Frame(width, height, buffer=buffer, pool=self.pool)
+
+    def _grab_fallback(self):
+        from PIL import ImageGrab
+        if self.region is not None:
+            left, top, width, height = self.region
+            image = ImageGrab.grab(bbox=(left, top, left + width, top + height), all_screens=True)
+        elif self.monitor in (0, 1):
+            image = ImageGrab.grab(all_screens=self.monitor == 0)
+        else:
+            raise ValueError("Capturing a secondary monitor needs the optional mss package")
+        return Frame(image.width, image.height, image=image)
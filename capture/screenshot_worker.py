@@ -0,0 +1,240 @@
+"""
+Function:
+    1. Take screenshots off the Tk thread: a grabber thread captures the frames and an encoder thread
+       compresses and writes them, so a click never blocks the ticker.
+    2. Save in a configurable format; PNG uses a low compression level by default, which encodes several
+       times faster than Pillow's default level 6 for a modestly larger file.
+    3. Take bursts of frames at a fixed interval, with a bounded queue between grabbing and encoding, so
+       a burst of 4K frames cannot pile up in memory while the encoder catches up.
+    4. Report one completion per request on a queue the UI polls, including the requests stop() cancels.
+
+I/O:
+    1. Input:
+        1.1 Capture requests (number of frames, seconds between frames)
+    2. Output:
+        2.1 Image files in the save folder
+        2.2 One completion dict per request, put on ScreenshotWorker.completed; 'cancelled' is True for
+            a request stop() cancelled before all of its frames were taken
+"""
+
+import datetime
+import itertools
+import os
+import queue
+import threading
+import time
+
+from capture.grabber import Frame, FrameGrabber
+
+DEFAULT_FORMAT = "png"
+
+# Keyword arguments passed to Image.save for each format
+SAVE_OPTIONS = {
+    "png": {"compress_level": 1},
+    "jpeg": {"quality": 90},
+    "bmp": {},
+}
+FILE_EXTENSIONS = {"png": "png", "jpeg": "jpg", "bmp": "bmp"}
+
+DEFAULT_BURST_FRAMES = 5
+DEFAULT_BURST_INTERVAL = 0.2
+
+# Frames grabbed but not written yet; the grabber waits once the encoder is this far behind
+DEFAULT_FRAME_QUEUE_SIZE = 3
+
+# Requests waiting for the grabber; further clicks are refused until it catches up
+DEFAULT_REQUEST_QUEUE_SIZE = 4
+
+
+class ScreenshotWorker:
+    def __init__(self, save_folder, image_format=DEFAULT_FORMAT, grab=None,
+                 frame_queue_size=DEFAULT_FRAME_QUEUE_SIZE, request_queue_size=DEFAULT_REQUEST_QUEUE_SIZE):
+        """
+        Args:
+            save_folder (str): Directory the screenshots are written to.
+            image_format (str): One of SAVE_OPTIONS.
+            grab (callable): Function returning the frame as a capture.grabber.Frame or a PIL image,
+                defaults to grabbing the primary monitor with a FrameGrabber.
+            frame_queue_size (int): Maximum number of frames waiting for the encoder.
+            request_queue_size (int): Maximum number of requests waiting for the grabber.
+        """
+        if image_format not in SAVE_OPTIONS:
+            raise ValueError(f"Unknown screenshot format: {image_format}")
+        self.save_folder = save_folder
+        self.image_format = image_format
+        self.grab = grab or FrameGrabber(pool_size=frame_queue_size + 2).grab
+        self.requests = queue.Queue(maxsize=request_queue_size)
+        self.frames = queue.Queue(maxsize=frame_queue_size)
+        self.completed = queue.Queue()
+        self._request_ids = itertools.count(1)
+        self._stop_event = threading.Event()
+        self._threads = []
+        # The image raw frames are decoded into, kept by the encoder thread from one frame to the next
+        self._image = None
+
+    def start(self):
+        """ Start the grabber and encoder daemon threads """
+        if self._threads:
+            return
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._grab_loop, name="screenshot-grabber", daemon=True),
+            threading.Thread(target=self._encode_loop, name="screenshot-encoder", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """
+        Stop after the current frame; frames already grabbed are still written.
+
+        Requests still waiting for the grabber are cancelled: each gets a completion with 'cancelled' set,
+        so a caller waiting on one is not left hanging.
+        """
+        self._stop_event.set()
+        while True:
+            self._cancel_waiting()
+            try:
+                self.requests.put_nowait(None)
+                return
+            except queue.Full:
+                pass
+
+    def _cancel_waiting(self):
+        while True:
+            try:
+                request = self.requests.get_nowait()
+            except queue.Empty:
+                return
+            if request is not None:
+                self._cancel(request[0])
+
+    def _cancel(self, request_id):
+        completion = self._new_completion(request_id)
+        completion['cancelled'] = True
+        self.completed.put(completion)
+
+    @staticmethod
+    def _new_completion(request_id):
+        return {'id': request_id, 'paths': [], 'errors': [], 'grab_seconds': 0.0, 'encode_seconds': 0.0,
+                'cancelled': False}
+
+    def request(self, frames=1, interval=0.0, grab=None):
+        """
+        Queues a capture without waiting for it.
+
+        Args:
+            frames (int): Number of frames to take.
+            interval (float): Seconds between two frames.
+            grab (callable): Grab function for this request only, e.g. a FrameGrabber of another region.
+
+        Returns:
+            int: The id of the request, reported back in its completion, or None if the queue is full
+                or the worker is stopped.
+        """
+        if self._stop_event.is_set():
+            return None
+        request_id = next(self._request_ids)
+        try:
+            self.requests.put_nowait((request_id, frames, interval, grab or self.grab))
+        except queue.Full:
+            return None
+        return request_id
+
+    def burst(self, frames=DEFAULT_BURST_FRAMES, interval=DEFAULT_BURST_INTERVAL):
+        """ Queues a burst of frames, see request() """
+        return self.request(frames, interval)
+
+    def _file_path(self, timestamp, index, count):
+        suffix = f"_{index + 1:02d}" if count > 1 else ""
+        return os.path.join(self.save_folder,
+                            f"screenshot_{timestamp}{suffix}.{FILE_EXTENSIONS[self.image_format]}")
+
+    def _grab_loop(self):
+        last_timestamp, same_second = None, 1
+        while True:
+            request = self.requests.get()
+            if request is None or self._stop_event.is_set():
+                # Requests taken or still queued after stop() was called are cancelled, not dropped
+                if request is not None:
+                    self._cancel(request[0])
+                self._cancel_waiting()
+                self.frames.put(None)
+                return
+            request_id, count, interval, grab = request
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Requests queued within the same second must not overwrite each other's files
+            if timestamp == last_timestamp:
+                same_second += 1
+                timestamp = f"{last_timestamp}-{same_second}"
+            else:
+                last_timestamp, same_second = timestamp, 1
+            next_frame = time.monotonic()
+            for index in range(count):
+                # The remaining frames of a burst are skipped on stop, the completion still goes out
+                if self._stop_event.wait(max(0.0, next_frame - time.monotonic())):
+                    self.frames.put((request_id, index, count, None, None, 0.0, None))
+                    break
+                start = time.perf_counter()
+                try:
+                    image, error = grab(), None
+                except Exception as e:
+                    image, error = None, e
+                # Blocks while the encoder is behind, which bounds the frames held in memory
+                self.frames.put((request_id, index, count, image, self._file_path(timestamp, index, count),
+                                 time.perf_counter() - start, error))
+                next_frame += interval
+
+    def _save(self, frame, file_path):
+        try:
+            if isinstance(frame, Frame):
+                image = frame.to_image(self._image)
+                if frame.buffer is not None:
+                    self._image = image
+            else:
+                image = frame
+            if self.image_format == "jpeg" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(file_path, format=self.image_format.upper(), **SAVE_OPTIONS[self.image_format])
+        finally:
+            # A pooled buffer is reused by the grabber as soon as it is written
+            if isinstance(frame, Frame):
+                frame.release()
+
+    def _encode_loop(self):
+        pending = {}
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                return
+            request_id, index, count, image, file_path, grab_seconds, error = frame
+            completion = pending.get(request_id)
+            if completion is None:
+                completion = pending[request_id] = self._new_completion(request_id)
+            completion['grab_seconds'] += grab_seconds
+
+            if error is not None:
+                completion['errors'].append(str(error))
+            elif image is not None:
+                start = time.perf_counter()
+                try:
+                    self._save(image, file_path)
+                    completion['paths'].append(file_path)
+                except Exception as e:
+                    completion['errors'].append(f"{file_path}: {e}")
+                completion['encode_seconds'] += time.perf_counter() - start
+
+            if image is None and error is None:
+                # The rest of the burst was skipped on stop
+                completion['cancelled'] = True
+            if index == count - 1 or completion['cancelled']:
+                self.completed.put(pending.pop(request_id))
+
+    def drain(self):
+        """ Returns all completions waiting on the queue, oldest first """
+        completions = []
+        while True:
+            try:
+                completions.append(self.completed.get_nowait())
+            except queue.Empty:
+                return completions
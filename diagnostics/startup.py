@@ -0,0 +1,101 @@
+"""
+Function:
+    1. Time the cold start of a GUI tool phase by phase (imports, window creation, first load, ...).
+    2. Keep phases that wait on the user, such as a folder dialog, out of the startup budget.
+    3. Report the breakdown once the window is ready, together with the time the process spent before
+       Python reached the first import (e.g. the PyInstaller bootloader unpacking the bundle).
+
+I/O:
+    1. Input:
+        1.1 Phase names, timed with StartupTimer.phase() or StartupTimer.mark()
+    2. Output:
+        2.1 The startup report (list of str), printed by StartupTimer.finish()
+"""
+
+import datetime
+import os
+import time
+from contextlib import contextmanager
+
+# Seconds from process start until the ticker is visible, excluding phases that wait on the user
+DEFAULT_BUDGET_SECONDS = 2.0
+
+
+def _process_age():
+    """ Seconds since the OS started this process, or None if psutil is not available """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return time.time() - psutil.Process(os.getpid()).create_time()
+
+
+class StartupTimer:
+    def __init__(self, budget_seconds=DEFAULT_BUDGET_SECONDS):
+        """
+        Args:
+            budget_seconds (float): Target time from process start until finish() is called.
+        """
+        self.budget_seconds = budget_seconds
+        self.started = time.perf_counter()
+        self._last_mark = self.started
+        # (name, seconds, counted against the budget)
+        self.phases = []
+        self.finished = None
+
+    @contextmanager
+    def phase(self, name, counted=True):
+        """
+        Times the enclosed block as one phase.
+
+        Args:
+            name (str): Name of the phase in the report.
+            counted (bool): False for phases that wait on the user.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.phases.append((name, end - start, counted))
+            self._last_mark = end
+
+    def mark(self, name, counted=True):
+        """ Records the time since the previous phase or mark as a phase """
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last_mark, counted))
+        self._last_mark = now
+
+    def report(self):
+        """
+        Returns the startup breakdown.
+
+        Returns:
+            list: One line per phase, then the totals and the budget check.
+        """
+        end = self.finished if self.finished is not None else time.perf_counter()
+        total = end - self.started
+        waiting = sum(seconds for _, seconds, counted in self.phases if not counted)
+        lines = [f"  {name:<28}{seconds * 1000:>9.1f} ms" + ("" if counted else "  (waiting on the user)")
+                 for name, seconds, counted in self.phases]
+        lines.append(f"  {'total since first import':<28}{total * 1000:>9.1f} ms")
+
+        startup = total - waiting
+        process_age = _process_age()
+        if process_age is not None:
+            # Time before the first import, e.g. the PyInstaller bootloader and interpreter start-up
+            before_python = process_age - (time.perf_counter() - self.started)
+            lines.append(f"  {'before first import':<28}{before_python * 1000:>9.1f} ms")
+            startup += before_python
+        verdict = "within" if startup <= self.budget_seconds else "over"
+        lines.append(f"  startup {startup:.2f} s excluding user input, {verdict} the {self.budget_seconds:.1f} s budget")
+        return lines
+
+    def finish(self, name="ready"):
+        """ Records the last phase and prints the report """
+        self.mark(name)
+        self.finished = self._last_mark
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{timestamp}: Startup timing:")
+        for line in self.report():
+            print(line)
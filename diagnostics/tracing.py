@@ -0,0 +1,368 @@
+"""
+Function:
+    1. Time named spans (fetch, parse, inference, CSV writes, ticker frames, monitor ticks) and write one
+       JSON object per span to a JSON-lines file, on a background thread so a traced call never waits on disk.
+    2. Cost next to nothing while tracing is off: span() returns a shared no-op object and record() returns
+       at once. Tracing is on when the BLACKBOOMERANG_TRACE environment variable names the output file,
+       or after enable().
+    3. Profile on demand with a sampling profiler: toggle it around a slow UI stretch, or request that the
+       next refresh be profiled. The samples are written as folded stacks (flame graph input) and the
+       hottest functions are printed.
+
+I/O:
+    1. Input:
+        1.1 Spans and timings from the instrumented code
+    2. Output:
+        2.1 A JSON-lines trace file, one {"ts", "name", "ms", "thread", "pid", ...} object per span
+        2.2 Folded-stack profiles in the BlackBoomerang 'profiles' directory
+
+Usage:
+    BLACKBOOMERANG_TRACE=~/BlackBoomerang/trace.jsonl python ScreenshotTool.py
+    kill -USR1 <pid>    # start, then stop and save, a profile of every thread (POSIX only)
+"""
+
+import datetime
+import json
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Environment variable naming the trace file; tracing starts at import when it is set
+TRACE_ENV = "BLACKBOOMERANG_TRACE"
+
+DEFAULT_PROFILE_DIR = os.path.join(os.path.expanduser("~"), "BlackBoomerang", "profiles")
+
+# Seconds between two stack samples of the profiler
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Functions printed when a profile is saved
+DEFAULT_TOP_FUNCTIONS = 15
+
+_STOP = object()
+
+
+class _NullSpan:
+    """ The span handed out while tracing is off; entering, leaving and setting attributes do nothing """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self._wall = None
+        self._start = None
+
+    def __enter__(self):
+        self._wall = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self._start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.emit(self.name, self._wall, seconds, self.attrs)
+        return False
+
+    def set(self, **attrs):
+        """ Adds attributes known only inside the span, e.g. a status code or an item count """
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    def __init__(self, path):
+        """
+        Args:
+            path (str): The JSON-lines file spans are appended to.
+        """
+        self.path = path
+        self.pid = os.getpid()
+        self._queue = queue.SimpleQueue()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._write, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def emit(self, name, wall, seconds, attrs):
+        # Only a queue put on the traced thread; formatting and writing happen on the writer thread
+        self._queue.put((name, wall, seconds, threading.current_thread().name, attrs))
+
+    def _write(self):
+        while True:
+            entries = [self._queue.get()]
+            # Write everything queued in one go, then flush once
+            while True:
+                try:
+                    entries.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            stopping = False
+            for entry in entries:
+                if entry is _STOP:
+                    stopping = True
+                    continue
+                name, wall, seconds, thread, attrs = entry
+                record = {"ts": round(wall, 6), "name": name, "ms": round(seconds * 1000, 3),
+                          "thread": thread, "pid": self.pid}
+                record.update(attrs)
+                lines.append(json.dumps(record, default=str) + "\n")
+            try:
+                self._file.writelines(lines)
+                self._file.flush()
+            except (OSError, ValueError):
+                pass
+            if stopping:
+                self._file.close()
+                return
+
+    def close(self):
+        """ Writes the pending spans and closes the file """
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5.0)
+
+
+_tracer = None
+
+
+def enable(path=None):
+    """
+    Starts writing spans to path (default: the file named by BLACKBOOMERANG_TRACE).
+
+    Returns:
+        Tracer: The active tracer.
+    """
+    global _tracer
+    path = os.path.expanduser(path or os.environ[TRACE_ENV])
+    if _tracer is not None:
+        if _tracer.path == path:
+            return _tracer
+        disable()
+    _tracer = Tracer(path)
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{timestamp}: Tracing to {path}")
+    return _tracer
+
+
+def disable():
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+
+
+def is_enabled():
+    return _tracer is not None
+
+
+def span(name, **attrs):
+    """
+    Returns a context manager timing its block as one span.
+
+    Args:
+        name (str): The span name, e.g. 'fetch' or 'inference.summarize'.
+        **attrs: Attributes written with the span.
+
+    Returns:
+        Span: The span, or a shared no-op span while tracing is off.
+    """
+    if _tracer is None:
+        return _NULL_SPAN
+    return Span(_tracer, name, attrs)
+
+
+def record(name, seconds, **attrs):
+    """ Writes a span for a duration measured by the caller, e.g. a ticker frame """
+    if _tracer is None:
+        return
+    _tracer.emit(name, time.time() - seconds, seconds, attrs)
+
+
+class SamplingProfiler:
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL, thread_ids=None):
+        """
+        Args:
+            interval (float): Seconds between two stack samples.
+            thread_ids (list): Idents of the threads to sample, defaults to every thread.
+        """
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.stacks = Counter()
+        self.samples = 0
+        self.started = None
+        self.seconds = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            for thread_ident, frame in sys._current_frames().items():
+                if thread_ident == own_ident or (self.thread_ids is not None and thread_ident not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    name = names.get(code)
+                    if name is None:
+                        name = names[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    stack.append(name)
+                    frame = frame.f_back
+                stack.reverse()
+                self.stacks[tuple(stack)] += 1
+            self.samples += 1
+
+    def top(self, limit=DEFAULT_TOP_FUNCTIONS):
+        """
+        Returns the functions seen in the most samples.
+
+        Returns:
+            list: (function, inclusive samples, self samples) tuples, most inclusive samples first.
+        """
+        inclusive = Counter()
+        exclusive = Counter()
+        for stack, count in self.stacks.items():
+            for function in set(stack):
+                inclusive[function] += count
+            exclusive[stack[-1]] += count
+        return [(function, count, exclusive[function]) for function, count in inclusive.most_common(limit)]
+
+    def dump(self, path):
+        """ Writes the samples as folded stacks, one 'root;...;leaf count' line per distinct stack """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as profile_file:
+            for stack, count in self.stacks.most_common():
+                profile_file.write(f"{';'.join(stack)} {count}\n")
+        return path
+
+
+_profiler = None
+_profile_name = None
+_profile_lock = threading.Lock()
+_requested_profiles = set()
+
+
+def start_profile(name="ui", thread_ids=None, interval=DEFAULT_SAMPLE_INTERVAL):
+    """
+    Starts the sampling profiler, unless it is already running.
+
+    Args:
+        name (str): Name of the profile file.
+        thread_ids (list): Idents of the threads to sample, defaults to every thread.
+        interval (float): Seconds between two stack samples.
+
+    Returns:
+        bool: True if the profiler was started.
+    """
+    global _profiler, _profile_name
+    with _profile_lock:
+        if _profiler is not None:
+            return False
+        _profiler = SamplingProfiler(interval, thread_ids).start()
+        _profile_name = name
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{timestamp}: Profiling '{name}'...")
+    return True
+
+
+def stop_profile(profile_dir=DEFAULT_PROFILE_DIR):
+    """
+    Stops the sampling profiler, saves its samples and prints the hottest functions.
+
+    Returns:
+        str: Path of the folded-stack file, or None if the profiler was not running.
+    """
+    global _profiler, _profile_name
+    with _profile_lock:
+        profiler, name = _profiler, _profile_name
+        _profiler = _profile_name = None
+    if profiler is None:
+        return None
+    profiler.stop()
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = profiler.dump(os.path.join(profile_dir, f"{name}-{stamp}.folded"))
+
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{timestamp}: Profile '{name}': {profiler.samples} samples over {profiler.seconds:.1f} s saved to {path}")
+    print(f"    {'samples':>8} {'self':>8}  function")
+    for function, count, self_count in profiler.top():
+        print(f"    {count:>8} {self_count:>8}  {function}")
+    record("profile", profiler.seconds, profile=name, path=path, samples=profiler.samples)
+    return path
+
+
+def is_profiling():
+    return _profiler is not None
+
+
+def toggle_profile(name="ui", thread_ids=None):
+    """ Starts the profiler, or stops it and returns the path of the saved profile """
+    if start_profile(name, thread_ids):
+        return None
+    return stop_profile()
+
+
+def request_profile(name):
+    """ Profiles the next block run under profile_if_requested(name), e.g. the next refresh """
+    _requested_profiles.add(name)
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{timestamp}: The next '{name}' will be profiled.")
+
+
+@contextmanager
+def profile_if_requested(name):
+    """ Profiles the enclosed block if request_profile(name) was called since the last time """
+    if name not in _requested_profiles or not start_profile(name):
+        yield
+        return
+    _requested_profiles.discard(name)
+    try:
+        yield
+    finally:
+        stop_profile()
+
+
+def install_signal_toggle(signum=None):
+    """ Toggles a profile of every thread on SIGUSR1 (POSIX only); returns False where there is no such signal """
+    signum = signum if signum is not None else getattr(signal, "SIGUSR1", None)
+    if signum is None:
+        return False
+    # stop_profile() joins the sampler thread and writes a file, so it runs off the interrupted thread
+    signal.signal(signum, lambda *_: threading.Thread(target=toggle_profile, args=("signal",), daemon=True).start())
+    return True
+
+
+if os.environ.get(TRACE_ENV):
+    enable()
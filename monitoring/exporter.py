@@ -0,0 +1,258 @@
+#!/usr/bin/python
+
+"""
+Function:
+    1. Monitor processes without a GUI, using the same psutil sampling code as the Tk monitors.
+    2. Append every sample to line-protocol files, rotated by size.
+    3. Serve the latest values as a Prometheus-style text endpoint on localhost for a local collector.
+    4. Report the sampling cost and the export latency as metrics of their own.
+
+I/O:
+    1. Input:
+        1.1 Names of the processes to monitor (list of str)
+    2. Output:
+        2.1 'metrics.lp' (plus rotated 'metrics.lp.1' ... backups) in the output directory
+        2.2 http://127.0.0.1:<port>/metrics
+
+Usage:
+    python -m monitoring.exporter [--process ScreenshotTool --process MonitorMemory] [--interval 2]
+                                  [--port 9464] [--output-dir ~/BlackBoomerang/metrics]
+"""
+
+import argparse
+import datetime
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from monitoring.process_index import ProcessIndex
+from monitoring.sampler import DEFAULT_INTERVAL, ProcessSampler
+
+DEFAULT_PROCESS_NAMES = ["ScreenshotTool", "MonitorMemory"]
+DEFAULT_PORT = 9464
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.expanduser("~"), "BlackBoomerang", "metrics")
+# Rotate the line-protocol file once it reaches this size, keeping this many old files
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+MEASUREMENT = "blackboomerang_process"
+
+
+def _escape_tag(value):
+    return str(value).replace("\\", "\\\\").replace(",", "\\,").replace("=", "\\=").replace(" ", "\\ ")
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class LineProtocolWriter:
+    """ Appends InfluxDB line-protocol records to a file, rotating it by size """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def write(self, lines):
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._rotate()
+        self._file.write("".join(line + "\n" for line in lines))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class MetricsExporter:
+    def __init__(self, process_names=None, interval=DEFAULT_INTERVAL, output_dir=DEFAULT_OUTPUT_DIR,
+                 port=DEFAULT_PORT, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT, tree=False):
+        """
+        Args:
+            process_names (list): Names of the processes to monitor.
+            interval (float): Seconds between two samples.
+            output_dir (str): Directory of the line-protocol files, or None to disable them.
+            port (int): Port of the metrics endpoint on 127.0.0.1, or 0 to disable it.
+            max_bytes (int): Size at which the line-protocol file is rotated.
+            backup_count (int): Number of rotated files kept.
+            tree (bool): Aggregate the child processes too and export USS/PSS.
+        """
+        self.process_names = list(process_names or DEFAULT_PROCESS_NAMES)
+        self.interval = interval
+        self.port = port
+        self.index = ProcessIndex()
+        # One sampler per name, each following the PIDs the index reports for its name
+        self.samplers = {name: ProcessSampler([], interval, find_pids=self._pids_finder(name), tree=tree)
+                         for name in self.process_names}
+        self.writer = LineProtocolWriter(os.path.join(output_dir, "metrics.lp"), max_bytes, backup_count) if output_dir else None
+
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._samples_total = 0
+        self._sample_seconds = 0.0
+        self._export_seconds = 0.0
+        self._stop_event = threading.Event()
+        self._server = None
+
+    def _pids_finder(self, name):
+        return lambda: self.index.pids(name)
+
+    def tick(self):
+        """ Samples every watched name once and exports the results """
+        start = time.perf_counter()
+        self.index.refresh()
+        samples = {name: sampler.sample() for name, sampler in self.samplers.items()}
+        sample_seconds = time.perf_counter() - start
+
+        export_start = time.perf_counter()
+        if self.writer is not None:
+            timestamp_ns = time.time_ns()
+            lines = []
+            for name, sample in samples.items():
+                fields = (f"up={'true' if sample['pids'] else 'false'},processes={len(sample['pids'])}i,"
+                          f"memory_bytes={int(sample['memory_mb'] * 1024 * 1024)}i,cpu_percent={sample['cpu_percent']:.3f}")
+                for key in ('uss', 'pss'):
+                    if sample[f'{key}_mb'] is not None:
+                        fields += f",{key}_bytes={int(sample[f'{key}_mb'] * 1024 * 1024)}i"
+                fields += f",sample_seconds={sample_seconds:.6f},export_seconds={self._export_seconds:.6f}"
+                lines.append(f"{MEASUREMENT},process={_escape_tag(name)} {fields} {timestamp_ns}")
+            self.writer.write(lines)
+        export_seconds = time.perf_counter() - export_start
+
+        with self._lock:
+            self._latest = samples
+            self._samples_total += 1
+            self._sample_seconds = sample_seconds
+            self._export_seconds = export_seconds
+        return samples
+
+    def render_prometheus(self):
+        """ Returns the latest values in the Prometheus text exposition format """
+        with self._lock:
+            latest = dict(self._latest)
+            samples_total = self._samples_total
+            sample_seconds = self._sample_seconds
+            export_seconds = self._export_seconds
+
+        render_start = time.perf_counter()
+        lines = []
+
+        def metric(name, metric_type, help_text, values):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in values:
+                label_text = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        metric(f"{MEASUREMENT}_up", "gauge", "1 if at least one process runs under the name.",
+               [({"process": name}, 1 if sample['pids'] else 0) for name, sample in latest.items()])
+        metric("blackboomerang_processes", "gauge", "Number of processes running under the name.",
+               [({"process": name}, len(sample['pids'])) for name, sample in latest.items()])
+        metric(f"{MEASUREMENT}_resident_memory_bytes", "gauge", "Total resident memory of the processes.",
+               [({"process": name}, int(sample['memory_mb'] * 1024 * 1024)) for name, sample in latest.items()])
+        for key, help_text in (('uss', "Total unique memory of the process trees."),
+                               ('pss', "Total proportional memory of the process trees.")):
+            values = [({"process": name}, int(sample[f'{key}_mb'] * 1024 * 1024))
+                      for name, sample in latest.items() if sample[f'{key}_mb'] is not None]
+            if values:
+                metric(f"{MEASUREMENT}_{key}_memory_bytes", "gauge", help_text, values)
+        metric(f"{MEASUREMENT}_cpu_percent", "gauge", "Total CPU usage of the processes since the previous sample.",
+               [({"process": name}, f"{sample['cpu_percent']:.3f}") for name, sample in latest.items()])
+        metric("blackboomerang_monitor_samples_total", "counter", "Number of sampling ticks.", [({}, samples_total)])
+        metric("blackboomerang_monitor_sample_seconds", "gauge", "Time spent reading psutil in the last tick.",
+               [({}, f"{sample_seconds:.6f}")])
+        metric("blackboomerang_monitor_export_seconds", "gauge", "Time spent writing the last tick to the line-protocol file.",
+               [({}, f"{export_seconds:.6f}")])
+        metric("blackboomerang_monitor_render_seconds", "gauge", "Time spent rendering this response.",
+               [({}, f"{time.perf_counter() - render_start:.6f}")])
+        return "\n".join(lines) + "\n"
+
+    def _start_server(self):
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = exporter.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes are too frequent to log
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), MetricsHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-endpoint", daemon=True).start()
+
+    def run(self):
+        """ Samples at a fixed cadence until stop() is called or the process is interrupted """
+        if self.port:
+            self._start_server()
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{timestamp}: Exporting metrics for {', '.join(self.process_names)}"
+              + (f" on http://127.0.0.1:{self.port}/metrics" if self.port else "")
+              + (f" to {self.writer.path}" if self.writer else ""))
+
+        next_tick = time.monotonic()
+        try:
+            while not self._stop_event.wait(max(0.0, next_tick - time.monotonic())):
+                self.tick()
+                next_tick += self.interval
+                if next_tick < time.monotonic():
+                    next_tick = time.monotonic() + self.interval
+        except KeyboardInterrupt:
+            print("Monitoring stopped.")
+        finally:
+            self.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export process metrics without a GUI.")
+    parser.add_argument("--process", action="append", dest="process_names",
+                        help=f"Process name to monitor, may be repeated (default: {', '.join(DEFAULT_PROCESS_NAMES)})")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="0 disables the metrics endpoint")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="'' disables the line-protocol files")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES)
+    parser.add_argument("--backups", type=int, default=DEFAULT_BACKUP_COUNT)
+    parser.add_argument("--tree", action="store_true", help="Aggregate child processes and export USS/PSS")
+    args = parser.parse_args(argv)
+
+    exporter = MetricsExporter(args.process_names, args.interval, args.output_dir or None,
+                               args.port, args.max_bytes, args.backups, tree=args.tree)
+    exporter.run()
+
+
+if __name__ == "__main__":
+    main()
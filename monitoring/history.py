@@ -0,0 +1,166 @@
+"""
+Function:
+    1. Keep the recent history of memory/CPU samples in fixed-size, array-backed ring buffers.
+    2. Fold older samples into per-minute aggregates, so a week of history fits in a fixed amount of memory.
+    3. Compute min/max/percentile rollups over several time windows.
+
+I/O:
+    1. Input:
+        1.1 Sample dicts from monitoring.sampler.ProcessSampler
+    2. Output:
+        2.1 Rollups per window: {window: {series: {'min', 'max', 'p50', 'p95', 'count'}}}
+"""
+
+import math
+from array import array
+
+# Raw samples kept: one hour at the 2 second sampling interval
+DEFAULT_RAW_CAPACITY = 1800
+
+# Per-minute aggregates kept: seven days
+DEFAULT_MINUTE_CAPACITY = 7 * 24 * 60
+
+# Rollup windows in seconds, with the label they are reported under
+DEFAULT_WINDOWS = [("1m", 60), ("15m", 15 * 60), ("1h", 60 * 60), ("24h", 24 * 60 * 60), ("7d", 7 * 24 * 60 * 60)]
+
+SERIES = ('memory_mb', 'cpu_percent')
+
+
+class RingBuffer:
+    """ A fixed-capacity buffer of floats; appending to a full buffer overwrites the oldest value """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = array('d', bytes(8 * capacity))
+        self._start = 0
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def append(self, value):
+        end = (self._start + self._length) % self.capacity
+        self._data[end] = value
+        if self._length < self.capacity:
+            self._length += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ring buffer index out of range")
+        return self._data[(self._start + index) % self.capacity]
+
+    def values(self, start=0):
+        """ Returns the values from position start to the newest, oldest first """
+        return [self[index] for index in range(start, self._length)]
+
+
+def percentile(sorted_values, fraction):
+    """ Returns the nearest-rank percentile of an already sorted list """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _first_index_after(times, cutoff):
+    """ Binary search for the first position whose time is after cutoff """
+    low, high = 0, len(times)
+    while low < high:
+        middle = (low + high) // 2
+        if times[middle] <= cutoff:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class ProcessHistory:
+    def __init__(self, raw_capacity=DEFAULT_RAW_CAPACITY, minute_capacity=DEFAULT_MINUTE_CAPACITY):
+        self.raw_times = RingBuffer(raw_capacity)
+        self.raw = {series: RingBuffer(raw_capacity) for series in SERIES}
+        # Each minute keeps its min, mean and max per series
+        self.minute_times = RingBuffer(minute_capacity)
+        self.minutes = {series: {stat: RingBuffer(minute_capacity) for stat in ('min', 'mean', 'max')} for series in SERIES}
+        self._minute = None
+        self._minute_values = {series: [] for series in SERIES}
+
+    def add(self, sample):
+        """ Records the totals of a sample from ProcessSampler """
+        timestamp = sample['time']
+        self.raw_times.append(timestamp)
+        for series in SERIES:
+            self.raw[series].append(sample[series])
+
+        minute = int(timestamp // 60)
+        if self._minute is not None and minute != self._minute:
+            self._close_minute()
+        self._minute = minute
+        for series in SERIES:
+            self._minute_values[series].append(sample[series])
+
+    def _close_minute(self):
+        self.minute_times.append(self._minute * 60 + 59)
+        for series in SERIES:
+            values = self._minute_values[series]
+            self.minutes[series]['min'].append(min(values))
+            self.minutes[series]['mean'].append(sum(values) / len(values))
+            self.minutes[series]['max'].append(max(values))
+            self._minute_values[series] = []
+
+    def rollup(self, window_seconds, now=None):
+        """
+        Returns min/max/p50/p95 of each series over the last window_seconds.
+
+        Windows covered by the raw buffer use the raw samples; longer windows use the
+        per-minute aggregates, so their min/max are exact and their percentiles are
+        computed over per-minute means.
+
+        Args:
+            window_seconds (float): Length of the window.
+            now (float): End of the window, defaults to the newest sample.
+
+        Returns:
+            dict: {series: {'min', 'max', 'p50', 'p95', 'count'}}, empty if there is no data.
+        """
+        if not len(self.raw_times):
+            return {}
+        if now is None:
+            now = self.raw_times[-1]
+        cutoff = now - window_seconds
+
+        rollups = {}
+        if self.raw_times[0] <= cutoff or not len(self.minute_times):
+            start = _first_index_after(self.raw_times, cutoff)
+            for series in SERIES:
+                values = sorted(self.raw[series].values(start))
+                rollups[series] = {
+                    'min': values[0] if values else None,
+                    'max': values[-1] if values else None,
+                    'p50': percentile(values, 0.50),
+                    'p95': percentile(values, 0.95),
+                    'count': len(values),
+                }
+            return rollups
+
+        start = _first_index_after(self.minute_times, cutoff)
+        for series in SERIES:
+            means = self.minutes[series]['mean'].values(start) + self._minute_values[series]
+            lows = self.minutes[series]['min'].values(start) + self._minute_values[series]
+            highs = self.minutes[series]['max'].values(start) + self._minute_values[series]
+            means.sort()
+            rollups[series] = {
+                'min': min(lows) if lows else None,
+                'max': max(highs) if highs else None,
+                'p50': percentile(means, 0.50),
+                'p95': percentile(means, 0.95),
+                'count': len(means),
+            }
+        return rollups
+
+    def rollups(self, windows=None):
+        """ Returns {window label: rollup} for each of the windows, see rollup() """
+        return {label: self.rollup(seconds) for label, seconds in (windows or DEFAULT_WINDOWS)}
@@ -0,0 +1,100 @@
+"""
+Function:
+    1. Keep a name -> PIDs index of the running processes, built from one scan per tick.
+    2. Update the index incrementally from the difference between the previous and the current PID set,
+       so only processes started since the previous tick have their name read. Processes whose name cannot
+       be read (access denied, zombies) are recorded without a name, so they are not asked again each tick.
+    3. Answer liveness checks for any number of watched names from the index.
+
+I/O:
+    1. Input:
+        1.1 Nothing; the process table is read through psutil
+    2. Output:
+        2.1 The PIDs running under a given name (set of int)
+"""
+
+import psutil
+
+# Check the creation time of every indexed PID every this many refreshes, to catch PIDs reused by another program
+DEFAULT_FULL_REFRESH_EVERY = 30
+
+
+class ProcessIndex:
+    def __init__(self, full_refresh_every=DEFAULT_FULL_REFRESH_EVERY):
+        self.full_refresh_every = full_refresh_every
+        # A PID whose name could not be read maps to None
+        self.names_by_pid = {}
+        self.create_times = {}
+        self.pids_by_name = {}
+        self._refresh_count = 0
+
+    @staticmethod
+    def _create_time(process):
+        try:
+            return process.create_time()
+        except (psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+
+    def _add(self, pid):
+        try:
+            process = psutil.Process(pid)
+        except psutil.NoSuchProcess:
+            return
+        try:
+            name = process.name()
+        except (psutil.AccessDenied, psutil.ZombieProcess):
+            name = None
+        except psutil.NoSuchProcess:
+            return
+        self.names_by_pid[pid] = name
+        self.create_times[pid] = self._create_time(process)
+        if name is not None:
+            self.pids_by_name.setdefault(name, set()).add(pid)
+
+    def _remove(self, pid):
+        name = self.names_by_pid.pop(pid, None)
+        self.create_times.pop(pid, None)
+        pids = self.pids_by_name.get(name)
+        if pids is not None:
+            pids.discard(pid)
+            if not pids:
+                del self.pids_by_name[name]
+
+    def _reused(self, pid):
+        """ Returns True if pid now belongs to another process than the one indexed under it """
+        try:
+            create_time = self._create_time(psutil.Process(pid))
+        except psutil.NoSuchProcess:
+            return True
+        return create_time != self.create_times.get(pid)
+
+    def refresh(self):
+        """
+        Scans the process table once and applies the started and exited PIDs to the index.
+
+        Returns:
+            tuple: (started, exited) sets of PIDs since the previous refresh.
+        """
+        self._refresh_count += 1
+        current = set(psutil.pids())
+        known = set(self.names_by_pid)
+        reused = set()
+        if self.full_refresh_every and self._refresh_count % self.full_refresh_every == 0:
+            # A reused PID counts as the old process exiting and a new one starting
+            reused = {pid for pid in known & current if self._reused(pid)}
+        started = (current - known) | reused
+        exited = (known - current) | reused
+
+        for pid in exited:
+            self._remove(pid)
+        for pid in started:
+            self._add(pid)
+        return started, exited
+
+    def pids(self, name):
+        """ Returns the PIDs of the processes running under name """
+        return set(self.pids_by_name.get(name, ()))
+
+    def is_running(self, name):
+        """ Returns True if at least one process runs under name """
+        return bool(self.pids_by_name.get(name))
@@ -0,0 +1,66 @@
+"""
+Function:
+    1. Expand the monitored root processes into their whole process tree (children(recursive=True)),
+       e.g. the PyInstaller bootloader of ScreenshotTool plus the Python process and workers it starts.
+    2. Cache the tree and only walk it again when a member exits or a new process starts under a member,
+       so deep trees don't cost a full walk on every tick.
+
+I/O:
+    1. Input:
+        1.1 The root psutil.Process objects (list)
+    2. Output:
+        2.1 The roots and all their descendants (list of psutil.Process)
+"""
+
+import psutil
+
+
+class ProcessTree:
+    def __init__(self):
+        self._members = {}
+        self._root_pids = None
+        self._known_pids = None
+        self.rebuilds = 0
+
+    def _changed(self, pids):
+        """ Returns True if a member exited or a new process was started by a member """
+        if set(self._members) - pids:
+            return True
+        for pid in pids - self._known_pids:
+            try:
+                if psutil.Process(pid).ppid() in self._members:
+                    return True
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return False
+
+    def _rebuild(self, roots):
+        members = {}
+        for root in roots:
+            try:
+                tree = [root] + root.children(recursive=True)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            for process in tree:
+                # Keep the existing Process objects, they carry the cpu_percent baseline
+                members.setdefault(process.pid, self._members.get(process.pid, process))
+        self._members = members
+        self.rebuilds += 1
+
+    def members(self, roots):
+        """
+        Returns the roots and all their descendants, walking the tree only when the PID set changed.
+
+        Args:
+            roots (list): The root psutil.Process objects.
+
+        Returns:
+            list: The psutil.Process objects of the tree.
+        """
+        pids = set(psutil.pids())
+        root_pids = {root.pid for root in roots}
+        if self._known_pids is None or root_pids != self._root_pids or self._changed(pids):
+            self._rebuild(roots)
+            self._root_pids = root_pids
+        self._known_pids = pids
+        return list(self._members.values())
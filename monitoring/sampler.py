@@ -0,0 +1,223 @@
+"""
+Function:
+    1. Sample the memory and CPU usage of a set of processes on a background thread at a fixed cadence.
+    2. Read every process in one non-blocking pass: cpu_percent(None) is primed once per process and then
+       reports the usage since the previous tick, and oneshot() batches the per-process reads.
+    3. Hand each sample to the UI through a queue, so the UI thread never waits on psutil.
+    4. Optionally aggregate the whole process tree of the monitored processes, reporting USS/PSS next to RSS
+       so pages shared between the processes are not counted twice.
+
+I/O:
+    1. Input:
+        1.1 The psutil.Process objects to monitor (list), or a function returning the PIDs to monitor
+    2. Output:
+        2.1 One sample dict per tick, put on ProcessSampler.samples
+"""
+
+import queue
+import threading
+import time
+
+import psutil
+
+from diagnostics import tracing
+from monitoring.process_tree import ProcessTree
+
+# Seconds between two samples
+DEFAULT_INTERVAL = 2.0
+
+# Samples kept waiting for a slow consumer before the oldest ones are dropped
+DEFAULT_QUEUE_SIZE = 16
+
+
+def read_process(process):
+    """
+    Reads the resident memory and CPU usage of a process in one oneshot() pass.
+
+    Args:
+        process (psutil.Process): A process whose cpu_percent has been primed.
+
+    Returns:
+        tuple: (rss in bytes, CPU percent since the previous call).
+    """
+    with process.oneshot():
+        return process.memory_info().rss, process.cpu_percent(None)
+
+
+def read_process_full(process):
+    """
+    Reads the resident, unique and proportional memory and the CPU usage of a process.
+
+    USS and PSS come from memory_full_info(), which is more expensive than memory_info();
+    they are None where the platform or permissions do not provide them.
+
+    Args:
+        process (psutil.Process): A process whose cpu_percent has been primed.
+
+    Returns:
+        tuple: (rss, uss, pss) in bytes and the CPU percent since the previous call.
+    """
+    with process.oneshot():
+        cpu = process.cpu_percent(None)
+        try:
+            memory = process.memory_full_info()
+        except psutil.AccessDenied:
+            return process.memory_info().rss, None, None, cpu
+        return memory.rss, getattr(memory, 'uss', None), getattr(memory, 'pss', None), cpu
+
+
+def _sum_mb(values):
+    """ Sums byte counts into MB, or returns None if any of them is unknown """
+    if any(value is None for value in values):
+        return None
+    return sum(values) / (1024 * 1024)
+
+
+def _prime(process):
+    """ The first cpu_percent(None) call of a process always returns 0.0, it only sets the baseline """
+    try:
+        process.cpu_percent(None)
+        return True
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
+
+
+class ProcessSampler:
+    def __init__(self, processes, interval=DEFAULT_INTERVAL, queue_size=DEFAULT_QUEUE_SIZE, find_pids=None, tree=False):
+        """
+        Args:
+            processes (list): The psutil.Process objects to monitor.
+            interval (float): Seconds between two samples.
+            queue_size (int): Maximum number of samples waiting on the queue.
+            find_pids (callable): Optional function returning the PIDs to monitor, called before each
+                sample; processes are then added and dropped as the PID set changes, and sampling
+                continues while no process is running.
+            tree (bool): Also sample every descendant of the monitored processes and report USS/PSS.
+        """
+        self.processes = list(processes)
+        self.find_pids = find_pids
+        self.tree = ProcessTree() if tree else None
+        self._primed_pids = set()
+        self.interval = interval
+        self.samples = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """ Start sampling on a daemon thread """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.processes = [process for process in self.processes if _prime(process)]
+        self._primed_pids = {process.pid for process in self.processes}
+        self._thread = threading.Thread(target=self._run, name="process-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stop sampling; the thread exits at its next wake-up """
+        self._stop_event.set()
+
+    def sample(self):
+        """
+        Reads all monitored processes once, dropping the ones that have exited.
+
+        Returns:
+            dict: A sample with 'time', 'pids', 'memory_mb' (RSS), 'uss_mb' and 'pss_mb' (None unless
+                sampling the tree), 'cpu_percent', 'per_process' ({pid: (memory_mb, cpu_percent)}),
+                'tree_pids' and 'sample_seconds' keys.
+        """
+        start = time.perf_counter()
+        if self.find_pids is not None:
+            self._sync(set(self.find_pids()))
+
+        per_process = {}
+        uss_values = []
+        pss_values = []
+        tree_pids = []
+        if self.tree is None:
+            for process in list(self.processes):
+                try:
+                    rss, cpu = read_process(process)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    self.processes.remove(process)
+                    continue
+                per_process[process.pid] = (rss / (1024 * 1024), cpu)  # Convert to MB
+        else:
+            root_pids = {process.pid for process in self.processes}
+            for process in self.tree.members(self.processes):
+                if process.pid not in self._primed_pids:
+                    # A new member only has a CPU baseline from the next tick on
+                    _prime(process)
+                    self._primed_pids.add(process.pid)
+                try:
+                    rss, uss, pss, cpu = read_process_full(process)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    if process.pid in root_pids:
+                        self.processes = [root for root in self.processes if root.pid != process.pid]
+                    continue
+                per_process[process.pid] = (rss / (1024 * 1024), cpu)  # Convert to MB
+                uss_values.append(uss)
+                pss_values.append(pss)
+                tree_pids.append(process.pid)
+            self._primed_pids &= set(tree_pids)
+
+        # 'pids' lists the monitored processes themselves, the descendants are in 'tree_pids'
+        root_pids = {process.pid for process in self.processes}
+        sample_seconds = time.perf_counter() - start
+        tracing.record("monitor.tick", sample_seconds, processes=len(per_process), tree=self.tree is not None)
+        return {
+            'time': time.time(),
+            'pids': [pid for pid in per_process if pid in root_pids],
+            'memory_mb': sum(memory for memory, _ in per_process.values()),
+            'uss_mb': _sum_mb(uss_values) if self.tree is not None else None,
+            'pss_mb': _sum_mb(pss_values) if self.tree is not None else None,
+            'cpu_percent': sum(cpu for _, cpu in per_process.values()),
+            'per_process': per_process,
+            'tree_pids': tree_pids,
+            'sample_seconds': sample_seconds,
+        }
+
+    def _sync(self, pids):
+        """ Adds the processes of new PIDs and drops the ones no longer listed """
+        known = {process.pid for process in self.processes}
+        self.processes = [process for process in self.processes if process.pid in pids]
+        for pid in pids - known:
+            try:
+                process = psutil.Process(pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            if _prime(process):
+                self.processes.append(process)
+
+    def _publish(self, sample):
+        # Drop the oldest sample rather than block the sampler when the UI falls behind
+        while True:
+            try:
+                self.samples.put_nowait(sample)
+                return
+            except queue.Full:
+                try:
+                    self.samples.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _run(self):
+        next_tick = time.monotonic() + self.interval
+        while not self._stop_event.wait(max(0.0, next_tick - time.monotonic())):
+            sample = self.sample()
+            self._publish(sample)
+            if not sample['pids'] and self.find_pids is None:
+                return  # Every monitored process has exited
+            # Schedule from the previous tick, so sampling time does not add up to drift
+            next_tick += self.interval
+            if next_tick < time.monotonic():
+                next_tick = time.monotonic() + self.interval
+
+    def drain(self):
+        """ Returns all samples waiting on the queue, oldest first """
+        samples = []
+        while True:
+            try:
+                samples.append(self.samples.get_nowait())
+            except queue.Empty:
+                return samples
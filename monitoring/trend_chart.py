@@ -0,0 +1,101 @@
+"""
+Function:
+    1. Draw a live, scrolling line chart of the monitored memory and CPU on a Tk canvas.
+    2. Draw only the newest segment of each line per sample and shift the existing ones with canvas.move,
+       instead of redrawing the whole chart; the full chart is only redrawn when a scale has to grow.
+
+I/O:
+    1. Input:
+        1.1 A {series: value} dict per sample
+    2. Output:
+        2.1 The chart drawn on TrendChart.canvas
+"""
+
+import tkinter as tk
+from collections import deque
+
+# (series, unit, colour, initial top of the scale)
+DEFAULT_SERIES = [('memory_mb', 'MB', '#1f77b4', 100.0), ('cpu_percent', '%', '#d62728', 100.0)]
+
+
+class TrendChart:
+    def __init__(self, parent, width=380, height=120, step=4, series=None):
+        """
+        Args:
+            parent: The Tk widget the canvas is placed in.
+            width (int): Canvas width in pixels.
+            height (int): Canvas height in pixels.
+            step (int): Horizontal distance in pixels between two samples.
+            series (list): (name, unit, colour, initial scale) tuples, defaults to memory and CPU.
+        """
+        self.width = width
+        self.height = height
+        self.step = step
+        self.series = series or DEFAULT_SERIES
+        self.canvas = tk.Canvas(parent, width=width, height=height, bg="white", highlightthickness=0)
+
+        # Only the points that are visible are remembered
+        visible_points = width // step + 2
+        self.points = {name: deque(maxlen=visible_points) for name, _, _, _ in self.series}
+        self.scales = {name: scale for name, _, _, scale in self.series}
+        self.segments = {name: deque() for name, _, _, _ in self.series}
+        self.labels = {}
+        for index, (name, unit, colour, _) in enumerate(self.series):
+            self.labels[name] = self.canvas.create_text(
+                4, 2 + 12 * index, anchor="nw", fill=colour, font=("Arial", 8), text="")
+            self._update_label(name, unit)
+
+    def _update_label(self, name, unit):
+        self.canvas.itemconfig(self.labels[name], text=f"{name} (max {self.scales[name]:.0f} {unit})")
+
+    def _y(self, name, value):
+        return self.height - 2 - (self.height - 4) * min(value, self.scales[name]) / self.scales[name]
+
+    def _draw_segment(self, name, colour, x, previous, value):
+        item = self.canvas.create_line(x - self.step, self._y(name, previous), x, self._y(name, value),
+                                       fill=colour, width=2, tags=("data",))
+        self.segments[name].append(item)
+
+    def _redraw(self):
+        """ Redraws every visible segment, used after a scale change """
+        self.canvas.delete("data")
+        for name, _, colour, _ in self.series:
+            self.segments[name].clear()
+            points = list(self.points[name])
+            x = self.width - self.step * (len(points) - 1)
+            for previous, value in zip(points, points[1:]):
+                x += self.step
+                self._draw_segment(name, colour, x, previous, value)
+
+    def add_point(self, values):
+        """
+        Appends one sample to the chart.
+
+        Args:
+            values (dict): {series name: value} for the sample.
+        """
+        rescale = False
+        for name, unit, _, _ in self.series:
+            value = values.get(name, 0.0)
+            self.points[name].append(value)
+            grew = False
+            while value > self.scales[name]:
+                self.scales[name] *= 2
+                grew = True
+            if grew:
+                self._update_label(name, unit)
+                rescale = True
+
+        if rescale:
+            self._redraw()
+            return
+
+        # Scroll the existing lines left and add the newest segments at the right edge
+        self.canvas.move("data", -self.step, 0)
+        for name, _, colour, _ in self.series:
+            points = self.points[name]
+            if len(points) >= 2:
+                self._draw_segment(name, colour, self.width, points[-2], points[-1])
+            # Segments that scrolled off the canvas are deleted
+            while len(self.segments[name]) > len(points) - 1:
+                self.canvas.delete(self.segments[name].popleft())
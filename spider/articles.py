@@ -0,0 +1,226 @@
+"""
+Function:
+    1. Fetch the article page behind each news item and extract its main text, so the summarizer gets the
+       article instead of the one-line teaser of the listing card.
+    2. Keep a seen-URL index of extracted articles, so an article is downloaded once and never again.
+    3. Crawl with bounded concurrency, a per-host concurrency limit and a minimum delay between two requests
+       to the same host, and stop reading a response body once it exceeds a size cap.
+    4. Yield each article as soon as it is available, so summarization can start before the crawl ends.
+
+I/O:
+    1. Input:
+        1.1 Article URLs (list of str)
+    2. Output:
+        2.1 (url, text) pairs in completion order, text is None if the article could not be fetched
+        2.2 A SQLite file with the text of every article fetched ('articles.sqlite3')
+"""
+
+import datetime
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.compat import chardet
+
+from diagnostics import tracing
+from spider.fetch import DEFAULT_TIMEOUT, fetch_iter, get_session
+from spider.sites import FAST_PARSER
+
+# Concurrent article downloads, in total and per host
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_PER_HOST_LIMIT = 2
+
+# Seconds between the start of two requests to the same host
+DEFAULT_MIN_INTERVAL = 1.0
+
+# Response bytes read per article; the rest of a larger page is not downloaded
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+
+# Characters of article text kept for inference; BART reads at most 1024 tokens, roughly 4000 characters of
+# English prose, and the summarizer's tokenizer truncates whatever still runs longer
+DEFAULT_MAX_CHARS = 4000
+
+# Paragraphs shorter than this are navigation, captions or buttons rather than article text
+MIN_PARAGRAPH_CHARS = 40
+
+_CONTENT_STRAINER = SoupStrainer(["article", "main", "p"])
+_WHITESPACE = re.compile(r"\s+")
+
+
+def extract_article_text(html_content, max_chars=DEFAULT_MAX_CHARS):
+    """
+    Extracts the main text of an article page: the paragraphs of its <article>, else its <main>,
+    else of the whole page.
+
+    Args:
+        html_content (str): The HTML of the article page.
+        max_chars (int): Maximum length of the returned text.
+
+    Returns:
+        str: The article text, or an empty string if no paragraph was found.
+    """
+    soup = BeautifulSoup(html_content, FAST_PARSER, parse_only=_CONTENT_STRAINER)
+    container = soup.find("article") or soup.find("main") or soup
+    paragraphs = []
+    length = 0
+    for paragraph in container.find_all("p"):
+        text = _WHITESPACE.sub(" ", paragraph.get_text(" ")).strip()
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        paragraphs.append(text)
+        length += len(text) + 1
+        if length >= max_chars:
+            break
+    return " ".join(paragraphs)[:max_chars]
+
+
+def detect_encoding(body, declared=None):
+    """
+    Returns the encoding to decode an article with.
+
+    requests reports ISO-8859-1 for any text/html response without a charset, so only a charset the
+    server declared is trusted; otherwise the encoding is detected from the body, as
+    Response.apparent_encoding would, which cannot be used once a streamed body has been read.
+
+    Args:
+        body (bytes): The response body.
+        declared (str): The charset of the Content-Type header, or None if there was none.
+
+    Returns:
+        str: The encoding name.
+    """
+    if declared:
+        return declared
+    if chardet is not None:
+        detected = chardet.detect(body).get("encoding")
+        if detected:
+            return detected
+    return "utf-8"
+
+
+class ArticleIndex:
+    """ The seen-URL index: URL -> extracted article text, in SQLite """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS articles "
+                           "(url TEXT PRIMARY KEY, text TEXT NOT NULL, truncated INTEGER NOT NULL, fetched_at REAL NOT NULL)")
+        self._conn.commit()
+
+    def get_many(self, urls):
+        """ Returns a dict of {url: text} for the URLs already fetched """
+        found = {}
+        urls = list(urls)
+        with self._lock:
+            # Stay below SQLite's limit on the number of bound parameters
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(f"SELECT url, text FROM articles WHERE url IN ({placeholders})", chunk)
+                found.update(rows.fetchall())
+        return found
+
+    def put(self, url, text, truncated):
+        with self._lock:
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO articles (url, text, truncated, fetched_at) VALUES (?, ?, ?, ?)",
+                                   (url, text, int(truncated), time.time()))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class HostRateLimiter:
+    """ Spaces the requests to each host at least min_interval seconds apart """
+
+    def __init__(self, min_interval=DEFAULT_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._next_allowed = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed.get(host, now))
+            # Reserve the slot before sleeping, so concurrent callers queue up behind each other
+            self._next_allowed[host] = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class ArticleCrawler:
+    def __init__(self, index, max_workers=DEFAULT_MAX_WORKERS, per_host_limit=DEFAULT_PER_HOST_LIMIT,
+                 min_interval=DEFAULT_MIN_INTERVAL, max_bytes=DEFAULT_MAX_BYTES, max_chars=DEFAULT_MAX_CHARS,
+                 timeout=DEFAULT_TIMEOUT):
+        """
+        Args:
+            index (ArticleIndex): The seen-URL index.
+            max_workers (int): Maximum number of downloads running at the same time.
+            per_host_limit (int): Maximum number of concurrent downloads per host.
+            min_interval (float): Seconds between the start of two requests to the same host.
+            max_bytes (int): Response bytes read per article.
+            max_chars (int): Characters of article text kept.
+            timeout (tuple): The (connect, read) timeout in seconds.
+        """
+        self.index = index
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.rate_limiter = HostRateLimiter(min_interval)
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.timeout = timeout
+
+    def _download(self, url):
+        self.rate_limiter.wait(url)
+        with tracing.span("article.fetch", url=url) as span:
+            with get_session().get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                chunks = []
+                size = 0
+                truncated = False
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_bytes:
+                        truncated = True
+                        break
+                body = b"".join(chunks)[:self.max_bytes]
+                has_charset = "charset=" in response.headers.get("Content-Type", "").lower()
+
+            text = extract_article_text(body.decode(detect_encoding(body, response.encoding if has_charset else None),
+                                                    errors="replace"), self.max_chars)
+            span.set(bytes=len(body), truncated=truncated, chars=len(text))
+        self.index.put(url, text, truncated)
+        return text
+
+    def iter_bodies(self, urls):
+        """
+        Yields the text of each article, from the index if it was fetched before, else downloaded.
+
+        Args:
+            urls (list): The article URLs.
+
+        Yields:
+            tuple: (url, text) pairs, indexed articles first and the others in completion order;
+                text is None if the article could not be downloaded.
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        seen = self.index.get_many(urls)
+        for url in urls:
+            if url in seen:
+                yield url, seen[url]
+
+        new_urls = [url for url in urls if url not in seen]
+        if not new_urls:
+            return
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{timestamp}: Crawling {len(new_urls)} new articles ({len(seen)} already indexed)...")
+        yield from fetch_iter({url: "article" for url in new_urls}, self._download,
+                              max_workers=self.max_workers, per_host_limit=self.per_host_limit)
@@ -0,0 +1,238 @@
+"""
+Function:
+    1. Provide interchangeable classifier backends for the cyber feed:
+        1.1 'bart'    - the zero-shot facebook/bart-large-mnli pipeline (accurate, slow on CPU)
+        1.2 'tfidf'   - a TF-IDF nearest-centroid model trained from the labels accumulated in final.csv
+        1.3 'keyword' - keyword matching against a fixed vocabulary per label (no training needed)
+    2. Select a backend by name with get_classifier().
+
+I/O:
+    1. Input:
+        1.1 Texts to classify (list of str)
+        1.2 Optionally the CSV file with labelled items to train the 'tfidf' backend from
+    2. Output:
+        2.1 One of the candidate labels per text (list of str)
+"""
+
+import datetime
+import math
+import os
+import re
+from collections import Counter
+
+from spider.inference import CANDIDATE_LABELS, DEFAULT_BATCH_SIZE, classify
+
+# Backend used by run_summarization_and_classification when none is given
+DEFAULT_CLASSIFIER_BACKEND = "bart"
+
+# Keywords that vote for each candidate label
+LABEL_KEYWORDS = {
+    "cyber security": [
+        "cyber", "security", "vulnerability", "vulnerabilities", "exploit", "exploited", "malware",
+        "ransomware", "phishing", "patch", "attack", "attacks", "threat", "threats", "breach", "hacker",
+        "advisory", "cve", "scam", "scams", "compromise", "compromised", "incident", "botnet",
+    ],
+    "business": [
+        "business", "businesses", "company", "companies", "organisation", "organisations", "industry",
+        "partnership", "small", "enterprise", "supply", "chain", "customers", "workforce",
+    ],
+    "finance": [
+        "finance", "financial", "bank", "banks", "banking", "money", "payment", "payments", "fraud",
+        "crypto", "cryptocurrency", "investment", "superannuation", "tax", "funding", "laundering",
+    ],
+    "technology": [
+        "technology", "software", "hardware", "cloud", "device", "devices", "ai", "artificial",
+        "intelligence", "app", "apps", "update", "network", "internet", "data", "digital", "platform",
+    ],
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """ Lower-cases text and splits it into alphanumeric tokens """
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+class BartClassifier:
+    """ The zero-shot BART pipeline from spider.inference """
+    name = "bart"
+
+    def __init__(self, candidate_labels=None, batch_size=DEFAULT_BATCH_SIZE, cache=None, worker=None):
+        self.candidate_labels = list(candidate_labels or CANDIDATE_LABELS)
+        self.batch_size = batch_size
+        self.cache = cache
+        self.worker = worker
+
+    def predict(self, texts):
+        return classify(texts, self.candidate_labels, batch_size=self.batch_size, cache=self.cache, worker=self.worker)
+
+
+class KeywordClassifier:
+    """ Picks the label whose keywords occur most often, falling back to the first label """
+    name = "keyword"
+
+    def __init__(self, candidate_labels=None, keywords=None):
+        self.candidate_labels = list(candidate_labels or CANDIDATE_LABELS)
+        keywords = keywords or LABEL_KEYWORDS
+        self.keyword_labels = {}
+        for label in self.candidate_labels:
+            for keyword in keywords.get(label, []):
+                self.keyword_labels.setdefault(keyword, []).append(label)
+
+    def predict_one(self, text):
+        votes = Counter()
+        for token in tokenize(text):
+            for label in self.keyword_labels.get(token, ()):
+                votes[label] += 1
+        if not votes:
+            return self.candidate_labels[0]
+        # Ties go to the label listed first in candidate_labels
+        return max(self.candidate_labels, key=lambda label: votes[label])
+
+    def predict(self, texts):
+        return [self.predict_one(text) for text in texts]
+
+
+class TfidfClassifier:
+    """
+    A TF-IDF nearest-centroid model.
+
+    Each label is represented by the normalised mean TF-IDF vector of its training
+    texts, and a text gets the label whose centroid has the highest cosine similarity.
+    Texts that share no vocabulary with the training data are passed to the fallback.
+    """
+    name = "tfidf"
+
+    def __init__(self, candidate_labels=None, fallback=None):
+        self.candidate_labels = list(candidate_labels or CANDIDATE_LABELS)
+        self.fallback = fallback or KeywordClassifier(self.candidate_labels)
+        self.idf = {}
+        self.centroids = {}
+
+    def _vector(self, text):
+        counts = Counter(token for token in tokenize(text) if token in self.idf)
+        vector = {token: count * self.idf[token] for token, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if norm == 0:
+            return {}
+        return {token: weight / norm for token, weight in vector.items()}
+
+    def fit(self, texts, labels):
+        """
+        Trains the model on texts labelled with one of the candidate labels.
+
+        Args:
+            texts (list): The training texts.
+            labels (list): The label of each text; texts with other labels are ignored.
+
+        Returns:
+            TfidfClassifier: self, for chaining.
+        """
+        samples = [(text, label) for text, label in zip(texts, labels) if label in self.candidate_labels]
+
+        document_frequency = Counter()
+        for text, _ in samples:
+            document_frequency.update(set(tokenize(text)))
+        total = len(samples)
+        self.idf = {token: math.log((1 + total) / (1 + df)) + 1 for token, df in document_frequency.items()}
+
+        sums = {}
+        for text, label in samples:
+            centroid = sums.setdefault(label, Counter())
+            centroid.update(self._vector(text))
+
+        self.centroids = {}
+        for label, centroid in sums.items():
+            norm = math.sqrt(sum(weight * weight for weight in centroid.values()))
+            if norm:
+                self.centroids[label] = {token: weight / norm for token, weight in centroid.items()}
+        return self
+
+    def predict_one(self, text):
+        vector = self._vector(text)
+        best_label, best_score = None, 0.0
+        for label in self.candidate_labels:
+            centroid = self.centroids.get(label)
+            if not centroid:
+                continue
+            score = sum(weight * centroid.get(token, 0.0) for token, weight in vector.items())
+            if score > best_score:
+                best_label, best_score = label, score
+        if best_label is None:
+            return self.fallback.predict_one(text)
+        return best_label
+
+    def predict(self, texts):
+        return [self.predict_one(text) for text in texts]
+
+
+_trained_models = {}
+
+
+def train_tfidf_from_csv(csv_path, candidate_labels=None):
+    """
+    Trains a TfidfClassifier from the 'Summary' and 'Final Label' columns of a CSV file.
+
+    The trained model is kept per process and only retrained when the file changes.
+
+    Args:
+        csv_path (str): The CSV file with labelled items, e.g. final.csv.
+        candidate_labels (list): The labels to learn, defaults to CANDIDATE_LABELS.
+
+    Returns:
+        TfidfClassifier: The trained model (untrained if the file cannot be read).
+    """
+    candidate_labels = list(candidate_labels or CANDIDATE_LABELS)
+    try:
+        mtime = os.path.getmtime(csv_path)
+    except OSError:
+        mtime = None
+
+    key = (csv_path, mtime, tuple(candidate_labels))
+    if key in _trained_models:
+        return _trained_models[key]
+
+    model = TfidfClassifier(candidate_labels)
+    try:
+        import pandas as pd
+        df = pd.read_csv(csv_path, usecols=['Summary', 'Final Label'], dtype=str)
+        df = df.dropna()
+        model.fit(df['Summary'].tolist(), df['Final Label'].tolist())
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{timestamp}: Trained tfidf classifier on {len(df)} rows of {csv_path}.")
+    except Exception as ex:
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{timestamp}: Error - train_tfidf_from_csv could not train from {csv_path}, "
+              f"falling back to keywords. Details: {ex}")
+
+    _trained_models.clear()
+    _trained_models[key] = model
+    return model
+
+
+def get_classifier(backend=DEFAULT_CLASSIFIER_BACKEND, candidate_labels=None, training_csv=None,
+                   batch_size=DEFAULT_BATCH_SIZE, cache=None, worker=None):
+    """
+    Returns a classifier backend by name.
+
+    Args:
+        backend (str): One of 'bart', 'tfidf' or 'keyword'.
+        candidate_labels (list): The labels to choose from, defaults to CANDIDATE_LABELS.
+        training_csv (str): The CSV file to train the 'tfidf' backend from.
+        batch_size (int): Number of texts per pipeline call for the 'bart' backend.
+        cache (InferenceCache): The result cache for the 'bart' backend.
+        worker (InferenceClient): Inference worker the 'bart' backend runs in, or None to run in this process.
+
+    Returns:
+        An object with a predict(texts) method returning one label per text.
+    """
+    if backend == "bart":
+        return BartClassifier(candidate_labels, batch_size=batch_size, cache=cache, worker=worker)
+    if backend == "keyword":
+        return KeywordClassifier(candidate_labels)
+    if backend == "tfidf":
+        if training_csv is None:
+            return TfidfClassifier(candidate_labels)
+        return train_tfidf_from_csv(training_csv, candidate_labels)
+    raise ValueError(f"Unknown classifier backend '{backend}', expected 'bart', 'tfidf' or 'keyword'")
@@ -0,0 +1,161 @@
+"""
+Function:
+    1. Keep a pooled, keep-alive requests.Session shared by every download.
+    2. Download many URLs in parallel with a per-host concurrency limit, returning all results
+       at once (fetch_all) or streaming each one as it completes (fetch_iter).
+    3. Apply timeouts and a bounded number of retries with exponential backoff.
+
+I/O:
+    1. Input:
+        1.1 A dict of {url: site} pairs to download
+    2. Output:
+        2.1 A dict of {url: html_content} pairs (None for pages that could not be downloaded)
+"""
+
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeout in seconds for every request
+DEFAULT_TIMEOUT = (5, 30)
+# Number of retries for connection errors and retryable status codes
+DEFAULT_RETRIES = 3
+# Sleep between retries is backoff_factor * (2 ** (retry_number - 1)) seconds
+DEFAULT_BACKOFF = 0.5
+# Upper bound on the number of downloads running at the same time
+DEFAULT_MAX_WORKERS = 8
+# Upper bound on the number of downloads running against the same host
+DEFAULT_PER_HOST_LIMIT = 2
+
+USER_AGENT = "BlackBoomerang/1.0 (+https://github.com/CapitalAnalyst/Black-Boomerang)"
+
+_session = None
+_session_lock = threading.Lock()
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def get_session(retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, pool_size=DEFAULT_MAX_WORKERS):
+    """
+    Returns the process-wide requests.Session, creating it on first use.
+
+    The session keeps connections alive between downloads and retries failed
+    requests a bounded number of times with exponential backoff.
+
+    Args:
+        retries (int): Maximum number of retries per request.
+        backoff (float): Backoff factor between retries, in seconds.
+        pool_size (int): Number of connections kept open per host.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=retries,
+                connect=retries,
+                read=retries,
+                status=retries,
+                backoff_factor=backoff,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET", "HEAD"]),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session = requests.Session()
+            session.headers.update({"User-Agent": USER_AGENT})
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def close_session():
+    """ Close the shared session and drop its pooled connections """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def host_semaphore(url, per_host_limit=DEFAULT_PER_HOST_LIMIT):
+    """
+    Returns the semaphore that limits concurrent downloads for the host of url.
+
+    Semaphores are kept per (host, limit), so a caller asking for a different limit, such as the
+    article crawler, gets its own limit instead of the one of the first caller for that host.
+
+    Args:
+        url (str): The URL about to be downloaded.
+        per_host_limit (int): Maximum number of concurrent downloads per host.
+
+    Returns:
+        threading.BoundedSemaphore: The semaphore for the URL's host and limit.
+    """
+    key = (urlsplit(url).netloc.lower(), per_host_limit)
+    with _host_semaphores_lock:
+        semaphore = _host_semaphores.get(key)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(per_host_limit)
+            _host_semaphores[key] = semaphore
+        return semaphore
+
+
+def fetch_iter(urls_and_sites, download, max_workers=DEFAULT_MAX_WORKERS, per_host_limit=DEFAULT_PER_HOST_LIMIT):
+    """
+    Downloads all URLs in parallel and yields each result as soon as it completes.
+
+    Args:
+        urls_and_sites (dict): A dict of {url: site} pairs to download.
+        download (callable): Function taking a URL and returning its HTML content or None.
+        max_workers (int): Maximum number of downloads running at the same time.
+        per_host_limit (int): Maximum number of concurrent downloads per host.
+
+    Yields:
+        tuple: (url, html_content) pairs in completion order, html_content is None for failed downloads.
+    """
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{timestamp}: Executing fetch_iter for {len(urls_and_sites)} URLs...")
+
+    def limited_download(url):
+        with host_semaphore(url, per_host_limit):
+            return download(url)
+
+    workers = max(1, min(max_workers, len(urls_and_sites)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as executor:
+        futures = {executor.submit(limited_download, url): url for url in urls_and_sites}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                html_content = future.result()
+            except Exception as ex:
+                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                print(f"{timestamp}: Error - fetch_iter could not download {url}. Details: {ex}")
+                html_content = None
+            yield url, html_content
+
+
+def fetch_all(urls_and_sites, download, max_workers=DEFAULT_MAX_WORKERS, per_host_limit=DEFAULT_PER_HOST_LIMIT):
+    """
+    Downloads all URLs in parallel, at most per_host_limit at a time for each host.
+
+    Args:
+        urls_and_sites (dict): A dict of {url: site} pairs to download.
+        download (callable): Function taking a URL and returning its HTML content or None.
+        max_workers (int): Maximum number of downloads running at the same time.
+        per_host_limit (int): Maximum number of concurrent downloads per host.
+
+    Returns:
+        dict: A dict of {url: html_content} pairs, in the order of urls_and_sites.
+    """
+    results = dict(fetch_iter(urls_and_sites, download, max_workers, per_host_limit))
+    return {url: results.get(url) for url in urls_and_sites}
@@ -0,0 +1,147 @@
+"""
+Function:
+    1. Persist the last downloaded body of every URL (gzip compressed) with its ETag/Last-Modified validators.
+    2. Build If-None-Match/If-Modified-Since headers so unchanged pages come back as 304 Not Modified.
+    3. Remember the rows parsed from each site's page, keyed on the SHA-256 of the page body,
+       so an unchanged page never has to be parsed or summarized again.
+
+I/O:
+    1. Input:
+        1.1 The cache directory (str)
+    2. Output:
+        2.1 '<key>.json' metadata, '<key>.html.gz' bodies and '<site>.rows.json.gz' parsed rows in the cache directory
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+
+
+def body_hash(text):
+    """ Returns the SHA-256 hex digest of the given HTML text """
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _url_key(url):
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path, data):
+    """ Write bytes to path through a temporary file so readers never see a partial file """
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class HttpCache:
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _meta_path(self, url):
+        return os.path.join(self.cache_dir, f"{_url_key(url)}.json")
+
+    def _body_path(self, url):
+        return os.path.join(self.cache_dir, f"{_url_key(url)}.html.gz")
+
+    def _rows_path(self, site):
+        return os.path.join(self.cache_dir, f"{site}.rows.json.gz")
+
+    def load_meta(self, url):
+        """ Returns the cached metadata of url, or an empty dict """
+        try:
+            with open(self._meta_path(url), "r", encoding="utf-8") as meta_file:
+                return json.load(meta_file)
+        except (OSError, ValueError):
+            return {}
+
+    def conditional_headers(self, url):
+        """
+        Returns the conditional request headers for url.
+
+        Args:
+            url (str): The URL about to be downloaded.
+
+        Returns:
+            dict: If-None-Match/If-Modified-Since headers, empty when nothing is cached.
+        """
+        meta = self.load_meta(url)
+        if not meta or not os.path.exists(self._body_path(url)):
+            return {}
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def load_body(self, url):
+        """ Returns the cached HTML body of url, or None """
+        try:
+            with gzip.open(self._body_path(url), "rt", encoding="utf-8") as body_file:
+                return body_file.read()
+        except (OSError, EOFError):
+            return None
+
+    def save_response(self, url, html_content, etag=None, last_modified=None):
+        """
+        Stores a freshly downloaded body and its validators.
+
+        Args:
+            url (str): The downloaded URL.
+            html_content (str): The downloaded HTML content.
+            etag (str): The ETag response header, if any.
+            last_modified (str): The Last-Modified response header, if any.
+
+        Returns:
+            bool: True if the body differs from the previously cached one.
+        """
+        content_hash = body_hash(html_content)
+        changed = self.load_meta(url).get("body_hash") != content_hash
+
+        if changed:
+            _atomic_write(self._body_path(url), gzip.compress(html_content.encode("utf-8", "surrogatepass")))
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body_hash": content_hash,
+        }
+        _atomic_write(self._meta_path(url), json.dumps(meta).encode("utf-8"))
+        return changed
+
+    def load_parsed(self, site, content_hash):
+        """
+        Returns the rows previously parsed for site if they came from a body with the same hash.
+
+        Args:
+            site (str): The site identifier.
+            content_hash (str): The SHA-256 hex digest of the current page body.
+
+        Returns:
+            list: A list of row dicts, or None if the page has not been parsed in this state before.
+        """
+        try:
+            with gzip.open(self._rows_path(site), "rt", encoding="utf-8") as rows_file:
+                cached = json.load(rows_file)
+        except (OSError, EOFError, ValueError):
+            return None
+
+        if cached.get("body_hash") != content_hash:
+            return None
+        return cached.get("rows")
+
+    def save_parsed(self, site, content_hash, rows):
+        """ Stores the rows parsed for site together with the hash of the body they came from """
+        payload = json.dumps({"body_hash": content_hash, "rows": rows})
+        _atomic_write(self._rows_path(site), gzip.compress(payload.encode("utf-8")))
@@ -0,0 +1,273 @@
+"""
+Function:
+    1. Load the BART summarization and zero-shot classification pipelines once per process and reuse them.
+       The summarizer can run in fp32 PyTorch ('torch'), with dynamically int8-quantized linear layers
+       ('int8'), or as an exported ONNX graph on onnxruntime ('onnx', needs the optional optimum package),
+       with a configurable number of CPU threads.
+    2. Feed texts to the pipelines in configurable batches instead of one row at a time.
+    3. Cache summary and label results keyed on a hash of the content, so already-seen items are never re-inferred.
+
+I/O:
+    1. Input:
+        1.1 Texts to summarize or classify (list of str)
+    2. Output:
+        2.1 Summaries or labels (list of str), in the order of the input texts
+        2.2 A SQLite file caching the results across runs
+"""
+
+import datetime
+import hashlib
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+SUMMARIZER_MODEL = "facebook/bart-large-cnn"
+CLASSIFIER_MODEL = "facebook/bart-large-mnli"
+
+# Candidate labels for classification
+CANDIDATE_LABELS = ["cyber security", "business", "finance", "technology"]
+
+# Generation settings for the summarizer
+SUMMARY_KWARGS = {"max_length": 30, "min_length": 10, "do_sample": False}
+
+# Number of texts fed to a pipeline at once
+DEFAULT_BATCH_SIZE = 8
+
+SUMMARIZER_BACKENDS = ("torch", "int8", "onnx")
+DEFAULT_SUMMARIZER_BACKEND = "torch"
+
+# CPU threads used by the models, or None for the library default (one per core)
+DEFAULT_NUM_THREADS = None
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+_torch_threads_lock = threading.Lock()
+
+
+@contextmanager
+def torch_threads(num_threads, backend=DEFAULT_SUMMARIZER_BACKEND):
+    """
+    Sets torch's thread count for the enclosed call and restores it afterwards.
+
+    torch.set_num_threads() is process-wide, so a pipeline cannot keep a thread count of its own;
+    calls asking for one are serialized so they don't change each other's setting mid-call.
+    onnxruntime sessions get their thread count when they are created instead.
+
+    Args:
+        num_threads (int): CPU threads for the call, or None for the current setting.
+        backend (str): One of SUMMARIZER_BACKENDS.
+    """
+    if not num_threads or backend == "onnx":
+        yield
+        return
+    import torch
+    with _torch_threads_lock:
+        previous = torch.get_num_threads()
+        torch.set_num_threads(num_threads)
+        try:
+            yield
+        finally:
+            torch.set_num_threads(previous)
+
+
+def _load_pipeline(task, model, backend, num_threads):
+    # transformers (and torch) take seconds to import, so only callers that run a model pay for it
+    from transformers import pipeline
+
+    if backend == "torch":
+        return pipeline(task, model=model)
+    if backend == "int8":
+        import torch
+        loaded = pipeline(task, model=model)
+        # Weights of the linear layers are stored as int8, activations are quantized on the fly
+        loaded.model = torch.quantization.quantize_dynamic(loaded.model, {torch.nn.Linear}, dtype=torch.qint8)
+        return loaded
+    if backend == "onnx":
+        if task != "summarization":
+            raise ValueError(f"The 'onnx' backend only supports summarization, not {task}")
+        try:
+            import onnxruntime
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError:
+            raise RuntimeError("The 'onnx' backend needs the optional optimum[onnxruntime] package")
+        from transformers import AutoTokenizer
+        session_options = onnxruntime.SessionOptions()
+        if num_threads:
+            session_options.intra_op_num_threads = num_threads
+        onnx_model = ORTModelForSeq2SeqLM.from_pretrained(model, export=True, session_options=session_options)
+        return pipeline(task, model=onnx_model, tokenizer=AutoTokenizer.from_pretrained(model))
+    raise ValueError(f"Unknown backend '{backend}', expected one of {', '.join(SUMMARIZER_BACKENDS)}")
+
+
+def get_pipeline(task, model, backend=DEFAULT_SUMMARIZER_BACKEND, num_threads=DEFAULT_NUM_THREADS):
+    """
+    Returns the transformers pipeline for (task, model, backend), loading it on first use.
+
+    Args:
+        task (str): The pipeline task, e.g. "summarization".
+        model (str): The model name on the Hugging Face hub.
+        backend (str): One of SUMMARIZER_BACKENDS.
+        num_threads (int): CPU threads of an 'onnx' session; torch backends take theirs per call,
+            see torch_threads().
+
+    Returns:
+        transformers.Pipeline: The shared pipeline.
+    """
+    with _pipelines_lock:
+        # Only onnxruntime fixes its thread count when the model is loaded
+        key = (task, model, backend, num_threads if backend == "onnx" else None)
+        if key not in _pipelines:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{timestamp}: Loading {task} pipeline ({model}, {backend})...")
+            with torch_threads(num_threads, backend):
+                _pipelines[key] = _load_pipeline(task, model, backend, num_threads)
+        return _pipelines[key]
+
+
+def content_key(kind, content, settings):
+    """ Returns the cache key of a result of the given kind for content under the given settings """
+    payload = json.dumps([kind, settings, content], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class InferenceCache:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+
+    def get_many(self, keys):
+        """ Returns a dict of {key: value} for the keys that are cached """
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            # Stay below SQLite's limit on the number of bound parameters
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(f"SELECT key, value FROM results WHERE key IN ({placeholders})", chunk)
+                found.update(rows.fetchall())
+        return found
+
+    def put_many(self, items):
+        """ Stores a dict of {key: value} results """
+        with self._lock:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", items.items())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _run_cached(kind, texts, settings, run_batch, batch_size, cache):
+    """
+    Runs run_batch over the texts that are not cached yet, batch_size at a time.
+
+    Args:
+        kind (str): The kind of result, part of the cache key.
+        texts (list): The input texts.
+        settings (dict): Model and generation settings, part of the cache key.
+        run_batch (callable): Function mapping a list of texts to a list of results.
+        batch_size (int): Number of texts per pipeline call.
+        cache (InferenceCache): The result cache, or None to disable caching.
+
+    Returns:
+        list: The results, in the order of texts.
+    """
+    keys = [content_key(kind, text, settings) for text in texts]
+    results = cache.get_many(set(keys)) if cache is not None else {}
+
+    # Texts appearing several times are only inferred once
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key not in results and key not in pending:
+            pending[key] = text
+
+    if pending:
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{timestamp}: Running {kind} on {len(pending)} new texts out of {len(texts)} items, "
+              f"batch size {batch_size}.")
+
+        pending_keys = list(pending)
+        batch_size = max(1, batch_size)
+        for start in range(0, len(pending_keys), batch_size):
+            batch_keys = pending_keys[start:start + batch_size]
+            outputs = run_batch([pending[key] for key in batch_keys])
+            new_results = dict(zip(batch_keys, outputs))
+            results.update(new_results)
+            if cache is not None:
+                cache.put_many(new_results)
+
+    return [results[key] for key in keys]
+
+
+def summarize(texts, batch_size=DEFAULT_BATCH_SIZE, cache=None, worker=None,
+              backend=DEFAULT_SUMMARIZER_BACKEND, num_threads=DEFAULT_NUM_THREADS):
+    """
+    Summarizes texts with the BART summarization pipeline.
+
+    Args:
+        texts (list): The texts to summarize.
+        batch_size (int): Number of texts per pipeline call.
+        cache (InferenceCache): The result cache, or None to disable caching.
+        worker (InferenceClient): Runs the batches in the inference worker process instead of this one.
+        backend (str): One of SUMMARIZER_BACKENDS.
+        num_threads (int): CPU threads for the model, or None for the library default.
+
+    Returns:
+        list: The summaries, in the order of texts.
+    """
+    def run_batch(batch):
+        if worker is not None:
+            return worker.summarize(batch, batch_size=len(batch), backend=backend, num_threads=num_threads)
+        summarizer = get_pipeline("summarization", SUMMARIZER_MODEL, backend, num_threads)
+        with torch_threads(num_threads, backend):
+            # Inputs longer than the model's 1024 tokens are cut by the tokenizer, since a character cap cannot
+            # guarantee that an article body fits; shorter inputs, and so the cached summaries, are unaffected
+            outputs = summarizer(batch, batch_size=len(batch), truncation=True, **SUMMARY_KWARGS)
+        return [output['summary_text'] for output in outputs]
+
+    settings = {"model": SUMMARIZER_MODEL, **SUMMARY_KWARGS}
+    # Optimized backends can word a summary differently, so their results are cached separately;
+    # the fp32 results keep the keys they had before the backends existed
+    if backend != "torch":
+        settings["backend"] = backend
+    return _run_cached("summary", texts, settings, run_batch, batch_size, cache)
+
+
+def classify(texts, candidate_labels=None, batch_size=DEFAULT_BATCH_SIZE, cache=None, worker=None):
+    """
+    Classifies texts with the BART zero-shot classification pipeline.
+
+    Args:
+        texts (list): The texts to classify.
+        candidate_labels (list): The labels to choose from, defaults to CANDIDATE_LABELS.
+        batch_size (int): Number of texts per pipeline call.
+        cache (InferenceCache): The result cache, or None to disable caching.
+        worker (InferenceClient): Runs the batches in the inference worker process instead of this one.
+
+    Returns:
+        list: The highest scoring label of each text, in the order of texts.
+    """
+    if candidate_labels is None:
+        candidate_labels = CANDIDATE_LABELS
+
+    def run_batch(batch):
+        if worker is not None:
+            return worker.classify(batch, candidate_labels, batch_size=len(batch))
+        classifier = get_pipeline("zero-shot-classification", CLASSIFIER_MODEL)
+        outputs = classifier(batch, candidate_labels, batch_size=len(batch))
+        if isinstance(outputs, dict):
+            outputs = [outputs]
+        labels = []
+        for output in outputs:
+            max_score_index = output['scores'].index(max(output['scores']))
+            labels.append(output['labels'][max_score_index])
+        return labels
+
+    settings = {"model": CLASSIFIER_MODEL, "labels": list(candidate_labels)}
+    return _run_cached("label", texts, settings, run_batch, batch_size, cache)
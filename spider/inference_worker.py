@@ -0,0 +1,337 @@
+"""
+Function:
+    1. Run the BART summarizer and classifier in a long-lived local worker process, so the GUI process that
+       runs the scraper never loads the models and stays small.
+    2. Serve batched summarize/classify requests over a local socket (a named pipe on Windows), authenticated
+       with a per-user key; the models are loaded on the first request and kept for the following ones.
+    3. Exit after an idle timeout, or when the app closes and asks it to, which releases the model memory until
+       the next refresh starts the worker again.
+    4. Start the worker on demand from the client and reconnect to it across refreshes.
+
+I/O:
+    1. Input:
+        1.1 ('summarize', texts, batch_size, backend, num_threads) and ('classify', texts, candidate_labels, batch_size)
+            requests, and ('shutdown',) from a closing app
+    2. Output:
+        2.1 ('ok', results) or ('error', message) replies, one per request
+        2.2 'inference_worker.log' with the worker's output
+
+Usage:
+    python -m spider.inference_worker [--idle-timeout 1800]
+    ScreenshotTool.exe --inference-worker [--idle-timeout 1800]    # the frozen (PyInstaller) build
+"""
+
+import argparse
+import datetime
+import os
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+if __name__ == "__main__" and not __package__:
+    # Allow running as "python spider/inference_worker.py" as well as "python -m spider.inference_worker"
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from spider.inference import DEFAULT_BATCH_SIZE, DEFAULT_NUM_THREADS, DEFAULT_SUMMARIZER_BACKEND, classify, summarize
+
+DEFAULT_DATA_DIR = os.path.join(os.path.expanduser("~"), "BlackBoomerang")
+
+# Seconds without a request after which the worker exits and its model memory is released,
+# unless the client starting it asks for another timeout
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+
+# Seconds the client waits for a worker it started to accept connections
+DEFAULT_START_TIMEOUT = 30.0
+
+# Argument that makes the frozen app executable run as the inference worker instead of the GUI
+WORKER_FLAG = "--inference-worker"
+
+
+class InferenceWorkerError(RuntimeError):
+    """ The worker could not run a request, or could not be authenticated with """
+
+
+def worker_command(idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """
+    Returns the command starting the worker.
+
+    A frozen (PyInstaller) build has no Python interpreter to run "-m spider.inference_worker" with,
+    so its executable is started again with WORKER_FLAG and runs main() before creating any window.
+    """
+    if getattr(sys, "frozen", False):
+        return [sys.executable, WORKER_FLAG, "--idle-timeout", str(idle_timeout)]
+    return [sys.executable, "-m", "spider.inference_worker", "--idle-timeout", str(idle_timeout)]
+
+
+def default_address(data_dir=DEFAULT_DATA_DIR):
+    """ Returns the worker's address: a named pipe on Windows, a Unix socket in data_dir elsewhere """
+    if sys.platform == "win32":
+        return r"\\.\pipe\BlackBoomerang-inference-" + os.environ.get("USERNAME", "user")
+    return os.path.join(data_dir, "inference.sock")
+
+
+def load_authkey(data_dir=DEFAULT_DATA_DIR):
+    """ Returns the per-user key both ends authenticate with, creating it on first use """
+    os.makedirs(data_dir, exist_ok=True)
+    key_path = os.path.join(data_dir, "inference.key")
+    try:
+        with open(key_path, "rb") as key_file:
+            return key_file.read()
+    except FileNotFoundError:
+        pass
+    key = os.urandom(32)
+    try:
+        descriptor = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another process created it first
+        with open(key_path, "rb") as key_file:
+            return key_file.read()
+    with os.fdopen(descriptor, "wb") as key_file:
+        key_file.write(key)
+    return key
+
+
+class InferenceWorker:
+    def __init__(self, address=None, authkey=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        """
+        Args:
+            address (str): Socket path or pipe name, defaults to default_address().
+            authkey (bytes): Key clients must authenticate with, defaults to load_authkey().
+            idle_timeout (float): Seconds without a request before the worker exits.
+        """
+        self.address = address or default_address()
+        self.authkey = authkey if authkey is not None else load_authkey()
+        self.idle_timeout = idle_timeout
+        self._last_request = time.monotonic()
+        self._busy = 0
+        self._shutdown_requested = False
+        self._lock = threading.Lock()
+        # One request runs the models at a time; a second client waits rather than doubling the memory
+        self._model_lock = threading.Lock()
+        self._listener = None
+
+    def handle(self, request):
+        """
+        Runs one request.
+
+        Args:
+            request (tuple): ('summarize', texts, batch_size, backend, num_threads),
+                ('classify', texts, candidate_labels, batch_size), ('ping',) or ('shutdown',).
+
+        Returns:
+            The results of the request.
+        """
+        kind = request[0]
+        if kind == "ping":
+            return os.getpid()
+        if kind == "shutdown":
+            # The worker exits once the requests of other clients, if any, are done
+            with self._lock:
+                self._shutdown_requested = True
+            return os.getpid()
+        with self._model_lock:
+            if kind == "summarize":
+                _, texts, batch_size, backend, num_threads = request
+                return summarize(texts, batch_size=batch_size, backend=backend, num_threads=num_threads)
+            if kind == "classify":
+                _, texts, candidate_labels, batch_size = request
+                return classify(texts, candidate_labels, batch_size=batch_size)
+        raise ValueError(f"Unknown request '{kind}'")
+
+    def _serve_connection(self, connection):
+        with connection:
+            while True:
+                try:
+                    request = connection.recv()
+                except (EOFError, OSError):
+                    return
+                with self._lock:
+                    self._busy += 1
+                try:
+                    reply = ("ok", self.handle(request))
+                except Exception as e:
+                    reply = ("error", f"{type(e).__name__}: {e}")
+                finally:
+                    with self._lock:
+                        self._busy -= 1
+                        self._last_request = time.monotonic()
+                try:
+                    connection.send(reply)
+                except OSError:
+                    return
+
+    def _watch_idle(self):
+        while True:
+            time.sleep(min(5.0, self.idle_timeout))
+            with self._lock:
+                shutdown = self._shutdown_requested and self._busy == 0
+                idle = self._busy == 0 and time.monotonic() - self._last_request >= self.idle_timeout
+            if shutdown or idle:
+                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                reason = "shutdown requested" if shutdown else f"idle for {self.idle_timeout:.0f} s"
+                print(f"{timestamp}: Inference worker {reason}, exiting.", flush=True)
+                self._remove_socket()
+                # Exiting the process is what returns the model memory to the OS
+                os._exit(0)
+
+    def _remove_socket(self):
+        if sys.platform != "win32":
+            try:
+                os.remove(self.address)
+            except OSError:
+                pass
+
+    def serve_forever(self):
+        """ Accepts clients until the idle timeout; returns at once if another worker is already serving """
+        if sys.platform != "win32" and os.path.exists(self.address):
+            try:
+                Client(self.address, authkey=self.authkey).close()
+                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                print(f"{timestamp}: An inference worker is already running at {self.address}.", flush=True)
+                return
+            except AuthenticationError:
+                # A worker started with an older key; it owns the socket and exits after its idle timeout
+                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                print(f"{timestamp}: A worker with another key is listening at {self.address}, not starting.", flush=True)
+                return
+            except OSError:
+                # Left behind by a worker that did not exit cleanly
+                self._remove_socket()
+
+        self._listener = Listener(self.address, authkey=self.authkey)
+        threading.Thread(target=self._watch_idle, name="idle-watch", daemon=True).start()
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{timestamp}: Inference worker {os.getpid()} listening on {self.address}.", flush=True)
+        try:
+            while True:
+                try:
+                    connection = self._listener.accept()
+                except (OSError, AuthenticationError):
+                    continue  # A client that failed to authenticate
+                threading.Thread(target=self._serve_connection, args=(connection,), name="inference-client",
+                                 daemon=True).start()
+        finally:
+            self._listener.close()
+            self._remove_socket()
+
+
+class InferenceClient:
+    def __init__(self, address=None, authkey=None, idle_timeout=DEFAULT_IDLE_TIMEOUT, start_timeout=DEFAULT_START_TIMEOUT):
+        """
+        Args:
+            address (str): Socket path or pipe name, defaults to default_address().
+            authkey (bytes): Key to authenticate with, defaults to load_authkey().
+            idle_timeout (float): Idle timeout passed to a worker started by this client.
+            start_timeout (float): Seconds to wait for a started worker to accept connections.
+        """
+        self.address = address or default_address()
+        self.authkey = authkey if authkey is not None else load_authkey()
+        self.idle_timeout = idle_timeout
+        self.start_timeout = start_timeout
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _start_worker(self):
+        log_file = open(os.path.join(DEFAULT_DATA_DIR, "inference_worker.log"), "a")
+        options = {"start_new_session": True} if sys.platform != "win32" else \
+            {"creationflags": subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+        if getattr(sys, "frozen", False):
+            # The worker outlives the app, so it unpacks a onefile build on its own instead of sharing the
+            # app's temporary directory, and does not keep that directory busy as its working directory
+            cwd = DEFAULT_DATA_DIR
+            options["env"] = dict(os.environ, PYINSTALLER_RESET_ENVIRONMENT="1")
+        else:
+            cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.Popen(worker_command(self.idle_timeout), cwd=cwd, stdin=subprocess.DEVNULL, stdout=log_file,
+                         stderr=subprocess.STDOUT, close_fds=True, **options)
+        log_file.close()
+
+    def _connect(self):
+        try:
+            return Client(self.address, authkey=self.authkey)
+        except OSError:
+            pass
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{timestamp}: Starting the inference worker...")
+        self._start_worker()
+        deadline = time.monotonic() + self.start_timeout
+        while True:
+            time.sleep(0.2)
+            try:
+                return Client(self.address, authkey=self.authkey)
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+
+    def request(self, *request):
+        """
+        Sends a request and returns its results, starting or reconnecting to the worker as needed.
+
+        Raises:
+            OSError, EOFError: The worker could not be started or reached.
+            InferenceWorkerError: The worker failed to run the request or rejected the key.
+        """
+        with self._lock:
+            for attempt in range(2):
+                if self._connection is None:
+                    try:
+                        self._connection = self._connect()
+                    except AuthenticationError as e:
+                        raise InferenceWorkerError(f"Inference worker rejected the key: {e}") from e
+                try:
+                    self._connection.send(request)
+                    status, result = self._connection.recv()
+                    break
+                except (EOFError, OSError):
+                    # The worker exited after its idle timeout; start it again once
+                    self._connection.close()
+                    self._connection = None
+                    if attempt:
+                        raise
+        if status != "ok":
+            raise InferenceWorkerError(f"Inference worker failed: {result}")
+        return result
+
+    def summarize(self, texts, batch_size=DEFAULT_BATCH_SIZE, backend=DEFAULT_SUMMARIZER_BACKEND,
+                  num_threads=DEFAULT_NUM_THREADS):
+        return self.request("summarize", list(texts), batch_size, backend, num_threads)
+
+    def classify(self, texts, candidate_labels, batch_size=DEFAULT_BATCH_SIZE):
+        return self.request("classify", list(texts), list(candidate_labels), batch_size)
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def shutdown(self):
+        """
+        Asks a running worker to exit, without starting one; called when the app closes.
+
+        A connection of its own is used, so a request still running on the shared one does not hold it up.
+
+        Returns:
+            bool: True if a worker was reached.
+        """
+        try:
+            with Client(self.address, authkey=self.authkey) as connection:
+                connection.send(("shutdown",))
+                connection.recv()
+        except (OSError, EOFError, AuthenticationError):
+            return False
+        return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve summarize/classify requests from a long-lived process.")
+    parser.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT)
+    args = parser.parse_args(argv)
+    InferenceWorker(idle_timeout=args.idle_timeout).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Function:
+    1. Run the refresh as a chain of stages (fetch -> parse -> enrich -> save), each in its own thread,
+       connected by bounded queues, so fetching one site overlaps with parsing or inference on another.
+    2. Record how long each stage spends on each site, and the wall-clock time of the whole run.
+
+I/O:
+    1. Input:
+        1.1 A source iterable of (site, payload) pairs, e.g. downloads in completion order
+        1.2 A list of (stage name, function) pairs, each function mapping (site, payload) to the next payload
+    2. Output:
+        2.1 A dict of {site: final payload, or None if a stage failed for the site}
+        2.2 A StageTimings object with the per-stage timings
+"""
+
+import datetime
+import queue
+import threading
+import time
+
+# Maximum number of items waiting between two stages
+DEFAULT_QUEUE_SIZE = 2
+
+_DONE = object()
+
+
+class StageTimings:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records = {}
+        self.wall_seconds = None
+
+    def record(self, stage, site, seconds):
+        """ Adds the time a stage spent on a site """
+        with self._lock:
+            self.records.setdefault(stage, []).append((site, seconds))
+
+    def timed(self, stage, site):
+        """ Returns a context manager recording the time spent in its block """
+        return _Timer(self, stage, site)
+
+    def summary(self):
+        """
+        Returns the timings aggregated per stage.
+
+        Returns:
+            dict: A dict of {stage: {'count', 'total_s', 'mean_s', 'max_s', 'per_site'}}, plus
+                'wall_s' with the wall-clock time of the run.
+        """
+        with self._lock:
+            summary = {}
+            for stage, records in self.records.items():
+                seconds = [elapsed for _, elapsed in records]
+                summary[stage] = {
+                    'count': len(seconds),
+                    'total_s': sum(seconds),
+                    'mean_s': sum(seconds) / len(seconds),
+                    'max_s': max(seconds),
+                    'per_site': {site: elapsed for site, elapsed in records},
+                }
+            summary['wall_s'] = self.wall_seconds
+            return summary
+
+    def report(self):
+        """ Returns the per-stage timings as printable lines """
+        summary = self.summary()
+        lines = []
+        for stage, stats in summary.items():
+            if stage == 'wall_s':
+                continue
+            lines.append(f"{stage:<8} {stats['count']:>3} items  total {stats['total_s']:8.3f}s  "
+                         f"mean {stats['mean_s']:8.3f}s  max {stats['max_s']:8.3f}s")
+        if summary['wall_s'] is not None:
+            lines.append(f"{'wall':<8} {summary['wall_s']:8.3f}s")
+        return lines
+
+
+class _Timer:
+    def __init__(self, timings, stage, site):
+        self.timings = timings
+        self.stage = stage
+        self.site = site
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timings.record(self.stage, self.site, time.perf_counter() - self.start)
+        return False
+
+
+def _log_error(stage, site, ex):
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{timestamp}: Error - pipeline stage '{stage}' failed for {site}. Details: {ex}")
+
+
+def _produce(source, out_queue):
+    try:
+        for site, payload in source:
+            out_queue.put((site, payload))
+    except Exception as ex:
+        _log_error("source", "all sites", ex)
+    finally:
+        out_queue.put(_DONE)
+
+
+def _consume(stage, func, in_queue, out_queue, timings, failed):
+    while True:
+        item = in_queue.get()
+        if item is _DONE:
+            out_queue.put(_DONE)
+            return
+        site, payload = item
+        try:
+            with timings.timed(stage, site):
+                result = func(site, payload)
+        except Exception as ex:
+            _log_error(stage, site, ex)
+            failed.add(site)
+            continue
+        if result is None:
+            failed.add(site)
+            continue
+        out_queue.put((site, result))
+
+
+def run_pipeline(source, stages, queue_size=DEFAULT_QUEUE_SIZE, timings=None):
+    """
+    Streams the items of source through the stages, one thread per stage.
+
+    A stage returning None, or raising, drops the item for that site only.
+
+    Args:
+        source (iterable): Yields (site, payload) pairs; iterated in its own thread.
+        stages (list): A list of (stage name, function) pairs, each function taking (site, payload).
+        queue_size (int): Maximum number of items waiting between two stages.
+        timings (StageTimings): Receives the per-stage timings, a new one is created if None.
+
+    Returns:
+        tuple: (results, timings) where results is a dict of {site: final payload or None}.
+    """
+    if timings is None:
+        timings = StageTimings()
+    start = time.perf_counter()
+
+    queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in range(len(stages) + 1)]
+    failed = set()
+    threads = [threading.Thread(target=_produce, args=(source, queues[0]), name="pipeline-source", daemon=True)]
+    for index, (stage, func) in enumerate(stages):
+        threads.append(threading.Thread(
+            target=_consume, args=(stage, func, queues[index], queues[index + 1], timings, failed),
+            name=f"pipeline-{stage}", daemon=True))
+    for thread in threads:
+        thread.start()
+
+    # Results stream out of the last queue as each site completes
+    results = {}
+    while True:
+        item = queues[-1].get()
+        if item is _DONE:
+            break
+        site, payload = item
+        results[site] = payload
+
+    for thread in threads:
+        thread.join()
+    for site in failed:
+        results.setdefault(site, None)
+
+    timings.wall_seconds = time.perf_counter() - start
+    return results, timings
@@ -0,0 +1,237 @@
+"""
+Function:
+    1. Refresh each site on its own interval, with random jitter so sites and machines do not all refresh at once.
+    2. Run one refresh at a time: a lock held across threads and processes keeps two refreshes from writing
+       the news store and final.csv together; a refresh that finds the lock taken is retried later.
+    3. Persist when each site was last refreshed and check the wall clock at least once a minute, so sites
+       that came due while the machine slept or the app was closed are caught up once, right away.
+    4. Cancel the pending wait on stop(), and ask a running refresh to stop between two stages, so closing the
+       app never waits on a timer and never cuts a refresh off in the middle of writing the store or the CSV.
+
+I/O:
+    1. Input:
+        1.1 A function refreshing a list of sites, returning {site: result or None on failure}; it is passed
+            an event set on stop() and skips the remaining stages of a refresh once it is set
+        1.2 The refresh interval of each site in seconds
+    2. Output:
+        2.1 A JSON file with the last refresh time of each site ('schedule.json')
+        2.2 A lock file held during a refresh ('refresh.lock')
+"""
+
+import datetime
+import json
+import os
+import random
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Fraction of a site's interval its next refresh is moved earlier or later by, at random
+DEFAULT_JITTER = 0.1
+
+# Longest sleep between two looks at the wall clock, which bounds the catch-up delay after a suspend
+DEFAULT_CHECK_INTERVAL = 60.0
+
+# Delay before a failed site, or a refresh that found the lock taken, is tried again
+DEFAULT_RETRY_DELAY = 15 * 60
+
+# Seconds stop() waits for a running refresh to finish its current stage
+DEFAULT_STOP_TIMEOUT = 10.0
+
+
+class RefreshLock:
+    """ A non-blocking lock held by one thread of one process at a time, backed by a lock file """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def acquire(self):
+        """ Returns True if the lock was taken, False if another thread or process holds it """
+        if not self._thread_lock.acquire(blocking=False):
+            return False
+        lock_file = open(self.path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            self._thread_lock.release()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+            self._thread_lock.release()
+
+
+class RefreshScheduler:
+    def __init__(self, run_sites, intervals, state_path, lock_path, jitter=DEFAULT_JITTER, on_complete=None,
+                 check_interval=DEFAULT_CHECK_INTERVAL, retry_delay=DEFAULT_RETRY_DELAY):
+        """
+        Args:
+            run_sites (callable): Takes a list of sites and a cancel event, refreshes the sites and returns
+                {site: result or None on failure}; stages left when the event is set are skipped.
+            intervals (dict): {site: refresh interval in seconds}.
+            state_path (str): JSON file the last refresh times are kept in.
+            lock_path (str): Lock file shared by every process refreshing the same data.
+            jitter (float): Fraction of the interval the next refresh is moved by, at random.
+            on_complete (callable): Called with the results after each refresh, e.g. to reload the ticker.
+            check_interval (float): Longest sleep between two looks at the wall clock.
+            retry_delay (float): Delay before a failed or locked-out refresh is tried again.
+        """
+        self.run_sites = run_sites
+        self.intervals = dict(intervals)
+        self.state_path = state_path
+        self.lock = RefreshLock(lock_path)
+        self.jitter = jitter
+        self.on_complete = on_complete
+        self.check_interval = check_interval
+        self.retry_delay = retry_delay
+
+        self.last_refresh = self._load_state()
+        # Sites never refreshed are due right away
+        self.next_due = {site: self._plan(site, self.last_refresh.get(site)) for site in self.intervals}
+        self._requested = set()
+        # run_now() is called from the UI thread, run_due() on the scheduler thread
+        self._requested_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as state_file:
+                return {site: float(when) for site, when in json.load(state_file).items()}
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def _save_state(self):
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as state_file:
+            json.dump(self.last_refresh, state_file)
+        os.replace(temp_path, self.state_path)
+
+    def _plan(self, site, last_refresh):
+        if last_refresh is None:
+            return 0.0
+        interval = self.intervals[site]
+        return last_refresh + interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def start(self):
+        """ Start scheduling on a daemon thread """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=DEFAULT_STOP_TIMEOUT):
+        """
+        Cancels the pending wait and asks a refresh in progress to stop after its current stage.
+
+        Args:
+            timeout (float): Seconds to wait for the scheduler thread to finish.
+
+        Returns:
+            bool: True if the thread finished, False if a stage was still running after the timeout.
+        """
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread is None or self._thread is threading.current_thread():
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def run_now(self, sites=None):
+        """ Refresh the given sites (default: all of them) as soon as the current refresh, if any, is done """
+        sites = list(sites) if sites is not None else list(self.intervals)
+        unknown = [site for site in sites if site not in self.intervals]
+        if unknown:
+            raise ValueError(f"Unknown site(s) {', '.join(unknown)}, expected one of {', '.join(self.intervals)}")
+        with self._requested_lock:
+            self._requested.update(sites)
+        self._wake.set()
+
+    def due_sites(self, now=None):
+        """ Returns the sites due by now, plus those coming due within the next check, so they refresh together """
+        now = time.time() if now is None else now
+        due = {site for site, when in self.next_due.items() if when <= now + self.check_interval}
+        with self._requested_lock:
+            return sorted(due | self._requested)
+
+    def run_due(self):
+        """
+        Refreshes the sites that are due, unless another refresh holds the lock.
+
+        Returns:
+            dict: The results of run_sites, or None if nothing was due or the lock was taken.
+        """
+        sites = self.due_sites()
+        if not sites:
+            return None
+        if not self.lock.acquire():
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{timestamp}: Another refresh is running, retrying {', '.join(sites)} later.")
+            for site in sites:
+                self.next_due[site] = max(self.next_due[site], time.time() + self.retry_delay)
+            return None
+
+        try:
+            with self._requested_lock:
+                self._requested.difference_update(sites)
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{timestamp}: Scheduled refresh of {', '.join(sites)}.")
+            try:
+                results = self.run_sites(sites, self._stop_event)
+            except Exception as e:
+                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                print(f"{timestamp}: Error - Refresh failed: {e}")
+                results = {site: None for site in sites}
+
+            # A site is planned from the end of its refresh, however many intervals were missed;
+            # sites skipped by a stop() count as failed and are retried on the next start
+            finished = time.time()
+            for site in sites:
+                if results.get(site) is None:
+                    self.next_due[site] = finished + self.retry_delay
+                else:
+                    self.last_refresh[site] = finished
+                    self.next_due[site] = self._plan(site, finished)
+            self._save_state()
+        finally:
+            self.lock.release()
+
+        # After stop() the app is closing, and its reload callback may no longer have a window to update
+        if self.on_complete is not None and not self._stop_event.is_set():
+            self.on_complete(results)
+        return results
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.run_due()
+            if self._stop_event.is_set():
+                return
+            # Wake at the next due time, but look at the wall clock at least every check_interval
+            # seconds, since a suspended machine does not advance a waiting timer
+            wait = min(self.next_due.values(), default=time.time() + self.check_interval) - time.time()
+            self._wake.wait(max(1.0, min(wait, self.check_interval)))
+            self._wake.clear()
@@ -0,0 +1,169 @@
+"""
+Function:
+    1. Describe every news site as a SiteAdapter: its URL, a precompiled selector for the news item
+       elements, a field extractor and an optional enrichment step run on the extracted items.
+    2. Keep the adapters in a registry, so the fetch/parse pipeline iterates over sites instead of
+       branching on the site identifier.
+
+I/O:
+    1. Input:
+        1.1 The HTML content of a site's page (str)
+    2. Output:
+        2.1 The extracted details (date, title, URL, label) of each news item (list of dict)
+"""
+
+import datetime
+import re
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml is considerably faster than the standard library parser when it is installed
+try:
+    import lxml  # noqa: F401
+    FAST_PARSER = 'lxml'
+except ImportError:
+    FAST_PARSER = 'html.parser'
+
+# Seconds between two scheduled refreshes of a site, unless its adapter says otherwise
+DEFAULT_REFRESH_INTERVAL = 24 * 60 * 60
+
+
+def build_strainer(name, attrs):
+    """
+    Builds a SoupStrainer that keeps the elements matching the given tag name and class.
+
+    Strainers see the raw class attribute, so the class is matched as a run of whole
+    class names; find_all then applies the exact selector to the strained tree.
+    """
+    class_name = attrs.get("class")
+    if not class_name:
+        return SoupStrainer(name, attrs=attrs)
+    class_pattern = re.compile(r"(?:^|\s)" + re.escape(class_name) + r"(?:\s|$)")
+    return SoupStrainer(name, attrs={**attrs, "class": class_pattern})
+
+
+class SiteAdapter:
+    def __init__(self, name, url, item_tag, item_attrs, extract, enrich=None, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        """
+        Args:
+            name (str): The site identifier, also recorded in the news store.
+            url (str): The URL of the page listing the site's news.
+            item_tag (str): Tag name of the element holding one news item.
+            item_attrs (dict): Attributes of the element holding one news item.
+            extract (callable): Function mapping a news item element to a dict with
+                'Summary', 'URL', 'Date' and 'Final Label' keys.
+            enrich (callable): Optional function taking and returning the DataFrame of extracted items.
+            refresh_interval (float): Seconds between two scheduled refreshes of the site.
+        """
+        self.name = name
+        self.url = url
+        self.item_tag = item_tag
+        self.item_attrs = item_attrs
+        self.extract = extract
+        self.enrich = enrich
+        self.refresh_interval = refresh_interval
+        # The strainer is built once, so each parse only materializes the news item elements
+        self.strainer = build_strainer(item_tag, item_attrs)
+
+    def select_items(self, html_content, fast=True):
+        """
+        Returns the elements holding the news items of a page.
+
+        Args:
+            html_content (str): The HTML content to parse.
+            fast (bool): Parse with the fastest available parser and only build the news item
+                elements; when False the whole page is parsed with html.parser.
+
+        Returns:
+            list: The news item elements.
+        """
+        if fast:
+            soup = BeautifulSoup(html_content, FAST_PARSER, parse_only=self.strainer)
+        else:
+            soup = BeautifulSoup(html_content, 'html.parser')
+        return soup.find_all(self.item_tag, attrs=self.item_attrs)
+
+    def extract_items(self, elements):
+        """
+        Extracts the details of each news item element, skipping elements that cannot be parsed.
+        Relative item URLs are resolved against the page URL, so the article crawler can fetch them.
+
+        Args:
+            elements (list): The news item elements.
+
+        Returns:
+            list: A list of dicts with 'Summary', 'URL', 'Date' and 'Final Label' keys.
+        """
+        items = []
+        failures = 0
+        for element in elements:
+            try:
+                item = self.extract(element)
+                if item.get('URL'):
+                    item['URL'] = urljoin(self.url, item['URL'])
+                items.append(item)
+            except Exception:
+                failures += 1
+
+        if failures:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{timestamp}: Warning - skipped {failures} of {len(elements)} news items for {self.name} that could not be parsed.")
+        return items
+
+
+def extract_hackernews(div):
+    title = div.find('h2').text.strip()
+    link_tag = div.find('a', href=True)
+    if link_tag:
+        url = link_tag['href']
+    else:
+        url = None
+    label_date_div = div.find('div', class_='item-label')
+    date = label_date_div.find('span', class_='h-datetime').text.strip()
+    label = label_date_div.find('span', class_='h-tags').text.strip()
+    return {'Summary': title, 'URL': url, 'Date': date, 'Final Label': label}
+
+
+def extract_cyber(div):
+    title = div.find('p').text.strip()
+    url = div['href']
+    date = div.find('header').text.strip()
+    return {'Summary': title, 'URL': url, 'Date': date, 'Final Label': 'n'}
+
+
+def extract_afp(div):
+    title_div = div.find('div', class_='field--name-node-title')
+    if title_div:
+        title = title_div.text.strip()
+    else:
+        title = None
+    link_tag = div.find('a', href=True)
+    if link_tag:
+        url = "https://afp.gov.au" + link_tag['href']
+    else:
+        url = None
+    date_div = div.find('div', class_='card--date')
+    if date_div:
+        date = date_div.text.strip()
+    else:
+        date = None
+    return {'Summary': title, 'URL': url, 'Date': date, 'Final Label': "cyber"}
+
+
+# Registered sites by identifier, in the order they are refreshed
+SITE_ADAPTERS = {}
+
+
+def register_site(adapter):
+    """ Adds a site adapter to the registry, replacing any adapter with the same name """
+    SITE_ADAPTERS[adapter.name] = adapter
+    return adapter
+
+
+def get_site(site):
+    """ Returns the registered adapter for a site identifier """
+    try:
+        return SITE_ADAPTERS[site]
+    except KeyError:
+        raise ValueError(f"Unknown site '{site}', registered sites are {list(SITE_ADAPTERS)}")
@@ -4,22 +4,39 @@
 Function:
     1. Download HTML content from multiple URLs (Cyber.gov.au, AFP, Hacker News).
     2. Parse the HTML content and extract specific details (date, title, URL, label).
-    3. Save the extracted details into a single CSV file, appending data if the file already exists.
+    3. Upsert the extracted details into the news store, appending new or changed items to a single CSV file.
 
 I/O:
     1. Input:
         1.1 URLs of the webpages to download (list of str)
     2. Output:
-        2.1 A CSV file ('final_new.csv') containing the extracted details (date, title, URL, label) for all webpages.
+        2.1 A SQLite file ('news.sqlite3') with every item seen, keyed on URL and content hash.
+        2.2 A CSV file ('final.csv') containing the extracted details (date, title, URL, label) for all webpages.
 """
 
 import datetime
 import os
-import requests
-from bs4 import BeautifulSoup
+import sys
+import time
+from urllib.parse import urljoin
 import pandas as pd
-from transformers import pipeline
 
+if __name__ == "__main__" and not __package__:
+    # Allow running as "python spider/spider.py" as well as "python -m spider.spider"
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from diagnostics import tracing
+from spider.articles import ArticleCrawler, ArticleIndex
+from spider.fetch import DEFAULT_TIMEOUT, fetch_all, fetch_iter, get_session
+from spider.http_cache import HttpCache, body_hash
+from spider.classifiers import DEFAULT_CLASSIFIER_BACKEND, get_classifier
+from spider.inference import (CANDIDATE_LABELS, DEFAULT_BATCH_SIZE, DEFAULT_NUM_THREADS, DEFAULT_SUMMARIZER_BACKEND,
+                              InferenceCache, summarize)
+from spider.inference_worker import DEFAULT_IDLE_TIMEOUT, InferenceClient, InferenceWorkerError
+from spider.pipeline import DEFAULT_QUEUE_SIZE, StageTimings, run_pipeline
+from spider.scheduler import RefreshLock, RefreshScheduler
+from spider.sites import SITE_ADAPTERS, SiteAdapter, extract_afp, extract_cyber, extract_hackernews, get_site, register_site
+from spider.store import CSV_COLUMNS, NewsStore
 
 def get_writable_path(filename):
     """ Determine a writable directory for storing the updated CSV file """
@@ -29,12 +46,100 @@ def get_writable_path(filename):
     return writable_path
 
 
-def download_html(url):
+_http_cache = None
+
+
+def get_http_cache():
+    """ Returns the on-disk HTTP response cache stored under the BlackBoomerang directory """
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = HttpCache(os.path.dirname(get_writable_path(os.path.join("http_cache", "index"))))
+    return _http_cache
+
+
+_inference_cache = None
+
+
+def get_inference_cache():
+    """ Returns the cache of summary and label results stored under the BlackBoomerang directory """
+    global _inference_cache
+    if _inference_cache is None:
+        _inference_cache = InferenceCache(get_writable_path("inference_cache.sqlite3"))
+    return _inference_cache
+
+
+# Run the models in the long-lived inference worker process instead of this one; a frozen (PyInstaller)
+# build starts its own executable as the worker, see inference_worker.worker_command()
+USE_INFERENCE_WORKER = True
+
+# Seconds the inference worker stays up without a request; the models are released between two daily
+# refreshes and loaded again by the next one
+INFERENCE_WORKER_IDLE_TIMEOUT = DEFAULT_IDLE_TIMEOUT
+
+_inference_client = None
+
+
+def get_inference_worker():
+    """ Returns the client of the inference worker, or None if the models run in this process """
+    global _inference_client
+    if not USE_INFERENCE_WORKER:
+        return None
+    if _inference_client is None:
+        _inference_client = InferenceClient(idle_timeout=INFERENCE_WORKER_IDLE_TIMEOUT)
+    return _inference_client
+
+
+def shutdown_inference_worker():
+    """ Asks the inference worker to exit, so closing the app also releases the model memory """
+    if not USE_INFERENCE_WORKER:
+        return False
+    return (_inference_client or InferenceClient()).shutdown()
+
+
+# Summarize the full text of each Cyber.gov.au article instead of the teaser on its listing card
+CRAWL_ARTICLE_BODIES = False
+
+_article_crawler = None
+
+
+def get_article_crawler():
+    """ Returns the article crawler, whose seen-URL index is stored under the BlackBoomerang directory """
+    global _article_crawler
+    if _article_crawler is None:
+        _article_crawler = ArticleCrawler(ArticleIndex(get_writable_path("articles.sqlite3")))
+    return _article_crawler
+
+
+_news_store = None
+
+
+def resolve_stored_url(url, site):
+    """ Resolves the relative URL of a stored item against its site's page URL """
+    # Rows imported from final.csv have no site; cyber is the only site whose cards link with relative URLs
+    adapter = SITE_ADAPTERS.get(site) or SITE_ADAPTERS.get('cyber')
+    return urljoin(adapter.url, url) if adapter is not None else None
+
+
+def get_news_store():
+    """ Returns the news store, which keeps the writable final.csv at one row per item """
+    global _news_store
+    if _news_store is None:
+        _news_store = NewsStore(get_writable_path("news.sqlite3"), csv_path=get_writable_path("final.csv"))
+        # Items stored before relative URLs were resolved would otherwise be shown again under the absolute URL
+        _news_store.resolve_urls(resolve_stored_url)
+    return _news_store
+
+
+def download_html(url, timeout=DEFAULT_TIMEOUT):
     """
-    Downloads the HTML content from the given URL.
+    Downloads the HTML content from the given URL over the shared keep-alive session.
+
+    A conditional request is sent when the page is already cached, and the cached
+    body is returned if the server answers 304 Not Modified.
 
     Args:
         url (str): The URL to download the HTML content from.
+        timeout (tuple): The (connect, read) timeout in seconds.
 
     Returns:
         str: The downloaded HTML content.
@@ -42,20 +147,50 @@ def download_html(url):
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"{timestamp}: Executing download_html for {url}")
 
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Check that the request was successful
-        html_content = response.text
-
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"{timestamp}: Success - HTML content downloaded successfully.")
+    with tracing.span("fetch", url=url) as span:
+        try:
+            cache = get_http_cache()
+            response = get_session().get(url, timeout=timeout, headers=cache.conditional_headers(url))
+            if response.status_code == 304:
+                html_content = cache.load_body(url)
+                if html_content is not None:
+                    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    print(f"{timestamp}: Success - HTML content not modified, using cached copy.")
+                    span.set(status=304)
+                    return html_content
+                # The cached body is gone, download it again without validators
+                response = get_session().get(url, timeout=timeout)
+
+            response.raise_for_status()  # Check that the request was successful
+            html_content = response.text
+            span.set(status=response.status_code, bytes=len(html_content))
+            cache.save_response(url, html_content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{timestamp}: Success - HTML content downloaded successfully.")
+
+            return html_content
+
+        except Exception as ex:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{timestamp}: Error - download_html encountered an error. Details: {ex}")
+            span.set(error=type(ex).__name__)
+            return None
+
+
+def download_all(urls_and_sites=None):
+    """
+    Downloads the HTML content of all sites in parallel.
 
-        return html_content
+    Args:
+        urls_and_sites (dict): A dict of {url: site} pairs, defaults to URLS_AND_SITES.
 
-    except Exception as ex:
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"{timestamp}: Error - download_html encountered an error. Details: {ex}")
-        return None
+    Returns:
+        dict: A dict of {url: html_content} pairs (None for failed downloads).
+    """
+    if urls_and_sites is None:
+        urls_and_sites = URLS_AND_SITES
+    return fetch_all(urls_and_sites, download_html)
 
 
 def get_url_list(url_list, position_div_list, site):
@@ -66,141 +201,362 @@ def get_url_list(url_list, position_div_list, site):
     Args:
         url_list (list): A list to store the extracted details (date, title, content, URL).
         position_div_list (list): A list of div elements containing the news item details.
-        site (str): The site identifier to adapt the parsing logic for each site.
-    """
-    for div in position_div_list:
-        instance = dict()
-
-        if site == 'hackernews':
-            title = div.find('h2').text.strip()
-            link_tag = div.find('a', href=True)
-            if link_tag:
-                url = link_tag['href']
-            else:
-                url = None
-            label_date_div = div.find('div', class_='item-label')
-            date = label_date_div.find('span', class_='h-datetime').text.strip()
-            label = label_date_div.find('span', class_='h-tags').text.strip()
-
-        elif site == 'cyber':
-            title = div.find('p').text.strip()
-
-            url = div['href']
-
-            date = div.find('header').text.strip()
-            label = 'n'
-
-        elif site == 'afp':
-            title_div = div.find('div', class_='field--name-node-title')
-            if title_div:
-                title = title_div.text.strip()
-            else:
-                title = None
-            link_tag = div.find('a', href=True)
-            if link_tag:
-                url = "https://afp.gov.au" + link_tag['href']
-            else:
-                url = None
-            date_div = div.find('div', class_='card--date')
-            if date_div:
-                date = date_div.text.strip()
-            else:
-                date = None
-            label = "cyber"
-
-        instance['Summary'] = title
-        instance['URL'] = url
-        instance['Date'] = date
-        instance['Final Label'] = label
-
-        url_list.append(instance)
-def run_summarization_and_classification(df):
+        site (str): The site identifier of the adapter whose extractor is used.
     """
-    Perform summarization and classification on Cyber.gov.au content.
+    url_list.extend(get_site(site).extract_items(position_div_list))
+
+
+def select_news_items(html_content, site, fast=True):
+    """
+    Returns the elements holding the news items of a page.
 
     Args:
-        df (pandas.DataFrame): DataFrame containing the Cyber.gov.au data.
+        html_content (str): The HTML content to parse.
+        site (str): The site identifier of the adapter whose selector is used.
+        fast (bool): Parse with the fastest available parser and only build the news item
+            elements; when False the whole page is parsed with html.parser.
 
     Returns:
-        pandas.DataFrame: DataFrame with added summarization and classification results.
+        list: The news item elements.
+    """
+    return get_site(site).select_items(html_content, fast=fast)
+
+
+def summarize_article_bodies(urls, teasers, summarize_batch, batch_size=DEFAULT_BATCH_SIZE):
     """
-    # Initialize the summarization and classification pipelines
-    summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-    classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+    Summarizes the article behind each URL, a batch at a time as the crawler delivers the texts,
+    so inference runs while the remaining articles are still downloading.
+
+    Args:
+        urls (list): The article URL of each item.
+        teasers (list): The listing text of each item, summarized when its article has no text.
+        summarize_batch (callable): Function taking a list of texts and returning their summaries.
+        batch_size (int): Number of articles collected before a batch is summarized.
 
-    # Prepare lists to store the summary and classification results
-    summaries = []
-    final_labels = []
+    Returns:
+        list: The summary of each item, in the order of urls.
+    """
+    positions = {}
+    for position, url in enumerate(urls):
+        if url:
+            positions.setdefault(url, []).append(position)
+    summaries = [None] * len(urls)
+    pending = []
+
+    def flush():
+        if pending:
+            for (indices, _), summary in zip(pending, summarize_batch([text for _, text in pending])):
+                for index in indices:
+                    summaries[index] = summary
+            pending.clear()
+
+    for url, text in get_article_crawler().iter_bodies(list(positions)):
+        indices = positions[url]
+        pending.append((indices, text or teasers[indices[0]]))
+        if len(pending) >= batch_size:
+            flush()
+
+    # Items without a URL fall back to their teaser
+    crawled = {index for indices in positions.values() for index in indices}
+    pending.extend(([index], teasers[index]) for index in range(len(urls)) if index not in crawled)
+    flush()
+    return summaries
+
+
+def run_summarization_and_classification(df, batch_size=DEFAULT_BATCH_SIZE, classifier_backend=DEFAULT_CLASSIFIER_BACKEND,
+                                         summarizer_backend=DEFAULT_SUMMARIZER_BACKEND, num_threads=DEFAULT_NUM_THREADS,
+                                         crawl_bodies=CRAWL_ARTICLE_BODIES):
+    """
+    Perform summarization and classification on Cyber.gov.au content.
 
-    # Specify candidate labels for classification
-    candidate_labels = ["cyber security", "business", "finance", "technology"]
+    The pipelines run in the inference worker process (loaded once and kept across refreshes),
+    texts are processed in batches and results for content that has been seen before are taken
+    from the inference cache. With crawl_bodies, the article behind each item is fetched (once,
+    every article is kept in the article index) and its text is summarized instead of the teaser.
 
-    # Iterate over each row in the DataFrame
-    for _, row in df.iterrows():
-        content = row['Summary']
+    Args:
+        df (pandas.DataFrame): DataFrame containing the Cyber.gov.au data.
+        batch_size (int): Number of items fed to each pipeline call.
+        classifier_backend (str): 'bart' (zero-shot BART), 'tfidf' (trained from final.csv) or 'keyword'.
+        summarizer_backend (str): 'torch' (fp32), 'int8' (dynamically quantized) or 'onnx' (onnxruntime).
+        num_threads (int): CPU threads for the models, or None for the library default.
+        crawl_bodies (bool): Summarize the full article text instead of the listing teaser.
 
-        # Perform summarization
-        summary_result = summarizer(content, max_length=30, min_length=10, do_sample=False)
-        summary_text = summary_result[0]['summary_text']
-        summaries.append(summary_text)
+    Returns:
+        pandas.DataFrame: DataFrame with added summarization and classification results.
+    """
+    contents = df['Summary'].fillna('').astype(str).tolist()
+    cache = get_inference_cache()
+    worker = get_inference_worker()
+
+    def infer(worker):
+        def summarize_batch(texts):
+            with tracing.span("inference.summarize", items=len(texts), backend=summarizer_backend,
+                              in_worker=worker is not None):
+                return summarize(texts, batch_size=batch_size, cache=cache, worker=worker,
+                                 backend=summarizer_backend, num_threads=num_threads)
+
+        if crawl_bodies:
+            # Articles fetched before come from the index, so a retry after a worker failure does not crawl again
+            summaries = summarize_article_bodies(df['URL'].tolist(), contents, summarize_batch, batch_size)
+        else:
+            summaries = summarize_batch(contents)
+        # The classifier reads each item's teaser, as it did before article bodies were crawled. The tfidf
+        # backend is trained on the Summary column of final.csv, which holds the summaries of cyber items,
+        # so for those it predicts on a different text than it learned from
+        classifier = get_classifier(classifier_backend, CANDIDATE_LABELS, training_csv=get_writable_path('final.csv'),
+                                    batch_size=batch_size, cache=cache, worker=worker)
+        with tracing.span("inference.classify", items=len(contents), backend=classifier_backend,
+                          in_worker=worker is not None):
+            labels = classifier.predict(contents)
+        return summaries, labels
 
-        # Perform classification
-        classification_result = classifier(content, candidate_labels)
-        max_score_index = classification_result['scores'].index(max(classification_result['scores']))
-        final_label = classification_result['labels'][max_score_index]
-        final_labels.append(final_label)
+    try:
+        summaries, labels = infer(worker)
+    except (OSError, EOFError, InferenceWorkerError) as e:
+        if worker is None:
+            raise
+        # The worker could not be started, reached or run the models; results it already returned are in the cache
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{timestamp}: Inference worker unavailable ({e}), running the models in this process.")
+        summaries, labels = infer(None)
 
     # Add the summary and classification results as new columns in the DataFrame
     df['Summary'] = summaries
-    df['Final Label'] = final_labels
+    df['Final Label'] = labels
     # Retain only the necessary columns
     df = df[['Summary', 'URL', 'Date', 'Final Label']]
 
     return df
 
 
-def parse_and_save_news(html_content, site):
+# Sites refreshed by the spider, in order; new feeds only need an extractor and a registration here
+# Sites that publish often are refreshed more often; unchanged pages cost a 304 thanks to the HTTP cache
+register_site(SiteAdapter(
+    'hackernews', "https://thehackernews.com/",
+    "div", {"class": "body-post clear"},
+    extract_hackernews,
+    refresh_interval=6 * 60 * 60))
+register_site(SiteAdapter(
+    'cyber', "https://www.cyber.gov.au/about-us/view-all-content/news-and-media",
+    "a", {"class": "card--alert flex flex-col w-full h-full px-6 pt-6 pb-[56] border relative rounded-sm size--small rating-- color--white"},
+    extract_cyber,
+    # Perform summarization and classification for Cyber.gov.au data
+    enrich=run_summarization_and_classification))
+register_site(SiteAdapter(
+    'afp', "https://www.afp.gov.au/news-centre",
+    "div", {"class": "node--type-article"},
+    extract_afp,
+    refresh_interval=12 * 60 * 60))
+
+# URLs and corresponding site identifiers
+URLS_AND_SITES = {adapter.url: adapter.name for adapter in SITE_ADAPTERS.values()}
+
+
+def parse_news(html_content, site, fast_parse=True):
     """
-    Parses the HTML content, extracts details of news items, and saves them into a CSV file.
+    Parses the HTML content and extracts the details of its news items.
+
+    The rows parsed last time are reused if the page has not changed since.
 
     Args:
         html_content (str): The HTML content to parse.
-        site (str): The site identifier to adapt the parsing logic for each site.
+        site (str): The site identifier of the adapter used to parse the page.
+        fast_parse (bool): Only build the news item elements, see select_news_items.
+
+    Returns:
+        tuple: (df, content_hash, from_cache) where from_cache tells whether the rows were
+            reused and therefore need no enrichment.
     """
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"{timestamp}: Executing parse_and_save_news for {site}...")
+    with tracing.span("parse", site=site, bytes=len(html_content)) as span:
+        cache = get_http_cache()
+        content_hash = body_hash(html_content)
+        cached_rows = cache.load_parsed(site, content_hash)
+        if cached_rows is not None:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{timestamp}: Page unchanged for {site}, reusing {len(cached_rows)} parsed items.")
+            span.set(items=len(cached_rows), cached=True)
+            return pd.DataFrame(cached_rows, columns=CSV_COLUMNS), content_hash, True
 
-    try:
         # Parse the HTML content
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        if site == 'hackernews':
-            position_div_list = soup.find_all("div", class_="body-post clear")
-        elif site == 'cyber':
-            position_div_list = soup.find_all("a", class_="card--alert flex flex-col w-full h-full px-6 pt-6 pb-[56] border relative rounded-sm size--small rating-- color--white")
-        elif site == 'afp':
-            position_div_list = soup.find_all("div", class_="node--type-article")
+        position_div_list = select_news_items(html_content, site, fast=fast_parse)
 
-        # Extract and save the news details
+        # Extract the news details
         url_list = []
         get_url_list(url_list, position_div_list, site)
-        df = pd.DataFrame(url_list)
-        if site == 'cyber':
-            # Perform summarization and classification for Cyber.gov.au data
-            df = run_summarization_and_classification(df)
-        # Check if final_new.csv exists; if it does, append data, else create new file
-        csv_path = get_writable_path('final_new.csv')
-        if os.path.exists(csv_path):
-            df.to_csv(csv_path, mode='a', index=False, header=False)
-        else:
-            df.to_csv(csv_path, mode='w', index=False)
+        span.set(items=len(url_list), cached=False)
+        return pd.DataFrame(url_list, columns=CSV_COLUMNS), content_hash, False
+
+
+def enrich_news(df, site, content_hash, from_cache):
+    """
+    Runs the site's enrichment step on freshly parsed items and remembers the result for the page.
+
+    Args:
+        df (pandas.DataFrame): The parsed news items.
+        site (str): The site identifier.
+        content_hash (str): The hash of the page the items were parsed from.
+        from_cache (bool): Whether the items were reused from an earlier run.
+
+    Returns:
+        pandas.DataFrame: The enriched news items.
+    """
+    if from_cache:
+        return df
+
+    adapter = get_site(site)
+    if adapter.enrich is not None and not df.empty:
+        df = adapter.enrich(df)
+    get_http_cache().save_parsed(site, content_hash, df.to_dict('records'))
+    return df
+
+
+def save_news(df, site):
+    """
+    Saves the new or changed news items into the news store and the CSV file.
+
+    Args:
+        df (pandas.DataFrame): The news items.
+        site (str): The site identifier.
+
+    Returns:
+        int: The number of new or changed news items.
+    """
+    # Keep only the items that are new or changed since the last run
+    store = get_news_store()
+    changed_rows = store.upsert_items(df.to_dict('records'), site=site)
+
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{timestamp}: Success - {len(changed_rows)} new or changed of {len(df)} news items saved to {store.csv_path} for {site}.")
+    return len(changed_rows)
 
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"{timestamp}: Success - News details saved to {csv_path} for {site}.")
+
+def parse_and_save_news(html_content, site, fast_parse=True):
+    """
+    Parses the HTML content, extracts details of news items, and saves the new or changed ones
+    into the news store and the CSV file.
+
+    Args:
+        html_content (str): The HTML content to parse.
+        site (str): The site identifier of the adapter used to parse the page.
+        fast_parse (bool): Only build the news item elements, see select_news_items.
+
+    Returns:
+        int: The number of new or changed news items, or None if the page could not be processed.
+    """
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{timestamp}: Executing parse_and_save_news for {site}...")
+
+    try:
+        df, content_hash, from_cache = parse_news(html_content, site, fast_parse)
+        df = enrich_news(df, site, content_hash, from_cache)
+        return save_news(df, site)
 
     except Exception as ex:
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"{timestamp}: Error - parse_and_save_news encountered an error for {site}. Details: {ex}")
+        return None
+
+
+# Per-stage timings of the most recent run_spider call
+last_refresh_timings = None
+
+
+def run_spider(sites=None, streaming=True, queue_size=DEFAULT_QUEUE_SIZE, cancel=None):
+    """
+    Downloads all registered sites in parallel, then parses, enriches and saves each of them.
+
+    In streaming mode the stages run as a bounded-queue pipeline: a site is parsed as soon as
+    its download completes, while other sites are still downloading or being summarized, and
+    its items are saved as soon as they are ready. A site that fails in any stage is reported
+    and skipped, the others still run. The per-stage timings are kept in last_refresh_timings.
+
+    Once cancel is set, the downloads not started yet and every stage not started yet are skipped,
+    so a refresh stops between two stages rather than in the middle of saving a site.
+
+    Args:
+        sites (list): Site identifiers to refresh, defaults to every registered site.
+        streaming (bool): Overlap the stages; when False the sites are processed one after another.
+        queue_size (int): Maximum number of sites waiting between two stages.
+        cancel (threading.Event): Stops the refresh between two stages once set, e.g. when the app closes.
+
+    Returns:
+        dict: A dict of {site: number of new or changed items, or None on failure or when skipped}.
+    """
+    global last_refresh_timings
+
+    # A profile of this refresh is taken if one was requested, e.g. from the ticker's menu
+    with tracing.profile_if_requested("refresh"), tracing.span("refresh", sites=sites, streaming=streaming) as span:
+        adapters = [get_site(site) for site in sites] if sites is not None else list(SITE_ADAPTERS.values())
+        urls_and_sites = {adapter.url: adapter.name for adapter in adapters}
+        timings = StageTimings()
+
+        def cancelled():
+            return cancel is not None and cancel.is_set()
+
+        def timed_download(url):
+            if cancelled():
+                return None
+            with timings.timed("fetch", urls_and_sites[url]):
+                return download_html(url)
+
+        if streaming:
+            def parse_stage(site, html_content):
+                if not html_content or cancelled():
+                    return None
+                return parse_news(html_content, site)
+
+            def enrich_stage(site, parsed):
+                if cancelled():
+                    return None
+                df, content_hash, from_cache = parsed
+                return enrich_news(df, site, content_hash, from_cache)
+
+            def save_stage(site, df):
+                if cancelled():
+                    return None
+                return save_news(df, site)
+
+            source = ((urls_and_sites[url], html_content) for url, html_content in fetch_iter(urls_and_sites, timed_download))
+            stages = [("parse", parse_stage), ("enrich", enrich_stage), ("save", save_stage)]
+            results, timings = run_pipeline(source, stages, queue_size=queue_size, timings=timings)
+            results = {adapter.name: results.get(adapter.name) for adapter in adapters}
+        else:
+            start = time.perf_counter()
+            html_contents = fetch_all(urls_and_sites, timed_download)
+            results = {}
+            for adapter in adapters:
+                html_content = html_contents.get(adapter.url)
+                if cancelled():
+                    results[adapter.name] = None
+                    continue
+                with timings.timed("process", adapter.name):
+                    results[adapter.name] = parse_and_save_news(html_content, adapter.name) if html_content else None
+            timings.wall_seconds = time.perf_counter() - start
+
+        last_refresh_timings = timings
+        span.set(results=results, cancelled=cancelled())
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{timestamp}: Refresh stage timings:")
+        for line in timings.report():
+            print(f"    {line}")
+        return results
+
+
+def get_refresh_scheduler(on_complete=None):
+    """
+    Returns a scheduler refreshing every registered site on its own interval.
+
+    Args:
+        on_complete (callable): Called with the results of run_spider after each refresh.
+
+    Returns:
+        RefreshScheduler: The scheduler, not started yet.
+    """
+    intervals = {adapter.name: adapter.refresh_interval for adapter in SITE_ADAPTERS.values()}
+    return RefreshScheduler(lambda sites, cancel: run_spider(sites=sites, cancel=cancel), intervals,
+                            state_path=get_writable_path("schedule.json"), lock_path=get_writable_path("refresh.lock"),
+                            on_complete=on_complete)
 
 
 if __name__ == "__main__":
@@ -210,17 +566,15 @@ if __name__ == "__main__":
     print("----------" * 10)
     print(f"{timestamp}: {self_name} started to run.")
 
-    # Define URLs and corresponding site identifiers
-    urls_and_sites = {
-        "https://thehackernews.com/": "hackernews",
-        "https://www.cyber.gov.au/about-us/view-all-content/news-and-media": "cyber",
-        "https://www.afp.gov.au/news-centre": "afp"
-    }
-
-    for url, site in urls_and_sites.items():
-        html_content = download_html(url)
-        if html_content:
-            parse_and_save_news(html_content, site)
+    # Share the scheduler's lock, so a manual run never overlaps a refresh of the running app
+    refresh_lock = RefreshLock(get_writable_path("refresh.lock"))
+    if refresh_lock.acquire():
+        try:
+            run_spider()
+        finally:
+            refresh_lock.release()
+    else:
+        print(f"{timestamp}: Another refresh is running, exiting.")
 
     end_time = datetime.datetime.now()
     duration = end_time - start_time
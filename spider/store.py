@@ -0,0 +1,265 @@
+"""
+Function:
+    1. Keep every scraped news item in a SQLite database keyed on its URL, with a hash of its content.
+    2. Upsert a site's items in one transaction, keeping only the rows that are new or whose content changed.
+    3. Append exactly the new rows to final.csv, so the CSV grows without being rewritten. When an item already
+       in the CSV changes, the CSV is rewritten from the store in one atomic replace instead, so it keeps a
+       single row per item and its readers (the ticker, the tfidf trainer) never see two versions of it.
+    4. Answer "items since timestamp" queries from an index instead of rereading the whole dataset.
+    5. Resolve the relative URLs of items stored before the adapters resolved them, merging each with the
+       absolute-URL copy of the same item if one was stored since, so an item keeps a single key.
+
+I/O:
+    1. Input:
+        1.1 Rows with 'Summary', 'URL', 'Date' and 'Final Label' keys (list of dict)
+    2. Output:
+        2.1 A SQLite file ('news.sqlite3') with all items ever seen
+        2.2 New rows appended to the CSV file ('final.csv'), or the whole file rewritten when an item changed
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from diagnostics import tracing
+
+CSV_COLUMNS = ['Summary', 'URL', 'Date', 'Final Label']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    item_key     TEXT PRIMARY KEY,
+    url          TEXT,
+    content_hash TEXT NOT NULL,
+    site         TEXT,
+    summary      TEXT,
+    date         TEXT,
+    label        TEXT,
+    first_seen   REAL NOT NULL,
+    updated_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS news_updated_at ON news (updated_at);
+"""
+
+
+def _clean(value):
+    """ Turns pandas' NaN, empty strings and other missing values into None and everything else into str """
+    if value is None or value != value or value == "":
+        return None
+    return str(value)
+
+
+def content_hash(row):
+    """ Returns the SHA-256 hex digest of the displayed fields of a row """
+    payload = json.dumps([_clean(row.get(column)) for column in CSV_COLUMNS])
+    return hashlib.sha256(payload.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def item_key(row, row_hash):
+    """ Items are keyed on their URL, or on their content for the rare items without one """
+    url = _clean(row.get('URL'))
+    return url if url else f"hash:{row_hash}"
+
+
+class NewsStore:
+    def __init__(self, db_path, csv_path=None):
+        """
+        Args:
+            db_path (str): The SQLite database file.
+            csv_path (str): The CSV file new or changed rows are appended to, or None to disable the export.
+        """
+        self.db_path = db_path
+        self.csv_path = csv_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        if csv_path and self.count() == 0 and os.path.exists(csv_path):
+            self.import_csv(csv_path)
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+
+    def import_csv(self, csv_path, site=None):
+        """
+        Seeds the store with the rows of an existing CSV file without exporting them again.
+
+        Args:
+            csv_path (str): The CSV file to import.
+            site (str): The site identifier to record, if known.
+
+        Returns:
+            int: The number of rows stored.
+        """
+        with open(csv_path, "r", encoding="utf-8", newline="") as csv_file:
+            rows = list(csv.DictReader(csv_file))
+        return len(self._upsert(rows, site, export=False))
+
+    def upsert_items(self, rows, site=None):
+        """
+        Stores rows atomically, appending the new or changed ones to the CSV file.
+
+        Args:
+            rows (list): A list of dicts with 'Summary', 'URL', 'Date' and 'Final Label' keys.
+            site (str): The site identifier the rows come from.
+
+        Returns:
+            list: The rows that were new or changed.
+        """
+        return self._upsert(rows, site, export=True)
+
+    def _upsert(self, rows, site, export):
+        now = time.time()
+        changed_rows = []
+        replaced = False
+        with self._lock:
+            try:
+                # Rows repeated within the same batch count once, the last one wins
+                batch = {}
+                for row in rows:
+                    row_hash = content_hash(row)
+                    batch[item_key(row, row_hash)] = (row, row_hash)
+
+                existing = {}
+                keys = list(batch)
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    existing.update(self._conn.execute(
+                        f"SELECT item_key, content_hash FROM news WHERE item_key IN ({placeholders})", chunk))
+
+                for key, (row, row_hash) in batch.items():
+                    if existing.get(key) == row_hash:
+                        continue
+                    self._conn.execute(
+                        "INSERT INTO news (item_key, url, content_hash, site, summary, date, label, first_seen, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(item_key) DO UPDATE SET content_hash = excluded.content_hash, "
+                        "site = COALESCE(excluded.site, news.site), summary = excluded.summary, "
+                        "date = excluded.date, label = excluded.label, updated_at = excluded.updated_at",
+                        (key, _clean(row.get('URL')), row_hash, site, _clean(row.get('Summary')),
+                         _clean(row.get('Date')), _clean(row.get('Final Label')), now, now))
+                    changed_rows.append(row)
+                    replaced = replaced or key in existing
+
+                # The CSV is written before the commit, so a failed write rolls the rows back
+                if export and changed_rows and self.csv_path:
+                    if replaced:
+                        self._rewrite_csv()
+                    else:
+                        self._append_csv(changed_rows)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return changed_rows
+
+    def _append_csv(self, rows):
+        """ Appends rows to the CSV file in a single write, writing the header if the file is new """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        write_header = not os.path.exists(self.csv_path) or os.path.getsize(self.csv_path) == 0
+        if write_header:
+            writer.writerow(CSV_COLUMNS)
+        for row in rows:
+            writer.writerow(["" if _clean(row.get(column)) is None else _clean(row.get(column)) for column in CSV_COLUMNS])
+
+        data = buffer.getvalue()
+        with tracing.span("csv.write", rows=len(rows), bytes=len(data)):
+            with open(self.csv_path, "a", encoding="utf-8", newline="") as csv_file:
+                csv_file.write(data)
+                csv_file.flush()
+                os.fsync(csv_file.fileno())
+
+    def _rewrite_csv(self):
+        """ Replaces the CSV file with one row per stored item, in the order they were first seen """
+        rows = self._conn.execute("SELECT summary, url, date, label FROM news ORDER BY first_seen, rowid").fetchall()
+        temp_path = self.csv_path + ".tmp"
+        with tracing.span("csv.write", rows=len(rows), rewrite=True):
+            with open(temp_path, "w", encoding="utf-8", newline="") as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(CSV_COLUMNS)
+                writer.writerows(["" if value is None else value for value in row] for row in rows)
+                csv_file.flush()
+                os.fsync(csv_file.fileno())
+            # Readers holding the old file keep reading it; the ticker sees a new file and reloads it whole
+            os.replace(temp_path, self.csv_path)
+
+    def resolve_urls(self, resolve):
+        """
+        Rekeys the items stored with a relative URL on their absolute URL, and rewrites the CSV file if any was.
+
+        When the item was also stored under its absolute URL, the two rows are merged into the absolute one,
+        which keeps the earlier first_seen so the item stays in place in the CSV.
+
+        Args:
+            resolve (callable): Takes a relative URL and the item's site (None if unknown) and returns the
+                absolute URL, or None to leave the item as it is.
+
+        Returns:
+            int: The number of items rekeyed or merged.
+        """
+        resolved = 0
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    "SELECT item_key, url, site, summary, date, label, first_seen FROM news "
+                    "WHERE url IS NOT NULL AND url NOT LIKE 'http://%' AND url NOT LIKE 'https://%'").fetchall()
+                for key, url, site, summary, date, label, first_seen in rows:
+                    absolute_url = resolve(url, site)
+                    if not absolute_url or absolute_url == url:
+                        continue
+                    row_hash = content_hash({'Summary': summary, 'URL': absolute_url, 'Date': date, 'Final Label': label})
+                    if self._conn.execute("SELECT 1 FROM news WHERE item_key = ?", (absolute_url,)).fetchone():
+                        self._conn.execute("DELETE FROM news WHERE item_key = ?", (key,))
+                        self._conn.execute("UPDATE news SET first_seen = MIN(first_seen, ?), "
+                                           "site = COALESCE(site, ?) WHERE item_key = ?",
+                                           (first_seen, site, absolute_url))
+                    else:
+                        self._conn.execute("UPDATE news SET item_key = ?, url = ?, content_hash = ? WHERE item_key = ?",
+                                           (absolute_url, absolute_url, row_hash, key))
+                    resolved += 1
+
+                # Written before the commit, like an upsert, so a failed write leaves the keys as they were
+                if resolved and self.csv_path:
+                    self._rewrite_csv()
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return resolved
+
+    def items_since(self, timestamp, limit=None):
+        """
+        Returns the items added or changed after timestamp, oldest first.
+
+        Args:
+            timestamp (float): A POSIX timestamp; 0 returns every item.
+            limit (int): Maximum number of items to return.
+
+        Returns:
+            list: A list of dicts with the CSV columns plus 'site' and 'updated_at'.
+        """
+        query = ("SELECT summary, url, date, label, site, updated_at FROM news "
+                 "WHERE updated_at > ? ORDER BY updated_at, rowid")
+        params = [timestamp]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {'Summary': summary, 'URL': url, 'Date': date, 'Final Label': label, 'site': site, 'updated_at': updated_at}
+            for summary, url, date, label, site, updated_at in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
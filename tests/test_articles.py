@@ -0,0 +1,11 @@
+from spider.articles import detect_encoding, extract_article_text
+
+
+def test_undeclared_utf8_article_is_not_decoded_as_latin1():
+    paragraph = "Ransomware crews hit a café chain in Zürich — the operators say no data was lost. " * 3
+    body = f"<html><body><article><p>{paragraph}</p></article></body></html>".encode("utf-8")
+
+    text = extract_article_text(body.decode(detect_encoding(body), errors="replace"))
+    assert "café chain in Zürich — the operators" in text
+    # A charset the server declared is used as it is
+    assert detect_encoding(body, "ISO-8859-1") == "ISO-8859-1"
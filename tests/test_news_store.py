@@ -0,0 +1,62 @@
+import datetime
+
+from spider.store import NewsStore
+from ticker.feed import NewsFeed
+
+
+def make_row(url, label, date="News\n1 Jul 2024"):
+    return {'Summary': f"Summary of {url}", 'URL': url, 'Date': date, 'Final Label': label}
+
+
+def test_changed_item_is_shown_once(tmp_path):
+    csv_path = str(tmp_path / "final.csv")
+    store = NewsStore(str(tmp_path / "news.sqlite3"), csv_path=csv_path)
+    store.upsert_items([make_row("u1", "cyber"), make_row("u2", "cyber")], site="cyber")
+    feed = NewsFeed(csv_path)
+    assert feed.load() == 2
+
+    # A new label for u2 and a new item u3 in the same refresh
+    store.upsert_items([make_row("u2", "cyber security"), make_row("u3", "cyber")], site="cyber")
+    feed.refresh()
+    store.close()
+
+    assert feed.urls == ["u1", "u2", "u3"]
+    assert feed.items[1].endswith("Classified: cyber security")
+    assert feed.select(since=datetime.date(2024, 7, 1))[1].count("u2") == 1
+    assert feed.select(labels=["cyber"])[1] == ["u3", "u1"]
+
+
+def test_new_items_are_appended(tmp_path):
+    csv_path = str(tmp_path / "final.csv")
+    store = NewsStore(str(tmp_path / "news.sqlite3"), csv_path=csv_path)
+    store.upsert_items([make_row("u1", "cyber")], site="cyber")
+    feed = NewsFeed(csv_path)
+    feed.load()
+
+    store.upsert_items([make_row("u1", "cyber"), make_row("u2", "cyber")], site="cyber")
+    store.close()
+
+    # Only the new row is parsed, the file was not replaced
+    assert feed.refresh() == 1
+    assert feed.urls == ["u1", "u2"]
+
+
+def test_relative_urls_are_resolved_once(tmp_path):
+    csv_path = str(tmp_path / "final.csv")
+    store = NewsStore(str(tmp_path / "news.sqlite3"), csv_path=csv_path)
+    store.upsert_items([make_row("/news/a", "cyber"), make_row("/news/b", "cyber")], site="cyber")
+    # An upgrade already stored b under its absolute URL before the keys were resolved
+    store.upsert_items([make_row("https://example.org/news/b", "cyber")], site="cyber")
+
+    def resolve(url, site):
+        return "https://example.org" + url
+
+    assert store.resolve_urls(resolve) == 2
+    assert store.resolve_urls(resolve) == 0
+    # Known again under its absolute URL, the item is neither new nor changed
+    assert store.upsert_items([dict(make_row("/news/a", "cyber"), URL="https://example.org/news/a")], site="cyber") == []
+    store.close()
+
+    feed = NewsFeed(csv_path)
+    feed.load()
+    assert feed.urls == ["https://example.org/news/a", "https://example.org/news/b"]
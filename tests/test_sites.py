@@ -0,0 +1,16 @@
+import os
+
+from spider.spider import get_site
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench", "fixtures")
+
+
+def test_relative_article_links_are_resolved():
+    adapter = get_site('cyber')
+    with open(os.path.join(FIXTURES_DIR, "cyber.html"), "r", encoding="utf-8") as fixture_file:
+        html_content = fixture_file.read()
+    items = adapter.extract_items(adapter.select_items(html_content))
+
+    # The fixture links its second card with a site-relative href
+    assert items[1]['URL'] == "https://www.cyber.gov.au/about-us/view-all-content/news-and-media/item-1"
+    assert all(item['URL'].startswith("https://www.cyber.gov.au/") for item in items)
@@ -0,0 +1,155 @@
+"""
+Function:
+    1. Load the ticker's headlines and URLs from final.csv column-wise: only the four needed columns are
+       read, as strings, and the headlines are built with vectorized string operations instead of iterrows().
+    2. Refresh incrementally: final.csv only grows by appends, so a refresh parses just the bytes after the
+       offset of the previous load, and reloads everything only when the file was replaced or truncated.
+    3. Publish each load as one new (items, urls) snapshot, so a reader never sees a half-built list.
+    4. Keep a NewsIndex of the label, date and summary tokens of the rows in step with the snapshot, so the
+       ticker can be filtered and ordered by recency without rescanning every headline.
+
+I/O:
+    1. Input:
+        1.1 The CSV file with 'Summary', 'URL', 'Date' and 'Final Label' columns ('final.csv')
+    2. Output:
+        2.1 The headlines (list of str) and their URLs (list of str), in file order
+        2.2 The headlines and URLs matching a filter, newest first
+"""
+
+import csv
+import io
+import os
+import threading
+
+from spider.store import CSV_COLUMNS
+from ticker.index import NewsIndex
+
+
+def format_news_items(df):
+    """
+    Builds the ticker headlines of a DataFrame in one vectorized pass.
+
+    Args:
+        df (pandas.DataFrame): Rows with the CSV_COLUMNS columns as strings.
+
+    Returns:
+        tuple: (headlines, urls) as lists of str.
+    """
+    dates = df['Date'].str.replace('\n', ' ', regex=False).str.strip()
+    items = "Date: " + dates + " Content: " + df['Summary'] + "  Classified: " + df['Final Label']
+    return items.tolist(), df['URL'].tolist()
+
+
+def _complete_records(data):
+    """ Returns the length of the leading part of data that ends on a CSV record boundary """
+    end = len(data)
+    while True:
+        end = data.rfind(b"\n", 0, end)
+        if end < 0:
+            return 0
+        # A newline inside a quoted field has an odd number of quotes before it
+        if data.count(b'"', 0, end) % 2 == 0:
+            return end + 1
+
+
+class NewsFeed:
+    def __init__(self, csv_path, index=None):
+        """
+        Args:
+            csv_path (str): The CSV file to load.
+            index (NewsIndex): The index kept in step with the headlines, defaults to a new one.
+        """
+        self.csv_path = csv_path
+        self.index = index if index is not None else NewsIndex()
+        self.snapshot = ([], [])
+        self._columns = None
+        self._offset = 0
+        self._file_id = None
+        self._lock = threading.RLock()
+
+    @property
+    def items(self):
+        return self.snapshot[0]
+
+    @property
+    def urls(self):
+        return self.snapshot[1]
+
+    def _parse(self, data):
+        # Imported on first use: the ticker window is shown before pandas has loaded
+        import pandas as pd
+        df = pd.read_csv(io.BytesIO(data), header=None, names=self._columns, usecols=CSV_COLUMNS,
+                         dtype=str, keep_default_na=False, encoding="utf-8")
+        # Rows are indexed in file order, right after the rows already in the snapshot
+        self.index.add(df['Summary'].tolist(), df['Date'].tolist(), df['Final Label'].tolist())
+        return format_news_items(df)
+
+    def load(self):
+        """
+        Reads the whole file, replacing the current snapshot.
+
+        Returns:
+            int: The number of headlines loaded.
+        """
+        with self._lock:
+            with open(self.csv_path, "rb") as csv_file:
+                stat = os.fstat(csv_file.fileno())
+                data = csv_file.read()
+            header_end = data.find(b"\n") + 1
+            self.index.clear()
+            if header_end == 0:
+                # No complete header yet, the next refresh tries again
+                self.snapshot = ([], [])
+                return 0
+            self._columns = next(csv.reader([data[:header_end].decode("utf-8-sig")]))
+            end = _complete_records(data)
+            items, urls = self._parse(data[header_end:end]) if end > header_end else ([], [])
+            self.snapshot = (items, urls)
+            self._offset = max(end, header_end)
+            self._file_id = (stat.st_dev, stat.st_ino)
+            return len(items)
+
+    def refresh(self):
+        """
+        Adds the rows appended since the previous load, or reloads the file if it was replaced or truncated.
+
+        Returns:
+            int: The number of headlines added (all of them after a full load).
+        """
+        if self._columns is None:
+            return self.load()
+        with self._lock:
+            with open(self.csv_path, "rb") as csv_file:
+                stat = os.fstat(csv_file.fileno())
+                if (stat.st_dev, stat.st_ino) != self._file_id or stat.st_size < self._offset:
+                    return self.load()
+                csv_file.seek(self._offset)
+                data = csv_file.read()
+
+            # A row still being appended is left for the next refresh
+            end = _complete_records(data)
+            if end == 0:
+                return 0
+            new_items, new_urls = self._parse(data[:end])
+            items, urls = self.snapshot
+            self.snapshot = (items + new_items, urls + new_urls)
+            self._offset += end
+            return len(new_items)
+
+    def select(self, labels=None, keywords=None, since=None, limit=None):
+        """
+        Returns the headlines matching every given filter, newest first.
+
+        Args:
+            labels (list): Keep headlines with any of these labels (case-insensitive).
+            keywords (list): Keep headlines whose summary contains any of these words or phrases.
+            since (datetime.date): Keep headlines dated on or after this day.
+            limit (int): Return at most this many headlines.
+
+        Returns:
+            tuple: (headlines, urls) as lists of str.
+        """
+        with self._lock:
+            items, urls = self.snapshot
+            positions = self.index.query(labels=labels, keywords=keywords, since=since, limit=limit)
+        return [items[position] for position in positions], [urls[position] for position in positions]
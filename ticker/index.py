@@ -0,0 +1,172 @@
+"""
+Function:
+    1. Keep an in-memory inverted index of the ticker's headlines: label -> rows, summary token -> rows,
+       and every row ordered by publication date, built when final.csv is loaded and extended with the rows
+       each refresh appends.
+    2. Answer ticker filters (labels, watch keywords, a start date) from the postings instead of rescanning
+       every headline, with the matching rows returned newest first.
+
+I/O:
+    1. Input:
+        1.1 The 'Summary', 'Date' and 'Final Label' values of each row, in file order
+    2. Output:
+        2.1 The positions (row numbers in file order) of the matching rows, newest first
+"""
+
+import datetime
+import re
+import threading
+from bisect import bisect_left
+
+from spider.classifiers import tokenize
+
+_MONTHS = {month: number for number, month in
+           enumerate(["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+# "News\n1 Jul 2024" (Cyber.gov.au, AFP) and "Jul 1, 2024" (Hacker News)
+_DAY_MONTH_YEAR = re.compile(r"(\d{1,2})\s+([A-Za-z]{3})[A-Za-z]*\.?,?\s+(\d{4})")
+_MONTH_DAY_YEAR = re.compile(r"([A-Za-z]{3})[A-Za-z]*\.?\s+(\d{1,2}),?\s+(\d{4})")
+
+
+def parse_date(text):
+    """
+    Returns the date of a row's 'Date' field, whatever the site's format.
+
+    Args:
+        text (str): The date as scraped, e.g. "News\\n1 Jul 2024" or "Jul 1, 2024".
+
+    Returns:
+        datetime.date: The date, or None if none was found.
+    """
+    match = _DAY_MONTH_YEAR.search(text)
+    if match:
+        day, month, year = match.groups()
+    else:
+        match = _MONTH_DAY_YEAR.search(text)
+        if not match:
+            return None
+        month, day, year = match.groups()
+    try:
+        return datetime.date(int(year), _MONTHS[month.lower()], int(day))
+    except (KeyError, ValueError):
+        return None
+
+
+class NewsIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._date_keys = []
+            self._labels = {}
+            self._label_names = {}
+            self._tokens = {}
+            self._date_cache = {}
+            # (date ordinal, position) of every row in ascending order; undated rows sort oldest
+            self._recency = []
+
+    def __len__(self):
+        return len(self._date_keys)
+
+    def add(self, summaries, dates, labels):
+        """
+        Indexes rows appended after the ones already indexed.
+
+        Args:
+            summaries (list): The 'Summary' of each new row.
+            dates (list): The 'Date' of each new row.
+            labels (list): The 'Final Label' of each new row.
+        """
+        with self._lock:
+            start = len(self._date_keys)
+            new_keys = []
+            recency = self._recency
+            label_postings = self._labels
+            token_postings = self._tokens
+            for position, (summary, date, label) in enumerate(zip(summaries, dates, labels), start):
+                # Many rows share a date, each distinct one is parsed once
+                key = self._date_cache.get(date)
+                if key is None:
+                    parsed = parse_date(date)
+                    key = self._date_cache[date] = parsed.toordinal() if parsed is not None else 0
+                new_keys.append(key)
+                recency.append((key, position))
+
+                normalized = label.strip().lower()
+                positions = label_postings.get(normalized)
+                if positions is None:
+                    positions = label_postings[normalized] = []
+                    self._label_names[normalized] = label.strip()
+                positions.append(position)
+                for token in set(tokenize(summary)):
+                    positions = token_postings.get(token)
+                    if positions is None:
+                        token_postings[token] = [position]
+                    else:
+                        positions.append(position)
+            self._date_keys.extend(new_keys)
+            # Appended rows are mostly the newest, so this sort only merges a short run into a sorted list
+            recency.sort()
+
+    def labels(self):
+        """ Returns {label: number of rows}, most frequent label first """
+        with self._lock:
+            counts = {self._label_names[label]: len(positions) for label, positions in self._labels.items()}
+        return dict(sorted(counts.items(), key=lambda pair: -pair[1]))
+
+    def _keyword_matches(self, keyword):
+        # Every token of a multi-word keyword has to appear in the summary
+        tokens = tokenize(keyword)
+        if not tokens:
+            return set()
+        postings = sorted((self._tokens.get(token, []) for token in tokens), key=len)
+        matches = set(postings[0])
+        for positions in postings[1:]:
+            matches.intersection_update(positions)
+        return matches
+
+    def query(self, labels=None, keywords=None, since=None, limit=None):
+        """
+        Returns the rows matching every given filter, newest first.
+
+        Args:
+            labels (list): Keep rows with any of these labels (case-insensitive).
+            keywords (list): Keep rows whose summary contains any of these words or phrases.
+            since (datetime.date): Keep rows dated on or after this day.
+            limit (int): Return at most this many rows.
+
+        Returns:
+            list: Positions of the matching rows, newest first.
+        """
+        with self._lock:
+            first = bisect_left(self._recency, (since.toordinal(), -1)) if since is not None else 0
+            candidates = None
+            if labels:
+                candidates = set()
+                for label in labels:
+                    candidates.update(self._labels.get(label.strip().lower(), []))
+            if keywords:
+                matches = set()
+                for keyword in keywords:
+                    matches |= self._keyword_matches(keyword)
+                candidates = matches if candidates is None else candidates & matches
+
+            if candidates is None:
+                newest = [position for _, position in reversed(self._recency[first:])]
+            elif len(candidates) * 8 > len(self._recency):
+                # A broad filter: walk the rows newest first and stop once the limit is reached
+                newest = []
+                for index in range(len(self._recency) - 1, first - 1, -1):
+                    position = self._recency[index][1]
+                    if position in candidates:
+                        newest.append(position)
+                        if limit is not None and len(newest) >= limit:
+                            break
+            else:
+                # A narrow filter: sorting the few matches is cheaper than walking every row
+                min_key = since.toordinal() if since is not None else 0
+                date_keys = self._date_keys
+                newest = sorted((position for position in candidates if date_keys[position] >= min_key),
+                                key=lambda position: (date_keys[position], position), reverse=True)
+        return newest[:limit] if limit is not None else newest
@@ -0,0 +1,177 @@
+"""
+Function:
+    1. Scroll the news headlines across a Tk canvas: each headline is laid out once as a canvas text item
+       and then moved by whole pixels, so a frame costs the same whatever the length of the headline.
+    2. Pace the frames on a fixed schedule and place the headline from the elapsed time, so a late frame
+       catches up instead of slowing the ticker down.
+    3. Record how long laying out a headline, drawing a frame and the time between frames take.
+
+I/O:
+    1. Input:
+        1.1 A function returning the current list of headline strings
+    2. Output:
+        2.1 The ticker drawn on NewsTicker.canvas
+        2.2 Render and frame-time statistics from NewsTicker.stats()
+"""
+
+import time
+import tkinter as tk
+from collections import deque
+
+from diagnostics import tracing
+from monitoring.history import percentile
+
+# Scroll speed in pixels per second; the old ticker dropped one 40pt character (~25 px) every 100 ms
+DEFAULT_SPEED = 240
+DEFAULT_FPS = 60
+
+# Pause between two headlines
+DEFAULT_PAUSE_MS = 2000
+
+# Frames and headlines kept for the statistics
+STATS_WINDOW = 600
+
+# A frame counts as late once it arrives this many frame intervals after the previous one
+LATE_FRAME_FACTOR = 1.5
+
+
+class NewsTicker:
+    def __init__(self, parent, get_items, height=45, font=("Helvetica", 40), bg="yellow", fg="black",
+                 speed=DEFAULT_SPEED, fps=DEFAULT_FPS, pause_ms=DEFAULT_PAUSE_MS):
+        """
+        Args:
+            parent: The Tk widget the canvas is placed in.
+            get_items (callable): Returns the current list of headlines; called for every headline,
+                so a refresh of the list is picked up without restarting the ticker.
+            height (int): Canvas height in pixels.
+            font (tuple): Tk font of the headlines.
+            bg (str): Background colour.
+            fg (str): Text colour.
+            speed (float): Scroll speed in pixels per second.
+            fps (int): Target frame rate.
+            pause_ms (int): Pause between two headlines in milliseconds.
+        """
+        self.get_items = get_items
+        self.height = height
+        self.font = font
+        self.fg = fg
+        self.speed = speed
+        self.frame_interval = 1.0 / fps
+        self.pause_ms = pause_ms
+        self.canvas = tk.Canvas(parent, height=height, bg=bg, highlightthickness=0)
+
+        # Index of the headline on screen, or of the next one during the pause
+        self.index = 0
+        self._item = None
+        self._text_width = 0
+        self._offset = 0
+        self._started = None
+        self._next_due = None
+        self._last_frame = None
+        self._after_id = None
+
+        self.frames = 0
+        self.late_frames = 0
+        self.frame_seconds = deque(maxlen=STATS_WINDOW)
+        self.render_seconds = deque(maxlen=STATS_WINDOW)
+        self.layout_seconds = deque(maxlen=STATS_WINDOW)
+
+    def start(self):
+        if self._after_id is None:
+            self._show_next()
+
+    def stop(self):
+        if self._after_id is not None:
+            self.canvas.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _show_next(self):
+        items = self.get_items()
+        if not items:
+            self._after_id = self.canvas.after(self.pause_ms, self._show_next)
+            return
+        self.index %= len(items)
+
+        start = time.perf_counter()
+        if self._item is not None:
+            self.canvas.delete(self._item)
+        # The headline is laid out once here; every frame after this only moves it
+        self._item = self.canvas.create_text(0, self.height // 2, text=items[self.index], anchor="w",
+                                             font=self.font, fill=self.fg)
+        left, _, right, _ = self.canvas.bbox(self._item)
+        self._text_width = right - left
+        layout_seconds = time.perf_counter() - start
+        self.layout_seconds.append(layout_seconds)
+        tracing.record("ticker.layout", layout_seconds, index=self.index, width=self._text_width)
+
+        self._offset = 0
+        self._started = self._next_due = time.perf_counter()
+        self._last_frame = None
+        self._frame()
+
+    def _frame(self):
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            interval = now - self._last_frame
+            self.frame_seconds.append(interval)
+            if interval > LATE_FRAME_FACTOR * self.frame_interval:
+                self.late_frames += 1
+        self._last_frame = now
+
+        offset = int(self.speed * (now - self._started))
+        if offset != self._offset:
+            self.canvas.move(self._item, self._offset - offset, 0)
+            self._offset = offset
+        # Draw now rather than at idle time, so the render time below includes the redraw
+        self.canvas.update_idletasks()
+        self.frames += 1
+        render_seconds = time.perf_counter() - now
+        self.render_seconds.append(render_seconds)
+        tracing.record("ticker.frame", render_seconds, offset=offset)
+
+        if offset >= self._text_width:
+            # The headline has scrolled off, show the next one after the pause
+            self.index = (self.index + 1) % max(1, len(self.get_items()))
+            self._after_id = self.canvas.after(self.pause_ms, self._show_next)
+            return
+
+        self._next_due += self.frame_interval
+        if self._next_due < now:
+            self._next_due = now + self.frame_interval
+        delay_ms = max(1, round((self._next_due - time.perf_counter()) * 1000))
+        self._after_id = self.canvas.after(delay_ms, self._frame)
+
+    def stats(self):
+        """
+        Returns the frame-time statistics over the last STATS_WINDOW frames.
+
+        Returns:
+            dict: 'frames' and 'late_frames' since start, 'fps', 'frame_ms_p50', 'frame_ms_p99',
+                'render_ms_p50', 'render_ms_p99' and 'layout_ms_max' (laying out one headline).
+        """
+        frames = sorted(self.frame_seconds)
+        renders = sorted(self.render_seconds)
+
+        def ms(value):
+            return value * 1000 if value is not None else None
+
+        return {
+            'frames': self.frames,
+            'late_frames': self.late_frames,
+            'fps': len(frames) / sum(frames) if frames else None,
+            'frame_ms_p50': ms(percentile(frames, 0.50)),
+            'frame_ms_p99': ms(percentile(frames, 0.99)),
+            'render_ms_p50': ms(percentile(renders, 0.50)),
+            'render_ms_p99': ms(percentile(renders, 0.99)),
+            'layout_ms_max': ms(max(self.layout_seconds)) if self.layout_seconds else None,
+        }
+
+    def report(self):
+        """ Returns stats() as one log line """
+        stats = self.stats()
+        if stats['fps'] is None:
+            return f"Ticker: {stats['frames']} frames"
+        return (f"Ticker: {stats['frames']} frames ({stats['late_frames']} late), {stats['fps']:.1f} fps, "
+                f"frame p50 {stats['frame_ms_p50']:.1f} ms / p99 {stats['frame_ms_p99']:.1f} ms, "
+                f"render p50 {stats['render_ms_p50']:.2f} ms / p99 {stats['render_ms_p99']:.2f} ms, "
+                f"layout max {stats['layout_ms_max']:.2f} ms")